@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Clears every cache before each test, since the version tokens
+    of cached data are not rolled back together with the database.
+    """
+    from django.conf import settings
+    from django.core.cache import caches
+
+    for alias in settings.CACHES:
+        caches[alias].clear()
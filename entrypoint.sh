@@ -1,14 +1,9 @@
 #!/bin/bash
 set -e
 
-# Run database migrations
-# NOTE: This is not an ideal solution since this database
-# migration step will run every time the container is executed.
-python manage.py migrate
-
-# Load initial data
-# NOTE: This is also not ideal because not every time we
-# will want the sample data to be present.
-python manage.py loaddata initial.json sample.json
+# Apply pending migrations and load the fixtures of BOOTSTRAP_FIXTURES.
+# Both steps are skipped when the database is already up to date, so
+# restarting a container with an existing database starts quickly.
+python manage.py bootstrap
 
 exec "$@"
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'govgrant.api'
+
+    def ready(self):
+        # Register signal handlers
+        from govgrant.api import signals  # noqa: F401
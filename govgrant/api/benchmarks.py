@@ -0,0 +1,323 @@
+import asyncio
+import io
+import itertools
+import json
+import random
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Max, Min
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from govgrant.api.filters import GRANT_PARAMS
+from govgrant.api.generators import HouseholdGenerator
+from govgrant.api.models import Household
+
+
+def percentile(values, percent):
+    """Returns the nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    rank = max(int(round(percent / 100 * len(values))) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Returns the throughput and latency percentiles (in ms) of a run"""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def get_host():
+    """Returns a host name accepted by the ALLOWED_HOSTS setting"""
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*" and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def wsgi_environ(url, method="GET", data=None):
+    """Returns the WSGI environ of a request to a local URL, with a JSON body if data is given"""
+    url = urlsplit(url)
+    body = b"" if data is None else json.dumps(data).encode()
+    return {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "SERVER_NAME": get_host(),
+        "SERVER_PORT": "80",
+        "HTTP_HOST": get_host(),
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": io.StringIO(),
+        "wsgi.url_scheme": "http",
+        "wsgi.version": (1, 0),
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+
+
+def asgi_scope(url):
+    """Returns the ASGI scope of a GET request to a local URL"""
+    url = urlsplit(url)
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": [(b"host", get_host().encode())],
+        "server": (get_host(), 80),
+    }
+
+
+def run_wsgi(application, urls, requests, concurrency):
+    """
+    Sends GET requests to a WSGI application from a pool of client
+    threads, as a threaded WSGI server would, cycling through urls.
+    Returns the summary of the run.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def request(i):
+        status, latency = call_wsgi(application, urls[i % len(urls)])
+        with lock:
+            latencies.append(latency)
+            if status != 200:
+                errors.append(status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(request, range(requests)))
+    return summarize(latencies, time.perf_counter() - start, len(errors))
+
+
+def member_data(name):
+    """Returns the data of a new member to add to a household"""
+    return {
+        "name": name,
+        "gender": "Female",
+        "marital_status": "Single",
+        "spouse": None,
+        "occupation_type": "Student",
+        "annual_income": 0,
+        "dob": "2015-01-01",
+    }
+
+
+def call_wsgi(application, url, method="GET", data=None):
+    """Sends a request to a WSGI application, returning its status code and latency"""
+    status = []
+    start = time.perf_counter()
+    body = application(wsgi_environ(url, method, data), lambda s, headers: status.append(s))
+    try:
+        b"".join(body)
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    return int(status[0].split()[0]), time.perf_counter() - start
+
+
+def run_mixed(application, households, readers, writers, duration, read_url="/households/?page_size=100"):
+    """
+    Sends GET requests to read_url from ``readers`` client threads
+    while ``writers`` client threads add members to and remove them
+    from random households, as a threaded WSGI server would, for
+    ``duration`` seconds. Returns the summaries of reads and writes.
+    """
+    latencies = {"reads": [], "writes": []}
+    errors = {"reads": [], "writes": []}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def record(kind, status, latency):
+        with lock:
+            latencies[kind].append(latency)
+            if status >= 400:
+                errors[kind].append(status)
+
+    def read(i):
+        while time.perf_counter() < deadline:
+            record("reads", *call_wsgi(application, read_url))
+
+    def write(i):
+        rand = random.Random(i)
+        for n in itertools.takewhile(lambda n: time.perf_counter() < deadline, itertools.count()):
+            household, name = rand.choice(households), f"Storage benchmark {i}-{n}"
+            path = f"/households/{household}/"
+            record("writes", *call_wsgi(application, path + "add_member/", "POST", member_data(name)))
+            record("writes", *call_wsgi(application, path + "remove_member/", "DELETE", {"name": name}))
+
+    def client(target, i):
+        try:
+            target(i)
+        finally:
+            connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=readers + writers) as executor:
+        futures = [executor.submit(client, read, i) for i in range(readers)]
+        futures += [executor.submit(client, write, i) for i in range(writers)]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+    return {kind: summarize(latencies[kind], elapsed, len(errors[kind])) for kind in latencies}
+
+
+def run_asgi(application, urls, requests, concurrency):
+    """
+    Sends GET requests to an ASGI application from concurrent tasks
+    on a single event loop, as an ASGI server would, cycling through
+    urls. Returns the summary of the run.
+    """
+    latencies, errors = [], []
+    counter = iter(range(requests))
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def client():
+        for i in counter:
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            start = time.perf_counter()
+            await application(asgi_scope(urls[i % len(urls)]), receive, send)
+            latencies.append(time.perf_counter() - start)
+            if messages[0]["status"] != 200:
+                errors.append(messages[0]["status"])
+
+    async def main():
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return summarize(latencies, time.perf_counter() - start, len(errors))
+
+
+class BenchmarkSuite:
+    """
+    Times the household endpoints against the current database
+
+    Each scenario is requested ``repeat`` times through the test
+    client, recording the latency and number of queries of every
+    request, followed by one more request traced with tracemalloc
+    to record its peak memory usage. Members added by the add_member
+    scenario are removed again by the remove_member scenario.
+    """
+
+    def __init__(self, repeat=20, page_size=100, seed=0):
+        self.repeat = repeat
+        self.page_size = page_size
+        self.random = random.Random(seed)
+        self.client = Client(HTTP_HOST=get_host())
+
+    def scenarios(self):
+        """Returns the requests of each scenario keyed by name"""
+        paginate = {"page_size": self.page_size} if self.page_size else {}
+        bounds = Household.objects.aggregate(first=Min("pk"), last=Max("pk"))
+        household = self.random.randint(bounds["first"], bounds["last"])
+
+        def get(path, params=None):
+            return lambda i: self.client.get(path, params)
+
+        scenarios = {
+            f"grant: {name}": get("/households/", {**params, **paginate})
+            for name, params in GRANT_PARAMS.items()
+        }
+        scenarios.update({
+            "list": get("/households/", paginate),
+            "retrieve": lambda i: self.client.get(
+                f"/households/{self.random.randint(bounds['first'], bounds['last'])}/"
+            ),
+            "add_member": lambda i: self.client.post(
+                f"/households/{household}/add_member/", member_data(f"Benchmark {i}"), content_type="application/json",
+            ),
+            "remove_member": lambda i: self.client.delete(
+                f"/households/{household}/remove_member/", {"name": f"Benchmark {i}"}, content_type="application/json",
+            ),
+        })
+        return scenarios
+
+    def run(self):
+        """Returns the measurements of every scenario keyed by name"""
+        return {name: self.measure(request) for name, request in self.scenarios().items()}
+
+    def measure(self, request):
+        latencies, queries = [], []
+        for i in range(self.repeat):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = request(i)
+                latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise RuntimeError(f"Unexpected {response.status_code} response: {response.content[:200]}")
+            queries.append(len(context))
+
+        tracemalloc.start()
+        try:
+            request(self.repeat)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        result = summarize(latencies, sum(latencies))
+        result.update({
+            "queries": max(queries, default=0),
+            "peak_memory_kb": peak / 1024,
+        })
+        return result
+
+
+def household_payload(count, seed=0):
+    """
+    Returns generated households in the shape returned by the
+    household endpoints, with ids assigned sequentially.
+    """
+    payload, member_id = [], 0
+    for household_id, household in enumerate(HouseholdGenerator(seed=seed).generate(count), start=1):
+        members = []
+        for member in household["members"]:
+            member_id += 1
+            members.append({"id": member_id, **member, "household": household_id})
+        payload.append({"id": household_id, "housing_type": household["housing_type"], "members": members})
+    return payload
+
+
+def measure_encoding(encode, payload, repeat):
+    """Returns the throughput of encoding a payload of households"""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = encode(payload)
+        latencies.append(time.perf_counter() - start)
+    elapsed = sum(latencies)
+    return {
+        "bytes": len(content),
+        "households_per_second": len(payload) * repeat / elapsed if elapsed else 0.0,
+        "mb_per_second": len(content) * repeat / elapsed / 1e6 if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+    }
@@ -0,0 +1,152 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+# Version key of the data of households and their members
+HOUSEHOLDS_VERSION_KEY = "data:households"
+
+
+def get_version(key):
+    """
+    Returns the current version token of a key.
+
+    Version tokens are kept in the cache backend given by the
+    ``API_VERSION_CACHE`` setting so that they can be shared
+    between worker processes when a shared backend is used.
+    A missing token is initialised to a new random token so that
+    an evicted version can never be mistaken for an older one.
+    """
+    cache = caches[settings.API_VERSION_CACHE]
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """Replaces the version token of a key with a new random token"""
+    cache = caches[settings.API_VERSION_CACHE]
+    cache.set(key, uuid.uuid4().hex, timeout=None)
+
+
+class EnumCache:
+    """
+    Process-wide cache of the rows of an EnumModel subclass
+
+    The name <-> pk mapping of the model is loaded in a single
+    query and kept in memory, so that enumerated values can be
+    resolved during validation and serialization without any
+    query. The mapping is reloaded when it is invalidated by a
+    save or delete in the current process, when the shared
+    version token has been bumped by another process (checked
+    at most once every ``ENUM_CACHE_CHECK_INTERVAL`` seconds),
+    or when a lookup misses.
+
+    Invalidation is not transactional: a mapping loaded within a
+    transaction that is later rolled back is kept until the cache
+    is invalidated or cleared again.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f"enum:{model._meta.label_lower}"
+        self._lock = threading.Lock()
+        self._mapping = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def clear(self):
+        """Discards the cached mapping of the current process"""
+        with self._lock:
+            self._mapping = None
+
+    def invalidate(self):
+        """Discards the cached mapping and notifies other processes"""
+        self.clear()
+        bump_version(self.version_key)
+
+    def warm(self):
+        """Loads the mapping unless it is already cached"""
+        self._get_mapping()
+
+    def _load(self):
+        version = get_version(self.version_key)
+        rows = self.model._default_manager.values_list("pk", "name")
+        by_pk = dict(rows)
+        mapping = {
+            "pk": by_pk,
+            "name": {name: pk for pk, name in by_pk.items()},
+            "iname": {name.casefold(): pk for pk, name in by_pk.items()},
+        }
+        with self._lock:
+            self._mapping = mapping
+            self._version = version
+            self._checked_at = time.monotonic()
+        return mapping
+
+    def _get_mapping(self):
+        mapping = self._mapping
+        if mapping is None:
+            return self._load()
+        if time.monotonic() - self._checked_at >= settings.ENUM_CACHE_CHECK_INTERVAL:
+            if get_version(self.version_key) != self._version:
+                return self._load()
+            self._checked_at = time.monotonic()
+        return mapping
+
+    def _lookup(self, kind, key):
+        try:
+            return self._get_mapping()[kind][key]
+        except KeyError:
+            # Row may have been created since the mapping was loaded
+            return self._load()[kind][key]
+
+    def get_name(self, pk):
+        """Returns the name of a row given its pk"""
+        return self._lookup("pk", pk)
+
+    def get_names(self):
+        """
+        Returns the mapping of pks to names, for callers resolving
+        many pks at once. Pks missing from it must be resolved with
+        ``get_name()`` since the row may have been created since.
+        """
+        return self._get_mapping()["pk"]
+
+    def get_pk(self, name):
+        """Returns the pk of a row given its name"""
+        return self._lookup("name", name)
+
+    def get_pk_iexact(self, name):
+        """Returns the pk of a row given its case insensitive name"""
+        return self._lookup("iname", name.casefold())
+
+    def get_instance(self, name):
+        """Returns a model instance given its name without a query"""
+        pk = self.get_pk(name)
+        return self.model.from_db(None, ["id", "name"], [pk, name])
+
+
+# Registry of EnumCache instances by model
+_enum_caches = {}
+_enum_caches_lock = threading.Lock()
+
+
+def get_enum_cache(model):
+    """Returns the process-wide EnumCache of an EnumModel subclass"""
+    try:
+        return _enum_caches[model]
+    except KeyError:
+        with _enum_caches_lock:
+            return _enum_caches.setdefault(model, EnumCache(model))
+
+
+def clear_enum_caches():
+    """Discards the cached mappings of every EnumCache in the current process"""
+    for cache in list(_enum_caches.values()):
+        cache.clear()
@@ -0,0 +1,77 @@
+import collections
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, transaction
+
+from govgrant.api.filters import filter_households, has_age_range, household_matches, parse_criteria, today
+from govgrant.api.models import FamilyMember, Grant, GrantEligibility, Household
+
+
+# Aggregates of a household read by household_matches()
+HOUSEHOLD_FIELDS = (
+    "pk", "housing_type_id", "total_income", "member_count", "married_pair_count", "youngest_dob", "oldest_dob",
+)
+
+
+def refresh_grant(grant):
+    """
+    Recomputes the eligible households of a grant with a single
+    INSERT ... SELECT over the household aggregates.
+    """
+    households = filter_households(Household.objects.order_by(), grant.params()).values("pk")
+    with transaction.atomic():
+        GrantEligibility.objects.filter(grant=grant).delete()
+        try:
+            sql, params = households.query.sql_with_params()
+        except EmptyResultSet:
+            pass
+        else:
+            qn = connection.ops.quote_name
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO %s (%s, %s) SELECT %%s, eligible.%s FROM (%s) eligible" % (
+                        qn(GrantEligibility._meta.db_table), qn("grant_id"), qn("household_id"), qn("id"), sql,
+                    ),
+                    (grant.pk, *params),
+                )
+        grant.computed_on = today()
+        Grant.objects.filter(pk=grant.pk).update(computed_on=grant.computed_on)
+
+
+def refresh_stale_grant(grant):
+    """Recomputes the eligible households of a grant unless computed today"""
+    if grant.computed_on != today():
+        refresh_grant(grant)
+
+
+def refresh_households(households):
+    """
+    Recomputes the grants that the households of a queryset are
+    eligible for, evaluating the criteria of every computed grant
+    against the aggregates of each household in Python, and against
+    the dates of birth of its members for ranges of ages.
+    """
+    grants = [
+        (grant.pk, parse_criteria(grant.params()))
+        for grant in Grant.objects.filter(computed_on__isnull=False)
+    ]
+    if not grants:
+        return
+    households = list(households.values(*HOUSEHOLD_FIELDS))
+    if any(has_age_range(criteria) for _, criteria in grants):
+        dobs = collections.defaultdict(list)
+        members = FamilyMember.objects.filter(household__in=[household["pk"] for household in households])
+        for household_id, dob in members.values_list("household", "dob"):
+            dobs[household_id].append(dob)
+        for household in households:
+            household["dobs"] = dobs[household["pk"]]
+    eligibilities = [
+        GrantEligibility(grant_id=grant_pk, household_id=household["pk"])
+        for household in households
+        for grant_pk, criteria in grants
+        if household_matches(household, criteria)
+    ]
+    # Household writes are already atomic, so avoid a savepoint
+    with transaction.atomic(savepoint=False):
+        GrantEligibility.objects.filter(household__in=[household["pk"] for household in households]).delete()
+        GrantEligibility.objects.bulk_create(eligibilities)
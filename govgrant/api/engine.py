@@ -0,0 +1,214 @@
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.expressions import RawSQL
+
+from govgrant.api.models import Household, FamilyMember
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+# Sentinel day ordinal of a missing date of birth
+NO_DOB = -1
+
+
+class ColumnarEngine:
+    """
+    In-memory columnar snapshot of households for grant eligibility
+
+    The snapshot holds one NumPy array per column: the id, housing
+    type and total income of every household sorted by id, and the
+    date of birth (as a day ordinal) and spouse flag of every member
+    grouped by household in the same order. Criteria are evaluated
+    with vectorized masks, reducing member-level masks into one value
+    per household over each household's segment of the member arrays.
+
+    The snapshot is loaded on first use. Households whose aggregates
+    are refreshed, or which are saved or deleted, are marked as dirty
+    and only their rows are reloaded before the next evaluation. The
+    whole snapshot is reloaded every ``ELIGIBILITY_ENGINE_TTL`` seconds
+    to pick up changes made by other processes.
+    """
+
+    # Number of dirty households above which the snapshot is reloaded
+    max_dirty = 10000
+
+    def __init__(self):
+        if np is None:
+            raise ImproperlyConfigured("The columnar eligibility engine requires numpy to be installed.")
+        self._lock = threading.RLock()
+        self._columns = None
+        self._dirty = set()
+        self._loaded_at = 0.0
+
+    @property
+    def loaded(self):
+        return self._columns is not None
+
+    def clear(self):
+        """Discards the snapshot"""
+        with self._lock:
+            self._columns = None
+            self._dirty = set()
+
+    def mark_dirty(self, household_ids):
+        """Marks households to be reloaded before the next evaluation"""
+        with self._lock:
+            if self._columns is not None:
+                self._dirty.update(household_ids)
+
+    def load(self):
+        """Loads the snapshot of every household"""
+        columns = self._fetch(Household.objects.all(), FamilyMember.objects.all())
+        with self._lock:
+            self._columns = columns
+            self._dirty = set()
+            self._loaded_at = time.monotonic()
+
+    def refresh(self):
+        """Reloads the dirty households, or the whole snapshot if stale"""
+        with self._lock:
+            stale = time.monotonic() - self._loaded_at >= settings.ELIGIBILITY_ENGINE_TTL
+            if self._columns is None or stale or len(self._dirty) > self.max_dirty:
+                self.load()
+            elif self._dirty:
+                dirty, self._dirty = self._dirty, set()
+                update = self._fetch(
+                    Household.objects.filter(pk__in=dirty),
+                    FamilyMember.objects.filter(household__in=dirty),
+                )
+                self._columns = self._merge(self._columns, update, np.fromiter(dirty, dtype=np.int64))
+
+    def _fetch(self, households, members):
+        # Read from the primary database, since dirty households must
+        # not be reloaded from a replica lagging behind
+        households = households.using(DEFAULT_DB_ALIAS)
+        households = list(households.order_by("pk").values_list("pk", "housing_type_id", "total_income"))
+        members = list(
+            members.using(DEFAULT_DB_ALIAS).filter(household__isnull=False)
+            .order_by("household_id", "pk")
+            .values_list("household_id", "dob", "pk", "spouse_id", "spouse__household_id")
+        )
+        ids = np.array([row[0] for row in households], dtype=np.int64)
+        member_households = np.array([row[0] for row in members], dtype=np.int64)
+        return {
+            "id": ids,
+            "housing_type": np.array([row[1] for row in households], dtype=np.int64),
+            "income": np.array([row[2] for row in households], dtype=np.int64),
+            "member_household": member_households,
+            "dob": np.array(
+                [NO_DOB if row[1] is None else row[1].toordinal() for row in members], dtype=np.int64,
+            ),
+            # Spouse is a member of the same household, counted once per pair
+            "spouse": np.array(
+                [row[4] == row[0] and row[2] < row[3] for row in members], dtype=bool,
+            ),
+            "start": np.searchsorted(member_households, ids),
+            "count": np.searchsorted(member_households, ids, side="right") - np.searchsorted(member_households, ids),
+        }
+
+    def _merge(self, columns, update, dirty):
+        """Replaces the rows of dirty households with updated ones"""
+        keep = ~np.isin(columns["id"], dirty)
+        keep_members = ~np.isin(columns["member_household"], dirty)
+        ids = np.concatenate([columns["id"][keep], update["id"]])
+        order = np.argsort(ids, kind="stable")
+        member_households = np.concatenate([columns["member_household"][keep_members], update["member_household"]])
+        member_order = np.argsort(member_households, kind="stable")
+
+        merged = {
+            key: np.concatenate([columns[key][keep], update[key]])[order]
+            for key in ("id", "housing_type", "income")
+        }
+        merged.update({
+            key: np.concatenate([columns[key][keep_members], update[key]])[member_order]
+            for key in ("member_household", "dob", "spouse")
+        })
+        merged["start"] = np.searchsorted(merged["member_household"], merged["id"])
+        merged["count"] = np.searchsorted(merged["member_household"], merged["id"], side="right") - merged["start"]
+        return merged
+
+    def _any_member(self, columns, member_mask):
+        """Reduces a mask of members into a mask of households having any match"""
+        result = np.zeros(len(columns["id"]), dtype=bool)
+        nonempty = columns["count"] > 0
+        if member_mask.size:
+            result[nonempty] = np.logical_or.reduceat(member_mask, columns["start"][nonempty])
+        return result
+
+    def evaluate(self, criteria):
+        """
+        Returns a sorted array of the ids of the households matching
+        the criteria returned by ``filters.parse_criteria()``.
+        """
+        self.refresh()
+        columns = self._columns
+        mask = np.ones(len(columns["id"]), dtype=bool)
+
+        if "min_income" in criteria:
+            mask &= columns["income"] > criteria["min_income"]
+        if "max_income" in criteria:
+            mask &= columns["income"] < criteria["max_income"]
+        if "min_income" in criteria or "max_income" in criteria:
+            mask &= columns["count"] > 0
+        # A single member must be within the range of ages when both are given
+        dob = columns["dob"]
+        ages = np.ones(len(dob), dtype=bool)
+        if "born_before" in criteria:
+            ages &= (dob != NO_DOB) & (dob < criteria["born_before"].toordinal())
+        if "born_after" in criteria:
+            ages &= dob > criteria["born_after"].toordinal()
+        if "born_before" in criteria or "born_after" in criteria:
+            mask &= self._any_member(columns, ages)
+        if "housing_type_id" in criteria:
+            housing_type_id = criteria["housing_type_id"]
+            if housing_type_id is None:
+                mask[:] = False
+            else:
+                mask &= columns["housing_type"] == housing_type_id
+        if criteria.get("with_spouse"):
+            mask &= self._any_member(columns, columns["spouse"])
+
+        return columns["id"][mask]
+
+
+# Process-wide engine, created on first use
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Returns the process-wide ColumnarEngine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ColumnarEngine()
+    return _engine
+
+
+def mark_dirty(household_ids):
+    """Marks households as dirty in the process-wide engine, if loaded"""
+    if _engine is not None and _engine.loaded:
+        _engine.mark_dirty(household_ids)
+
+
+def filter_ids(queryset, ids):
+    """
+    Filters a queryset by an array of primary keys.
+
+    On SQLite, the keys are passed as a single JSON parameter so
+    that the number of keys is not limited by the maximum number
+    of query parameters.
+    """
+    ids = [int(pk) for pk in ids]
+    if connections[queryset.db].vendor == "sqlite":
+        return queryset.filter(pk__in=RawSQL("SELECT value FROM json_each(%s)", (json.dumps(ids),)))
+    return queryset.filter(pk__in=ids)
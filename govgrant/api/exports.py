@@ -0,0 +1,116 @@
+import csv
+import io
+import zlib
+
+from govgrant.api import streaming
+from govgrant.api.cache import get_enum_cache
+from govgrant.api.models import FamilyMember, Gender, HousingType, MaritalStatus, OccupationType
+
+
+# Columns of a row per household, read from the aggregates of households
+HOUSEHOLD_COLUMNS = ("household", "housing_type", "member_count", "total_income")
+
+# Columns of a row per member, with the household of the member
+MEMBER_COLUMNS = (
+    "household",
+    "housing_type",
+    "name",
+    "gender",
+    "marital_status",
+    "spouse",
+    "occupation_type",
+    "annual_income",
+    "dob",
+)
+
+# Columns of each kind of row that may be exported
+COLUMNS = {
+    "households": HOUSEHOLD_COLUMNS,
+    "members": MEMBER_COLUMNS,
+}
+
+
+def iter_household_rows(queryset, chunk_size):
+    """
+    Iterates over the rows of households in chunks, reading a
+    chunk of households with a single query.
+    """
+    housing_types = get_enum_cache(HousingType)
+    values = queryset.values("id", "housing_type", "member_count", "total_income")
+    for chunk in streaming.iter_chunks(values, chunk_size):
+        yield [
+            (row["id"], housing_types.get_name(row["housing_type"]), row["member_count"], row["total_income"])
+            for row in chunk
+        ]
+
+
+def iter_member_rows(queryset, chunk_size):
+    """
+    Iterates over the rows of the members of households in chunks
+    of households, reading the members of a chunk of households
+    with a single query. Rows of the same household are consecutive.
+    """
+    housing_types, genders, marital_statuses, occupation_types = (
+        get_enum_cache(model) for model in (HousingType, Gender, MaritalStatus, OccupationType)
+    )
+    for chunk in streaming.iter_pk_chunks(queryset, chunk_size):
+        members = FamilyMember.objects.filter(household__in=chunk).order_by("household", "pk").values_list(
+            "household", "household__housing_type", "name", "gender", "marital_status", "spouse__name",
+            "occupation_type", "annual_income", "dob",
+        )
+        yield [
+            (
+                household, housing_types.get_name(housing_type), name, genders.get_name(gender),
+                marital_statuses.get_name(marital_status), spouse, occupation_types.get_name(occupation_type),
+                income, dob.isoformat(),
+            )
+            for household, housing_type, name, gender, marital_status, spouse, occupation_type, income, dob in members
+        ]
+
+
+def iter_rows(queryset, rows, chunk_size):
+    """
+    Iterates over the rows of the given kind (``households`` or
+    ``members``) of the households of a queryset in chunks, so that
+    only a chunk of households is held in memory at any one time.
+    """
+    if rows == "members":
+        return iter_member_rows(queryset, chunk_size)
+    return iter_household_rows(queryset, chunk_size)
+
+
+def iter_csv(chunks, columns):
+    """
+    Encodes chunks of rows as CSV with a header of the given
+    columns, yielding the bytes of one chunk at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def iter_gzip(chunks):
+    """Compresses chunks of bytes in the gzip format as they are iterated"""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_csv(queryset, rows="households", chunk_size=2000, compress=False):
+    """
+    Exports the households of a queryset as CSV, with a row per
+    household or per member given by ``rows``, yielding the bytes
+    of one chunk of households at a time, gzip compressed if
+    ``compress`` is true.
+    """
+    content = iter_csv(iter_rows(queryset, rows, chunk_size), COLUMNS[rows])
+    return iter_gzip(content) if compress else content
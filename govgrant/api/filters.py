@@ -0,0 +1,187 @@
+import datetime
+import operator
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+from govgrant.api import engine
+from govgrant.api.cache import get_enum_cache
+from govgrant.api.models import FamilyMember, HousingType
+
+
+# Eligibility criteria of the grants documented in README.md,
+# expressed as query parameters of the /households/ endpoint
+GRANT_PARAMS = {
+    "Student Encouragement Bonus": {"max_age": 16, "max_income": 150000},
+    "Family Togetherness Scheme": {"with_spouse": True, "max_age": 18},
+    "Elder Bonus": {"housing_type": "hdb", "min_age": 50},
+    "Baby Sunshine Grant": {"max_age": 5},
+    "YOLO GST Grant": {"housing_type": "hdb", "max_income": 100000},
+}
+
+
+# Query parameters of the /households/ endpoint read by parse_criteria()
+FILTER_PARAMS = ("min_income", "max_income", "min_age", "max_age", "housing_type", "with_spouse")
+
+
+def today():
+    """Returns the current date against which ages are computed"""
+    return datetime.date.today()
+
+
+def age_cutoff(age):
+    """Returns the date of birth of someone who is ``age`` years old today"""
+
+    # TODO: Using timedelta is not accurate because it does not
+    # take leap years into consideration. Consider using the
+    # dateutil.relativedelta module instead.
+    return today() - datetime.timedelta(days=int(age) * 365)
+
+
+def is_given(value):
+    """Returns whether a query parameter is given, which it is when 0"""
+    return value is not None and value != ""
+
+
+def parse_criteria(params):
+    """
+    Returns the grant eligibility criteria given as a mapping of
+    query parameters, normalized into a dict with any of the keys:
+
+    - ``min_income`` and ``max_income``: exclusive bounds of the
+      total household income
+    - ``born_before``: some member is born before this date (min_age)
+    - ``born_after``: some member is born after this date (max_age),
+      which must be the same member when both are given
+    - ``housing_type_id``: pk of the housing type, or None if the
+      given housing type does not exist
+    - ``with_spouse``: household has a married couple
+    """
+
+    # Construct criteria
+    criteria = {}
+
+    # Criteria based on aggregate household income
+    min_income = params.get('min_income')
+    if is_given(min_income):
+        criteria["min_income"] = int(min_income)
+    max_income = params.get('max_income')
+    if is_given(max_income):
+        criteria["max_income"] = int(max_income)
+
+    # Criteria based on members' age
+    min_age = params.get('min_age')
+    if is_given(min_age):
+        criteria["born_before"] = age_cutoff(min_age)
+    max_age = params.get('max_age')
+    if is_given(max_age):
+        criteria["born_after"] = age_cutoff(max_age)
+
+    # Criteria based on housing type
+    # NOTE: Uses case insensitive match, which is resolved through
+    # the EnumCache so that the indexed foreign key can be used
+    housing_type = params.get('housing_type')
+    if housing_type:
+        try:
+            criteria["housing_type_id"] = get_enum_cache(HousingType).get_pk_iexact(housing_type)
+        except KeyError:
+            criteria["housing_type_id"] = None
+
+    # Criteria based on having a married couple, i.e. both
+    # spouses are members of the same household
+    if params.get('with_spouse'):
+        criteria["with_spouse"] = True
+
+    return criteria
+
+
+# Lookups of each criterion against the aggregates of a household
+CRITERIA_LOOKUPS = {
+    "min_income": ("total_income", "gt"),
+    "max_income": ("total_income", "lt"),
+    "born_before": ("oldest_dob", "lt"),
+    "born_after": ("youngest_dob", "gt"),
+    "housing_type_id": ("housing_type_id", "exact"),
+    "with_spouse": ("married_pair_count", "gte"),
+}
+
+# Operators of each lookup, which never match a missing value
+LOOKUP_OPERATORS = {
+    "exact": operator.eq,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+}
+
+
+def criteria_lookups(criteria):
+    """Yields the (field, lookup, value) of each criterion"""
+    for key, value in criteria.items():
+        field, lookup = CRITERIA_LOOKUPS[key]
+        if key == "with_spouse":
+            value = 1
+        yield field, lookup, value
+
+    # Households without members have no income to compare, even
+    # though their total income is maintained as 0
+    if "min_income" in criteria or "max_income" in criteria:
+        yield "member_count", "gt", 0
+
+
+def has_age_range(criteria):
+    """Returns whether criteria require a member within a range of ages"""
+    return "born_before" in criteria and "born_after" in criteria
+
+
+def filter_households(queryset, params):
+    """
+    Filters eligible households against the grant eligibility
+    criteria given as a mapping of query parameters.
+
+    The filters use the aggregates maintained on each household,
+    so an age filter matches when any member is older (min_age)
+    or younger (max_age) than the given age. When both are given,
+    a single member must be within the range of ages, which is
+    checked by an EXISTS subquery over the members of the
+    households matching the aggregates.
+    """
+    criteria = parse_criteria(params)
+    if "housing_type_id" in criteria and criteria["housing_type_id"] is None:
+        return queryset.none()
+    filters = {f"{field}__{lookup}": value for field, lookup, value in criteria_lookups(criteria)}
+    queryset = queryset.filter(**filters)
+    if has_age_range(criteria):
+        queryset = queryset.filter(Exists(FamilyMember.objects.filter(
+            household=OuterRef("pk"), dob__lt=criteria["born_before"], dob__gt=criteria["born_after"],
+        )))
+    return queryset
+
+
+def filter_eligible_households(queryset, params):
+    """
+    Filters eligible households like ``filter_households()``, or
+    against the in-memory snapshot of the columnar engine when the
+    ``ELIGIBILITY_ENGINE`` setting is ``columnar``.
+    """
+    if settings.ELIGIBILITY_ENGINE != "columnar":
+        return filter_households(queryset, params)
+    criteria = parse_criteria(params)
+    if not criteria:
+        return queryset
+    return engine.filter_ids(queryset, engine.get_engine().evaluate(criteria))
+
+
+def household_matches(household, criteria):
+    """
+    Returns whether a household, given as a dict of its aggregates,
+    matches criteria returned by ``parse_criteria()`` in the same
+    way as ``filter_households()``. The dict also holds the dates of
+    birth of its members as ``dobs`` if ``has_age_range(criteria)``.
+    """
+    for field, lookup, value in criteria_lookups(criteria):
+        actual = household[field]
+        if actual is None or value is None or not LOOKUP_OPERATORS[lookup](actual, value):
+            return False
+    if has_age_range(criteria):
+        return any(criteria["born_after"] < dob < criteria["born_before"] for dob in household["dobs"])
+    return True
@@ -0,0 +1,118 @@
+import datetime
+import math
+import random
+
+
+# Relative frequencies of housing types
+HOUSING_TYPES = (
+    ("HDB", 78),
+    ("Condominium", 16),
+    ("Landed", 6),
+)
+
+# Relative frequencies of household compositions
+COMPOSITIONS = (
+    ("single", 12),
+    ("elder", 10),
+    ("couple", 18),
+    ("family", 45),
+    ("single_parent", 8),
+    ("three_generation", 7),
+)
+
+# Median and spread of the annual income of employed members
+MEDIAN_INCOME = 42000
+INCOME_SIGMA = 0.6
+
+
+class HouseholdGenerator:
+    """
+    Generates synthetic households in the shape returned by the API
+
+    The same seed always generates the same households relative to
+    the ``as_of`` date. Households are composed of singles, elders,
+    couples, families with children, single parents or three
+    generations, with spouses married to each other. Members are
+    named after a prefix and the number of their household, counted
+    from ``start``, so that names stay unique for a given prefix.
+    """
+
+    def __init__(self, seed=0, as_of=None, prefix="Resident", start=0):
+        self.random = random.Random(seed)
+        self.as_of = as_of or datetime.date.today()
+        self.prefix = prefix
+        self.count = start
+
+    def choice(self, weighted):
+        values, weights = zip(*weighted)
+        return self.random.choices(values, weights=weights)[0]
+
+    def generate(self, count):
+        """Yields a number of households"""
+        for _ in range(count):
+            self.count += 1
+            yield {
+                "housing_type": self.choice(HOUSING_TYPES),
+                "members": self.members(self.choice(COMPOSITIONS)),
+            }
+
+    def members(self, composition):
+        """Returns the members of a household of a given composition"""
+        rand = self.random
+        if composition == "single":
+            return [self.member(1, rand.randint(21, 64))]
+        if composition == "elder":
+            return [self.member(1, rand.randint(65, 95), marital_status=self.choice((("Single", 1), ("Widowed", 3))))]
+
+        if composition == "single_parent":
+            parent_age = rand.randint(25, 55)
+            members = [self.member(1, parent_age, marital_status=self.choice((("Divorced", 2), ("Widowed", 1))))]
+        else:
+            parent_age = rand.randint(30, 55) if composition == "three_generation" else rand.randint(25, 60)
+            members = self.couple(1, parent_age)
+        if composition == "couple":
+            return members
+
+        for _ in range(rand.choices((1, 2, 3, 4), weights=(35, 45, 15, 5))[0]):
+            members.append(self.member(len(members) + 1, max(parent_age - rand.randint(22, 40), 0)))
+        if composition == "three_generation":
+            elder_age = parent_age + rand.randint(22, 35)
+            if rand.random() < 0.5:
+                members.extend(self.couple(len(members) + 1, elder_age))
+            else:
+                members.append(self.member(len(members) + 1, elder_age, marital_status="Widowed"))
+        return members
+
+    def couple(self, number, age):
+        """Returns two members married to each other"""
+        first = self.member(number, age, gender="Male", marital_status="Married")
+        second = self.member(
+            number + 1, max(age + self.random.randint(-5, 5), 21), gender="Female", marital_status="Married",
+        )
+        first["spouse"], second["spouse"] = second["name"], first["name"]
+        return [first, second]
+
+    def member(self, number, age, gender=None, marital_status="Single"):
+        """Returns a member of a given age with a realistic occupation and income"""
+        rand = self.random
+        dob = self.as_of - datetime.timedelta(days=age * 365 + rand.randint(0, 364))
+        if age < 18:
+            occupation_type = "Student"
+        elif age < 25:
+            occupation_type = self.choice((("Student", 60), ("Employed", 35), ("Unemployed", 5)))
+        elif age < 65:
+            occupation_type = self.choice((("Employed", 88), ("Unemployed", 12)))
+        else:
+            occupation_type = self.choice((("Employed", 25), ("Unemployed", 75)))
+        income = 0
+        if occupation_type == "Employed":
+            income = int(round(rand.lognormvariate(math.log(MEDIAN_INCOME), INCOME_SIGMA), -2))
+        return {
+            "name": f"{self.prefix} {self.count}-{number}",
+            "gender": gender or self.choice((("Male", 49), ("Female", 50), ("Non-binary", 1))),
+            "marital_status": marital_status,
+            "spouse": None,
+            "occupation_type": occupation_type,
+            "annual_income": income,
+            "dob": dob.isoformat(),
+        }
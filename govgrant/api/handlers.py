@@ -0,0 +1,99 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core import signals
+from django.core.exceptions import RequestAborted
+from django.core.handlers.asgi import ASGIHandler
+from django.urls import set_script_prefix
+
+
+class ThreadPoolASGIHandler(ASGIHandler):
+    """
+    ASGI handler running the synchronous part of each request on a
+    bounded thread pool
+
+    Django 3.0 has no async views, so the stock ASGIHandler runs each
+    view on the default executor and closes the response on the event
+    loop thread, where ``request_finished`` cannot close the database
+    connection opened by the worker thread. This handler runs middleware,
+    the view, rendering and ``request_finished`` together on a pool of
+    ``ASGI_THREADS`` threads, so that each thread holds at most one
+    database connection, while the event loop only reads request bodies
+    and sends rendered responses. Streaming responses are iterated on
+    the pool one chunk at a time.
+    """
+
+    def __init__(self, max_workers=None):
+        super().__init__()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.ASGI_THREADS,
+            thread_name_prefix="asgi",
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            raise ValueError(
+                'Django can only handle ASGI/HTTP connections, not %s.'
+                % scope['type']
+            )
+        try:
+            body_file = await self.read_body(receive)
+        except RequestAborted:
+            return
+        loop = asyncio.get_event_loop()
+        response = await loop.run_in_executor(self.executor, self.get_response_sync, scope, body_file)
+        await self.send_response(response, send)
+
+    def get_response_sync(self, scope, body_file):
+        """Returns the rendered response to a request"""
+        set_script_prefix(self.get_script_prefix(scope))
+        signals.request_started.send(sender=self.__class__, scope=scope)
+        request, response = self.create_request(scope, body_file)
+        if request is not None:
+            response = self.get_response(request)
+        response._handler_class = self.__class__
+        if not response.streaming:
+            response.close()
+        return response
+
+    async def send_response(self, response, send):
+        """Sends a response, iterating streaming responses on the pool"""
+        headers = [
+            (str(header).encode('ascii'), str(value).encode('latin1'))
+            for header, value in response.items()
+        ]
+        headers.extend(
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+            for cookie in response.cookies.values()
+        )
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': headers,
+        })
+        if not response.streaming:
+            for chunk, last in self.chunk_bytes(response.content):
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': not last,
+                })
+            return
+
+        loop = asyncio.get_event_loop()
+        parts = iter(response)
+        try:
+            while True:
+                part = await loop.run_in_executor(self.executor, next, parts, None)
+                if part is None:
+                    break
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            await send({'type': 'http.response.body'})
+        finally:
+            await loop.run_in_executor(self.executor, response.close)
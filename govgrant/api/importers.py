@@ -0,0 +1,241 @@
+import csv
+import itertools
+import json
+import time
+
+from django.db import connection, transaction
+from django.utils.dateparse import parse_date
+
+from govgrant.api.cache import get_enum_cache
+from govgrant.api.models import HousingType, Household, Gender, MaritalStatus, OccupationType, FamilyMember
+
+
+class HouseholdImportError(Exception):
+    """Raised when a record cannot be imported"""
+    pass
+
+
+def read_jsonl(file):
+    """
+    Yields households from a file of newline delimited JSON, where
+    each line is a household in the same shape as the API returns.
+    """
+    for line in file:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def read_csv(file):
+    """
+    Yields households from a CSV file of members, where each row is
+    a member with an additional ``household`` key and ``housing_type``
+    column. Rows of the same household must be consecutive.
+    """
+    rows = csv.DictReader(file)
+    for _, members in itertools.groupby(rows, key=lambda row: row["household"]):
+        members = list(members)
+        yield {
+            "housing_type": members[0]["housing_type"],
+            "members": members,
+        }
+
+
+def insert_rows_returning_pks(model, columns, rows, batch_size=1000):
+    """
+    Inserts rows of column values into the table of a model within a
+    transaction, and returns the pks that the database assigned to
+    them, in order. Rows are inserted with prepared statements, which
+    avoids instantiating and compiling a model instance per row.
+
+    Databases that can return rows from a bulk insert return the
+    pks from multi-row INSERT statements, as ``bulk_create()`` does.
+    Otherwise (SQLite), the pks are the last ones of the table: the
+    transaction holds the write lock of the database from its first
+    INSERT, and pks are allocated in increasing order.
+    """
+    qn = connection.ops.quote_name
+    table, pk_column = qn(model._meta.db_table), qn(model._meta.pk.column)
+    pks = []
+    with connection.cursor() as cursor:
+        if not connection.features.can_return_rows_from_bulk_insert:
+            cursor.executemany(insert_sql(model, columns), rows)
+            cursor.execute(f"SELECT {pk_column} FROM {table} ORDER BY {pk_column} DESC LIMIT %s", [len(rows)])
+            pks.extend(reversed([pk for pk, in cursor.fetchall()]))
+            return pks
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            cursor.execute(
+                f"{insert_sql(model, columns, len(batch))} RETURNING {pk_column}",
+                [value for row in batch for value in row],
+            )
+            pks.extend(pk for pk, in cursor.fetchall())
+    return pks
+
+
+def insert_sql(model, columns, rows=1):
+    """Returns an INSERT statement of a number of rows of column values"""
+    qn = connection.ops.quote_name
+    values = "(%s)" % ", ".join(["%s"] * len(columns))
+    return "INSERT INTO %s (%s) VALUES %s" % (
+        qn(model._meta.db_table),
+        ", ".join(qn(column) for column in columns),
+        ", ".join([values] * rows),
+    )
+
+
+def update_spouses(links):
+    """Sets the spouses of members, given as (spouse pk, member pk), with a single prepared UPDATE"""
+    qn = connection.ops.quote_name
+    sql = "UPDATE %s SET %s = %%s WHERE %s = %%s" % (
+        qn(FamilyMember._meta.db_table), qn("spouse_id"), qn(FamilyMember._meta.pk.column),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, links)
+
+
+def member_pks(names, batch_size=500):
+    """Returns the pks of the members of the given names, by name"""
+    names = list(names)
+    pks = {}
+    for i in range(0, len(names), batch_size):
+        pks.update(FamilyMember.objects.using(connection.alias).filter(name__in=names[i:i + batch_size]).values_list("name", "pk"))
+    return pks
+
+
+class HouseholdImporter:
+    """
+    Imports households and their members in bulk
+
+    Households are consumed from an iterable in chunks. Each chunk
+    is imported in its own transaction, with primary keys assigned
+    by the database: households are inserted in bulk and their pks
+    read back with ``insert_rows_returning_pks()``, and members with
+    a single prepared INSERT, after which their pks are read back by
+    name. Enumerated values are
+    resolved through the EnumCache. Spouses are then linked by name
+    and the aggregates of the households are refreshed before the
+    transaction commits, so that every committed household is
+    complete and consistent. Links are mirrored onto spouses by
+    triggers, or by ``mirror_spouses()`` on databases without them.
+
+    A spouse imported in a later chunk is linked once that chunk is
+    imported, refreshing the aggregates of both households. Spouses
+    still unknown once every chunk is imported fail the import, in
+    which case the members referring to them are left unmarried.
+    """
+
+    household_columns = (
+        "housing_type_id",
+        "total_income", "member_count", "married_pair_count", "youngest_dob", "oldest_dob",
+    )
+    member_columns = (
+        "name", "dob", "gender_id", "marital_status_id", "spouse_id",
+        "occupation_type_id", "annual_income", "household_id",
+    )
+
+    def __init__(self, chunk_size=1000, progress=None):
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.households = 0
+        self.members = 0
+        self.elapsed = 0.0
+
+        # Pending (member pk, household pk, spouse name) links of
+        # spouses which are not imported yet
+        self._spouses = []
+
+    @property
+    def rows_per_second(self):
+        rows = self.households + self.members
+        return rows / self.elapsed if self.elapsed else 0.0
+
+    def run(self, households):
+        """Imports an iterable of households"""
+        start = time.perf_counter()
+        chunk = []
+        for number, household in enumerate(households, start=1):
+            chunk.append((number, household))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        self.elapsed = time.perf_counter() - start
+        if self._spouses:
+            missing = sorted({name for _, _, name in self._spouses})
+            raise HouseholdImportError(f"Unknown spouse(s): {', '.join(missing)}")
+
+    def import_chunk(self, chunk):
+        """Inserts a chunk of households and their members, linking their spouses"""
+        households, members = [], []
+        for number, data in chunk:
+            try:
+                households.append(self.build_household(data))
+                for member in data.get("members") or ():
+                    members.append((len(households) - 1, *self.build_member(member)))
+            except (KeyError, TypeError, ValueError) as e:
+                raise HouseholdImportError(f"Household {number}: invalid value {e}") from e
+
+        with transaction.atomic():
+            pks = insert_rows_returning_pks(Household, self.household_columns, households)
+            member_pks = insert_rows_returning_pks(FamilyMember, self.member_columns, [
+                (*row, pks[household]) for household, row, _ in members
+            ])
+            self.link_spouses([
+                (pk, name, pks[household], spouse)
+                for pk, (household, (name, *_), spouse) in zip(member_pks, members)
+            ])
+
+        self.households += len(households)
+        self.members += len(members)
+        if self.progress:
+            self.progress(self)
+
+    def build_household(self, data):
+        housing_type_id = get_enum_cache(HousingType).get_pk(data["housing_type"])
+        return (housing_type_id, 0, 0, 0, None, None)
+
+    def build_member(self, data):
+        """Returns the column values of a member, but its household, and its spouse's name"""
+        dob = parse_date(data["dob"])
+        if dob is None:
+            raise ValueError(repr(data["dob"]))
+        row = (
+            data["name"],
+            dob.isoformat(),
+            get_enum_cache(Gender).get_pk(data["gender"]),
+            get_enum_cache(MaritalStatus).get_pk(data["marital_status"]),
+            None,
+            get_enum_cache(OccupationType).get_pk(data["occupation_type"]),
+            int(data["annual_income"]),
+        )
+        return row, data.get("spouse") or None
+
+    def link_spouses(self, members):
+        """
+        Links the spouses of the inserted members, given as (pk, name,
+        household pk, spouse name), and of the pending members whose
+        spouse is now known, then refreshes the aggregates of their
+        households. Spouses which are still unknown are kept pending.
+        """
+        pks = {name: pk for pk, name, _, _ in members}
+        names = {spouse for _, _, spouse in self._spouses}
+        names.update(spouse for _, _, _, spouse in members if spouse and spouse not in pks)
+        pks.update(member_pks(names))
+        pending = self._spouses + [(pk, household, spouse) for pk, _, household, spouse in members if spouse]
+        links, self._spouses = {}, []
+        for pk, household, spouse in pending:
+            if spouse in pks:
+                links[pk] = (household, pks[spouse])
+            else:
+                self._spouses.append((pk, household, spouse))
+
+        # Couples linked to each other are updated once, since triggers
+        # mirror the link onto the other spouse
+        couples = {(pk, spouse) for pk, (_, spouse) in links.items() if spouse > pk}
+        update_spouses([(spouse, pk) for pk, (_, spouse) in links.items() if (spouse, pk) not in couples])
+        FamilyMember.objects.mirror_spouses((pk, spouse) for pk, (_, spouse) in links.items())
+        households = {household for _, _, household, _ in members}
+        households.update(household for household, _ in links.values())
+        Household.objects.filter(pk__in=households).refresh_aggregates()
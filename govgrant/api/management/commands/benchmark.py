@@ -0,0 +1,148 @@
+import datetime
+import json
+import os
+import platform
+import subprocess
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from govgrant.api.benchmarks import BenchmarkSuite
+from govgrant.api.generators import HouseholdGenerator
+from govgrant.api.importers import HouseholdImporter
+from govgrant.api.models import Household
+
+
+def get_commit():
+    """Returns the current git commit, if any"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, check=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the grant queries, list/retrieve and add_member/remove_member "
+        "endpoints against generated datasets of increasing sizes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10000,100000,1000000",
+            help="Comma separated numbers of households to benchmark at.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Number of timed requests of each scenario.",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=100,
+            help="Page size of list requests, or 0 to list every household.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the generated dataset and of the requests.",
+        )
+        parser.add_argument(
+            "--output",
+            default="benchmark.json",
+            help="Path of the JSON file the results are written to.",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Path of the JSON results of a previous run to compare against.",
+        )
+        parser.add_argument(
+            "--in-place",
+            action="store_true",
+            help="Generate households into the configured database instead of a temporary one.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted({int(size) for size in options["sizes"].split(",")})
+        except ValueError:
+            raise CommandError("--sizes must be a comma separated list of numbers.")
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                baseline = json.load(file)
+
+        results = {
+            "meta": {
+                "commit": get_commit(),
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "seed": options["seed"],
+                "repeat": options["repeat"],
+                "page_size": options["page_size"],
+            },
+            "results": {},
+        }
+        if options["in_place"]:
+            self.run(sizes, options, results["results"])
+        else:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                call_command("loaddata", os.path.join(settings.BASE_DIR, "initial.json"), verbosity=0)
+                self.run(sizes, options, results["results"])
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        with open(options["output"], "w") as file:
+            json.dump(results, file, indent=4)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        if baseline:
+            self.compare(baseline, results)
+
+    def run(self, sizes, options, results):
+        """
+        Benchmarks each size, generating the households missing from
+        the database to reach it in between.
+        """
+        generated = Household.objects.count()
+        generator = HouseholdGenerator(seed=options["seed"], prefix="Benchmark resident", start=generated)
+
+        # Responses are never served from the response cache
+        caches = {
+            **settings.CACHES,
+            settings.RESPONSE_CACHE: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        }
+        with override_settings(CACHES=caches):
+            for size in sizes:
+                HouseholdImporter().run(generator.generate(max(size - generated, 0)))
+                generated = max(size, generated)
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{size} households"))
+                suite = BenchmarkSuite(repeat=options["repeat"], page_size=options["page_size"], seed=options["seed"])
+                results[str(size)] = suite.run()
+                for name, result in results[str(size)].items():
+                    self.stdout.write(
+                        f"  {name:<40} p50 {result['p50_ms']:>9.2f} ms  p99 {result['p99_ms']:>9.2f} ms  "
+                        f"{result['queries']:>3} queries  {result['peak_memory_kb']:>9.0f} KiB"
+                    )
+
+    def compare(self, baseline, results):
+        """Writes the p50 latency of each scenario relative to a baseline"""
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Compared to {baseline['meta'].get('commit')}"))
+        for size, scenarios in results["results"].items():
+            for name, result in scenarios.items():
+                previous = baseline["results"].get(size, {}).get(name)
+                if previous and previous["p50_ms"]:
+                    ratio = result["p50_ms"] / previous["p50_ms"]
+                    self.stdout.write(f"  {size:>8} {name:<40} p50 {previous['p50_ms']:>9.2f} -> {result['p50_ms']:>9.2f} ms ({ratio:.2f}x)")
@@ -0,0 +1,101 @@
+import json
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from govgrant.api import benchmarks
+from govgrant.api.filters import GRANT_PARAMS
+from govgrant.api.handlers import ThreadPoolASGIHandler
+from govgrant.api.models import Household
+
+
+def run_handler(name, urls, requests, concurrency):
+    """Benchmarks the handler of the given name"""
+    if name == "wsgi":
+        return benchmarks.run_wsgi(WSGIHandler(), urls, requests, concurrency)
+    if name == "django-asgi":
+        return benchmarks.run_asgi(ASGIHandler(), urls, requests, concurrency)
+    handler = ThreadPoolASGIHandler()
+    try:
+        return benchmarks.run_asgi(handler, urls, requests, concurrency)
+    finally:
+        handler.executor.shutdown()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the requests/sec and latency of the household read endpoints "
+        "served in-process under WSGI and ASGI at a given concurrency."
+    )
+
+    handlers = ("wsgi", "asgi", "django-asgi")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Number of requests sent to each handler.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=64,
+            help="Number of concurrent clients.",
+        )
+        parser.add_argument(
+            "--url",
+            action="append",
+            dest="urls",
+            help="URL to request, may be repeated. Defaults to the list, retrieve and grant queries.",
+        )
+        parser.add_argument(
+            "--handler",
+            action="append",
+            dest="handlers",
+            choices=self.handlers,
+            help="Handler to benchmark, may be repeated. Defaults to all handlers.",
+        )
+        parser.add_argument(
+            "--response-cache",
+            action="store_true",
+            help="Serve responses from the response cache instead of disabling it.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Output the results as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        urls = options["urls"] or self.default_urls()
+        results = {}
+        caches = settings.CACHES
+        if not options["response_cache"]:
+            caches = {**caches, settings.RESPONSE_CACHE: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        with override_settings(CACHES=caches):
+            for name in options["handlers"] or self.handlers:
+                results[name] = run_handler(name, urls, options["requests"], options["concurrency"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=4))
+            return
+        self.stdout.write(f"{'handler':<12} {'req/s':>10} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'errors':>8}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<12} {result['requests_per_second']:>10.1f} {result['p50_ms']:>10.2f} "
+                f"{result['p90_ms']:>10.2f} {result['p99_ms']:>10.2f} {result['errors']:>8}"
+            )
+
+    def default_urls(self):
+        """Returns the URLs of the list, retrieve and grant queries"""
+        pk = Household.objects.order_by("pk").values_list("pk", flat=True).first()
+        if pk is None:
+            raise CommandError("There are no households to benchmark, load some first.")
+        urls = ["/households/", f"/households/{pk}/"]
+        urls.extend(f"/households/?{urlencode(params)}" for params in GRANT_PARAMS.values())
+        return urls
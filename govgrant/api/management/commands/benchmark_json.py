@@ -0,0 +1,67 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from govgrant.api import benchmarks, renderers
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of DRF's JSONRenderer with the standard library "
+        "and orjson encoders on generated household payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--households",
+            type=int,
+            default=10000,
+            help="Number of households in the encoded payload.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Number of times the payload is encoded by each encoder.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the random generator of households.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Output the results as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        payload = benchmarks.household_payload(options["households"], options["seed"])
+        encoders = {
+            "drf": JSONRenderer().render,
+            "stdlib": renderers.stdlib_dumps,
+        }
+        if renderers.orjson is not None:
+            encoders["orjson"] = renderers.orjson_dumps
+
+        # Every encoder must produce the same output as DRF
+        expected = encoders["drf"](payload)
+        for name, encode in encoders.items():
+            if encode(payload) != expected:
+                raise CommandError(f"The output of the {name} encoder differs from DRF's JSONRenderer.")
+
+        results = {
+            name: benchmarks.measure_encoding(encode, payload, options["repeat"])
+            for name, encode in encoders.items()
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=4))
+            return
+        self.stdout.write(f"{'encoder':<10} {'households/s':>14} {'MB/s':>10} {'p50 ms':>10}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<10} {result['households_per_second']:>14.0f} {result['mb_per_second']:>10.1f} "
+                f"{result['p50_ms']:>10.2f}"
+            )
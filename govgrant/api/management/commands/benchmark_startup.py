@@ -0,0 +1,109 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Commands run before the server starts, as the entrypoint did before
+# and does now
+STARTUP_COMMANDS = {
+    "legacy": [["migrate"], ["loaddata", "initial.json", "sample.json"]],
+    "bootstrap": [["bootstrap"]],
+}
+
+
+def free_port():
+    """Returns a TCP port that is free on the loopback interface"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def manage(*args, env, **kwargs):
+    """Runs manage.py in a new process with the given environment"""
+    command = [sys.executable, os.path.join(settings.BASE_DIR, "manage.py"), *args]
+    return subprocess.Popen(
+        command, env=env, cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs,
+    )
+
+
+def wait_until_ready(url, process, timeout):
+    """Polls a URL until it responds, failing if the server exits or times out"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"The server exited with status {process.returncode}.")
+        try:
+            with urlopen(url, timeout=1):
+                return
+        except (URLError, ConnectionError):
+            time.sleep(0.05)
+    raise CommandError(f"The server did not respond within {timeout} seconds.")
+
+
+def time_startup(mode, env, timeout):
+    """Returns the seconds until the first response of a server started in a mode"""
+    start = time.perf_counter()
+    for args in STARTUP_COMMANDS[mode]:
+        if manage(*args, env=env).wait() != 0:
+            raise CommandError(f"'manage.py {' '.join(args)}' failed.")
+    port = free_port()
+    server = manage("runserver", "--noreload", f"127.0.0.1:{port}", env=env)
+    try:
+        wait_until_ready(f"http://127.0.0.1:{port}/households/", server, timeout)
+        return time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the time until the first response of a server started after "
+        "running migrate and loaddata, and after running bootstrap, on a new "
+        "database (cold) and on an existing one (warm)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of warm starts timed for each mode.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Number of seconds to wait for the server to respond.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Output the results as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for mode in STARTUP_COMMANDS:
+                env = {**os.environ, "DATABASE_NAME": os.path.join(directory, f"{mode}.sqlite3")}
+                cold = time_startup(mode, env, options["timeout"])
+                warm = [time_startup(mode, env, options["timeout"]) for _ in range(options["repeat"])]
+                results[mode] = {"cold_s": cold, "warm_s": min(warm) if warm else None}
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=4))
+            return
+        self.stdout.write(f"{'mode':<10} {'cold s':>8} {'warm s':>8}")
+        for mode, result in results.items():
+            warm = f"{result['warm_s']:>8.2f}" if result["warm_s"] is not None else f"{'-':>8}"
+            self.stdout.write(f"{mode:<10} {result['cold_s']:>8.2f} {warm}")
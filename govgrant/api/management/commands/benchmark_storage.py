@@ -0,0 +1,153 @@
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import override_settings
+
+from govgrant.api import benchmarks
+from govgrant.api.generators import HouseholdGenerator
+from govgrant.api.importers import HouseholdImporter
+from govgrant.api.models import Household
+
+
+@contextlib.contextmanager
+def use_database(name, conn_max_age):
+    """
+    Points the default database at another SQLite file for the
+    connections opened by other threads in the block.
+
+    The connection of the current thread, if any, is left as is
+    and must not be used in the block.
+    """
+    settings_dict = connections.databases[DEFAULT_DB_ALIAS]
+    previous = settings_dict["NAME"], settings_dict["CONN_MAX_AGE"]
+    settings_dict["NAME"], settings_dict["CONN_MAX_AGE"] = name, conn_max_age
+    try:
+        yield
+    finally:
+        settings_dict["NAME"], settings_dict["CONN_MAX_AGE"] = previous
+
+
+def in_thread(function, *args):
+    """Calls a function in a new thread, closing its connections afterwards"""
+
+    def call():
+        try:
+            return function(*args)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(call).result()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of concurrent readers and writers of /households/ "
+        "on copies of a generated SQLite database under each storage profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--households",
+            type=int,
+            default=1000,
+            help="Number of households generated into the database.",
+        )
+        parser.add_argument(
+            "--readers",
+            type=int,
+            default=8,
+            help="Number of concurrent clients listing households.",
+        )
+        parser.add_argument(
+            "--writers",
+            type=int,
+            default=2,
+            help="Number of concurrent clients adding and removing members.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10,
+            help="Number of seconds each profile is benchmarked for.",
+        )
+        parser.add_argument(
+            "--profile",
+            action="append",
+            dest="profiles",
+            choices=sorted(settings.SQLITE_PROFILES),
+            help="Storage profile to benchmark, may be repeated. Defaults to every profile.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the generated dataset and of the writes.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Output the results as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        if connections[DEFAULT_DB_ALIAS].vendor != "sqlite":
+            raise CommandError("Storage profiles only apply to SQLite databases.")
+
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            template = os.path.join(directory, "template.sqlite3")
+            with use_database(template, 0), override_settings(SQLITE_PRAGMAS={}):
+                households = in_thread(self.generate, options["households"], options["seed"])
+            for profile in options["profiles"] or sorted(settings.SQLITE_PROFILES):
+                path = os.path.join(directory, f"{profile}.sqlite3")
+                shutil.copyfile(template, path)
+                results[profile] = self.run(path, profile, households, options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=4))
+            return
+        self.stdout.write(
+            f"{'profile':<10} {'reads/s':>10} {'read p99 ms':>12} {'writes/s':>10} {'write p99 ms':>13} {'errors':>8}"
+        )
+        for profile, result in results.items():
+            reads, writes = result["reads"], result["writes"]
+            self.stdout.write(
+                f"{profile:<10} {reads['requests_per_second']:>10.1f} {reads['p99_ms']:>12.2f} "
+                f"{writes['requests_per_second']:>10.1f} {writes['p99_ms']:>13.2f} "
+                f"{reads['errors'] + writes['errors']:>8}"
+            )
+
+    def generate(self, count, seed):
+        """Creates the database and returns the pks of the generated households"""
+        call_command("migrate", verbosity=0, interactive=False)
+        call_command("loaddata", os.path.join(settings.BASE_DIR, "initial.json"), verbosity=0)
+        HouseholdImporter().run(HouseholdGenerator(seed=seed, prefix="Storage resident").generate(count))
+        return list(Household.objects.values_list("pk", flat=True))
+
+    def run(self, path, profile, households, options):
+        """
+        Benchmarks a copy of the database under a profile. The 'default'
+        profile also opens a connection per request, as Django does
+        without CONN_MAX_AGE.
+        """
+        conn_max_age = 0 if profile == "default" else settings.DATABASES[DEFAULT_DB_ALIAS].get("CONN_MAX_AGE", 0)
+        caches = {
+            **settings.CACHES,
+            settings.RESPONSE_CACHE: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        }
+        with use_database(path, conn_max_age), override_settings(
+            SQLITE_PRAGMAS=settings.SQLITE_PROFILES[profile], CACHES=caches,
+        ):
+            return benchmarks.run_mixed(
+                WSGIHandler(), households, options["readers"], options["writers"], options["duration"],
+            )
@@ -0,0 +1,73 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+
+from govgrant.api.models import LoadedFixture
+
+
+def file_hash(path):
+    """Returns the SHA-256 hex digest of the content of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        "Prepares the database on startup, applying migrations and loading "
+        "fixtures only if they were not already applied or loaded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "fixtures",
+            nargs="*",
+            help="Fixtures to load. Defaults to the BOOTSTRAP_FIXTURES setting.",
+        )
+        parser.add_argument(
+            "--no-fixtures",
+            action="store_true",
+            help="Do not load any fixture.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Nominates a database to bootstrap. Defaults to the 'default' database.",
+        )
+
+    def handle(self, *args, **options):
+        database, verbosity = options["database"], options["verbosity"]
+        self.migrate(database, verbosity)
+        fixtures = [] if options["no_fixtures"] else options["fixtures"] or settings.BOOTSTRAP_FIXTURES
+        for fixture in fixtures:
+            self.load_fixture(fixture, database, verbosity)
+
+    def migrate(self, database, verbosity):
+        """Applies unapplied migrations, without running migrate otherwise"""
+        executor = MigrationExecutor(connections[database])
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if not plan:
+            self.stdout.write("No migrations to apply.")
+            return
+        call_command("migrate", database=database, interactive=False, verbosity=verbosity)
+
+    def load_fixture(self, fixture, database, verbosity):
+        """Loads a fixture unless the same content was already loaded"""
+        path = os.path.join(settings.BASE_DIR, fixture)
+        if not os.path.isfile(path):
+            raise CommandError(f"Fixture '{fixture}' does not exist.")
+        sha256 = file_hash(path)
+        name = os.path.basename(path)
+        if LoadedFixture.objects.using(database).filter(name=name, sha256=sha256).exists():
+            self.stdout.write(f"Fixture '{name}' is already loaded.")
+            return
+        with transaction.atomic(using=database):
+            call_command("loaddata", path, database=database, verbosity=verbosity)
+            LoadedFixture.objects.using(database).update_or_create(name=name, defaults={"sha256": sha256})
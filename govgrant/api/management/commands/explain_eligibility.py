@@ -0,0 +1,65 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from govgrant.api.filters import GRANT_PARAMS, filter_households
+from govgrant.api.models import Household, FamilyMember
+
+
+# Matches a query plan step that scans a whole table without an index
+FULL_SCAN_PATTERN = re.compile(r"\bSCAN (TABLE )?\w+$", re.MULTILINE)
+
+
+def explain_queries():
+    """
+    Returns the queries issued to determine and serialize eligible
+    households, keyed by a description of each query.
+    """
+    queries = {
+        f"Eligibility: {name}": filter_households(Household.objects.all(), params)
+        for name, params in GRANT_PARAMS.items()
+    }
+    queries["Members of households"] = FamilyMember.objects.filter(household__in=[1, 2, 3])
+    queries["Aggregates of household"] = Household.objects.filter(pk=1).annotate(**{
+        f"expected_{name}": expression
+        for name, expression in Household.objects.aggregate_expressions().items()
+    })
+    return queries
+
+
+class Command(BaseCommand):
+    help = "Shows the query plans and timings of the grant eligibility queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=10,
+            help="Number of times each query is timed.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail if any query plan scans a whole table without an index.",
+        )
+
+    def handle(self, *args, **options):
+        full_scans = []
+        for description, queryset in explain_queries().items():
+            plan = queryset.explain()
+            elapsed = self.time(queryset, options["repeat"])
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{description} ({elapsed * 1000:.3f} ms)"))
+            self.stdout.write(plan)
+            if FULL_SCAN_PATTERN.search(plan):
+                full_scans.append(description)
+
+        if options["check"] and full_scans:
+            raise CommandError(f"Query plans without an index: {', '.join(full_scans)}")
+
+    def time(self, queryset, repeat):
+        """Returns the average seconds taken to evaluate a queryset"""
+        start = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())
+        return (time.perf_counter() - start) / max(repeat, 1)
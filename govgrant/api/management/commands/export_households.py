@@ -0,0 +1,93 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from govgrant.api import exports
+from govgrant.api.filters import FILTER_PARAMS, filter_eligible_households
+from govgrant.api.models import Household
+
+
+def parse_filters(filters):
+    """Returns the query parameters given as a list of key=value filters"""
+    params = {}
+    for item in filters:
+        key, separator, value = item.partition("=")
+        if not separator or key not in FILTER_PARAMS:
+            raise CommandError(f"'{item}' is not a valid filter, expected one of {', '.join(FILTER_PARAMS)}=value.")
+        params[key] = value
+    return params
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports the households matching the filters of the /households/ endpoint "
+        "to a CSV file, with a row per household or per member."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="Path of the exported file, or '-' to write to stdout.",
+        )
+        parser.add_argument(
+            "--rows",
+            choices=sorted(exports.COLUMNS),
+            default="households",
+            help="Whether a row is written per household or per member. Defaults to households.",
+        )
+        parser.add_argument(
+            "--filter",
+            action="append",
+            dest="filters",
+            default=[],
+            help="Filter of the /households/ endpoint as key=value, e.g. max_income=100000. May be repeated.",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compress the file with gzip. Implied by a path ending with .gz.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of households read and written at a time.",
+        )
+
+    def handle(self, *args, **options):
+        path, rows = options["path"], options["rows"]
+        params = parse_filters(options["filters"])
+        queryset = filter_eligible_households(Household.objects.all(), params)
+
+        self.rows = 0
+        chunks = self.counted(exports.iter_rows(queryset, rows, options["chunk_size"]))
+        content = exports.iter_csv(chunks, exports.COLUMNS[rows])
+        if options["gzip"] or path.endswith(".gz"):
+            content = exports.iter_gzip(content)
+
+        if path == "-":
+            self.write(content, sys.stdout.buffer)
+            return
+        # Written to a temporary file first so that an interrupted export
+        # never leaves a truncated file at the path
+        partial = f"{path}.partial"
+        try:
+            with open(partial, "wb") as file:
+                self.write(content, file)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        self.stdout.write(self.style.SUCCESS(f"Exported {self.rows} row(s) to {path}."))
+
+    def counted(self, chunks):
+        """Counts the rows of chunks as they are iterated"""
+        for chunk in chunks:
+            self.rows += len(chunk)
+            yield chunk
+
+    def write(self, content, file):
+        for chunk in content:
+            file.write(chunk)
+        file.flush()
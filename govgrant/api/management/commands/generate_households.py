@@ -0,0 +1,70 @@
+import argparse
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from django.utils.dateparse import parse_date
+
+from govgrant.api.generators import HouseholdGenerator
+from govgrant.api.importers import HouseholdImporter, HouseholdImportError
+
+
+def date_argument(value):
+    """Parses a YYYY-MM-DD date argument"""
+    try:
+        date = parse_date(value)
+    except ValueError:
+        date = None
+    if date is None:
+        raise argparse.ArgumentTypeError(f"invalid date: '{value}'")
+    return date
+
+
+class Command(BaseCommand):
+    help = "Generates a deterministic synthetic dataset of households and their members."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "count",
+            type=int,
+            help="Number of households to generate.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the random generator, the same seed generates the same households.",
+        )
+        parser.add_argument(
+            "--as-of",
+            type=date_argument,
+            help="Date (YYYY-MM-DD) against which ages are generated. Defaults to today.",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="Resident",
+            help="Prefix of the names of generated members, which must be unique.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of households inserted and committed at a time.",
+        )
+
+    def handle(self, *args, **options):
+        generator = HouseholdGenerator(
+            seed=options["seed"],
+            as_of=options["as_of"] or datetime.date.today(),
+            prefix=options["prefix"],
+        )
+        importer = HouseholdImporter(chunk_size=options["chunk_size"])
+        try:
+            importer.run(generator.generate(options["count"]))
+        except (HouseholdImportError, IntegrityError) as e:
+            raise CommandError(f"Generation failed, try another --prefix: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {importer.households} household(s) and {importer.members} member(s) "
+            f"in {importer.elapsed:.2f}s."
+        ))
@@ -0,0 +1,60 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from govgrant.api.importers import HouseholdImporter, HouseholdImportError, read_csv, read_jsonl
+
+
+READERS = {
+    "jsonl": read_jsonl,
+    "csv": read_csv,
+}
+
+
+class Command(BaseCommand):
+    help = "Imports households and their members in bulk from a JSONL or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="Path of the file to import, or '-' to read from stdin.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Format of the file. Inferred from its extension if omitted.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of households inserted and committed at a time.",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        path = options["path"]
+        fmt = options["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+        if fmt not in READERS:
+            raise CommandError("Unable to infer format of file, use --format.")
+
+        importer = HouseholdImporter(chunk_size=options["chunk_size"], progress=self.progress)
+        file = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            importer.run(READERS[fmt](file))
+        except (HouseholdImportError, IntegrityError) as e:
+            raise CommandError(f"Import failed after {importer.households} household(s): {e}")
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.households} household(s) and {importer.members} member(s) "
+            f"in {importer.elapsed:.2f}s ({importer.rows_per_second:.0f} rows/sec)."
+        ))
+
+    def progress(self, importer):
+        if self.verbosity > 1:
+            self.stdout.write(f"Imported {importer.households} household(s) and {importer.members} member(s)")
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from govgrant.api.models import Household
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the aggregates maintained on each household from its members."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report households whose aggregates are out of date.",
+        )
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            stale = self.verify()
+            if stale:
+                raise CommandError(f"Aggregates of {stale} household(s) are out of date.")
+            self.stdout.write(self.style.SUCCESS("Aggregates of all households are up to date."))
+            return
+
+        with transaction.atomic():
+            count = Household.objects.refresh_aggregates()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt aggregates of {count} household(s)."))
+
+    def verify(self):
+        """Returns the number of households with out of date aggregates"""
+        expressions = Household.objects.aggregate_expressions()
+        queryset = Household.objects.annotate(**{
+            f"expected_{name}": expression
+            for name, expression in expressions.items()
+        })
+
+        stale = 0
+        for household in queryset.iterator():
+            fields = [
+                name for name in expressions
+                if getattr(household, name) != getattr(household, f"expected_{name}")
+            ]
+            if fields:
+                stale += 1
+                self.stdout.write(f"{household}: {', '.join(fields)}")
+        return stale
@@ -0,0 +1,126 @@
+import functools
+import os
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from govgrant.api import server
+
+
+# Applications served by each interface, and the function serving
+# them in each worker
+INTERFACES = {
+    "wsgi": (settings.WSGI_APPLICATION, server.serve_wsgi),
+    "asgi": ("govgrant.asgi.application", server.serve_asgi),
+}
+
+
+def parse_bind(bind):
+    """Returns the host and port of an address given as [host:]port"""
+    host, _, port = bind.rpartition(":")
+    if not port.isdigit():
+        raise CommandError(f"'{bind}' is not a valid address, expected [host:]port.")
+    return host.strip("[]") or "127.0.0.1", int(port)
+
+
+class Command(BaseCommand):
+    help = (
+        "Serves the application with a pool of worker processes forked after "
+        "the application is loaded and warmed. SIGHUP gracefully replaces the "
+        "workers and SIGTERM gracefully stops them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--bind",
+            default="127.0.0.1:8000",
+            help="Address to listen on, as [host:]port. Defaults to 127.0.0.1:8000.",
+        )
+        parser.add_argument(
+            "--interface",
+            choices=sorted(INTERFACES),
+            default="wsgi",
+            help="Interface of the served application. ASGI requires uvicorn to be installed.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.SERVER_WORKERS,
+            help="Number of worker processes. Defaults to the number of cores.",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=settings.SERVER_THREADS,
+            help="Number of threads of each WSGI worker.",
+        )
+        parser.add_argument(
+            "--max-requests",
+            type=int,
+            default=settings.SERVER_MAX_REQUESTS,
+            help="Number of requests after which a worker is replaced, 0 to never replace it.",
+        )
+        parser.add_argument(
+            "--max-requests-jitter",
+            type=int,
+            default=settings.SERVER_MAX_REQUESTS_JITTER,
+            help="Maximum random number of requests added to --max-requests for each worker.",
+        )
+        parser.add_argument(
+            "--graceful-timeout",
+            type=float,
+            default=settings.SERVER_GRACEFUL_TIMEOUT,
+            help="Number of seconds given to workers to finish their requests when stopped.",
+        )
+        parser.add_argument(
+            "--keepalive",
+            type=float,
+            default=settings.SERVER_KEEPALIVE,
+            help="Number of seconds after which idle persistent connections are closed.",
+        )
+
+    def handle(self, *args, **options):
+        if options["interface"] == "asgi" and server.uvicorn is None:
+            raise CommandError("Serving ASGI requires uvicorn to be installed.")
+        if options["workers"] < 1 or options["threads"] < 1:
+            raise CommandError("--workers and --threads must be positive.")
+        local = sorted({
+            alias for alias in (settings.API_VERSION_CACHE, settings.RESPONSE_CACHE)
+            if isinstance(caches[alias], LocMemCache)
+        })
+        if options["workers"] > 1 and local:
+            # Each worker would only invalidate its own cached responses
+            raise CommandError(
+                f"Several workers require shared caches, but {', '.join(map(repr, local))} "
+                "are kept in local memory. Set DEFAULT_CACHE_BACKEND and RESPONSE_CACHE_BACKEND "
+                "to a shared backend, or use --workers 1."
+            )
+
+        path, serve = INTERFACES[options["interface"]]
+        application = import_string(path)
+        host, port = parse_bind(options["bind"])
+        try:
+            listener = server.listen(host, port)
+        except OSError as exc:
+            raise CommandError(f"Could not listen on {options['bind']}: {exc}")
+        serve = functools.partial(
+            serve,
+            application=application,
+            threads=options["threads"],
+            keepalive=options["keepalive"],
+            max_requests=options["max_requests"],
+            max_requests_jitter=options["max_requests_jitter"],
+        )
+        self.stdout.write(
+            f"Serving {path} on http://{options['bind']} with {options['workers']} worker(s) "
+            f"(master pid {os.getpid()})."
+        )
+        try:
+            server.PreforkServer(
+                listener, serve, options["workers"], options["graceful_timeout"], log=self.stdout.write,
+            ).run()
+        finally:
+            listener.close()
@@ -0,0 +1,46 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def sync_replica(alias):
+    """Copies the default SQLite database onto the file of a replica"""
+    source = connections[DEFAULT_DB_ALIAS]
+    source.ensure_connection()
+    target = sqlite3.connect(connections.databases[alias]["NAME"])
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the default SQLite database onto the SQLite files of the replicas "
+        "in DATABASE_REPLICAS, as a stand-in for replication in development."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep syncing every given number of seconds instead of once.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("There are no replicas to sync, set DATABASE_REPLICA_NAMES first.")
+        for alias in settings.DATABASE_REPLICAS:
+            if connections[alias].vendor != "sqlite" or connections[DEFAULT_DB_ALIAS].vendor != "sqlite":
+                raise CommandError(f"Only SQLite databases can be synced, '{alias}' must be replicated otherwise.")
+
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                sync_replica(alias)
+            self.stdout.write(f"Synced {', '.join(settings.DATABASE_REPLICAS)}.")
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,177 @@
+import bisect
+import contextlib
+import re
+import threading
+import time
+
+
+# Upper bounds (in ms, or number of queries) of the histogram buckets
+DURATION_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# Matches a list of placeholders, e.g. in an IN clause
+PLACEHOLDER_LIST_PATTERN = re.compile(r"%s(?:\s*,\s*%s)+")
+
+# Matches a string or number literal
+LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize_sql(sql):
+    """Returns SQL with its literals and lists of placeholders collapsed"""
+    sql = LITERAL_PATTERN.sub("?", sql)
+    return PLACEHOLDER_LIST_PATTERN.sub("...", sql).replace("%s", "?")
+
+
+class RequestTimings:
+    """Accumulates the time spent in each phase of a request"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.durations = {"db": 0.0, "serialize": 0.0, "render": 0.0}
+        self.queries = []
+        self.active = set()
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.start
+
+    def __call__(self, execute, sql, params, many, context):
+        """Times a query as an execute wrapper of a database connection"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations["db"] += time.perf_counter() - start
+            self.queries.append(sql)
+
+    @contextlib.contextmanager
+    def timed(self, phase):
+        """
+        Adds the time spent in the block to a phase, excluding the
+        time spent in queries and in any nested block of the phase.
+        """
+        if phase in self.active:
+            yield
+            return
+        self.active.add(phase)
+        start, db = time.perf_counter(), self.durations["db"]
+        try:
+            yield
+        finally:
+            self.active.discard(phase)
+            self.durations[phase] += time.perf_counter() - start - (self.durations["db"] - db)
+
+    def server_timing(self):
+        """Returns the value of the Server-Timing header"""
+        metrics = [
+            f'db;dur={self.durations["db"] * 1000:.2f};desc="{len(self.queries)} queries"',
+            f'serialize;dur={self.durations["serialize"] * 1000:.2f}',
+            f'render;dur={self.durations["render"] * 1000:.2f}',
+            f"total;dur={self.total * 1000:.2f}",
+        ]
+        return ", ".join(metrics)
+
+    def normalized_queries(self):
+        """Returns the distinct normalized queries with their number of executions"""
+        counts = {}
+        for sql in self.queries:
+            sql = normalize_sql(sql)
+            counts[sql] = counts.get(sql, 0) + 1
+        return counts
+
+
+_local = threading.local()
+
+
+def get_timings():
+    """Returns the RequestTimings of the current request, if measured"""
+    return getattr(_local, "timings", None)
+
+
+def set_timings(timings):
+    _local.timings = timings
+
+
+@contextlib.contextmanager
+def timed(phase):
+    """Adds the time spent in the block to a phase of the current request"""
+    timings = get_timings()
+    if timings is None:
+        yield
+    else:
+        with timings.timed(phase):
+            yield
+
+
+class Histogram:
+    """Cumulative histogram of observed values"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        """Yields the lines of the histogram in the Prometheus text format"""
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum:g}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+class MetricsRegistry:
+    """Process-wide histograms of request timings per view and action"""
+
+    metrics = {
+        "request_duration_ms": DURATION_BUCKETS,
+        "db_duration_ms": DURATION_BUCKETS,
+        "serialize_duration_ms": DURATION_BUCKETS,
+        "render_duration_ms": DURATION_BUCKETS,
+        "db_queries": QUERY_BUCKETS,
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def clear(self):
+        with self._lock:
+            self._histograms = {}
+
+    def observe(self, view, timings):
+        """Records the timings of a request to a view"""
+        values = {
+            "request_duration_ms": timings.total * 1000,
+            "db_duration_ms": timings.durations["db"] * 1000,
+            "serialize_duration_ms": timings.durations["serialize"] * 1000,
+            "render_duration_ms": timings.durations["render"] * 1000,
+            "db_queries": len(timings.queries),
+        }
+        with self._lock:
+            for name, value in values.items():
+                key = (name, view)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(self.metrics[name])
+                self._histograms[key].observe(value)
+
+    def render(self):
+        """Returns every histogram in the Prometheus text format"""
+        lines = []
+        with self._lock:
+            for name in self.metrics:
+                lines.append(f"# TYPE govgrant_{name} histogram")
+                for (metric, view), histogram in sorted(self._histograms.items()):
+                    if metric == name:
+                        lines.extend(histogram.lines(f"govgrant_{name}", f'view="{view}"'))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
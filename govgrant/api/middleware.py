@@ -0,0 +1,108 @@
+import contextlib
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from govgrant.api import metrics, routers
+
+
+logger = logging.getLogger("govgrant.api.performance")
+
+
+class PerformanceMiddleware:
+    """
+    Measures the time each request spends in the database, in
+    serializers and in renderers, and its number of queries
+
+    Queries are timed by an execute wrapper installed on every
+    database connection for the duration of the request, while
+    serializers and renderers time themselves through
+    ``metrics.timed()``. The timings are returned in a Server-Timing
+    header and recorded in histograms per view and action, exposed
+    by the /metrics endpoint. Requests taking longer than
+    ``SLOW_REQUEST_THRESHOLD`` milliseconds are logged with their
+    normalized queries.
+
+    The middleware is only enabled when ``PERFORMANCE_METRICS`` is
+    set. The content of streaming responses is produced after the
+    middleware returns and is therefore not measured.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERFORMANCE_METRICS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = metrics.RequestTimings()
+        metrics.set_timings(timings)
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            metrics.set_timings(None)
+
+        response["Server-Timing"] = timings.server_timing()
+        view = getattr(request, "metrics_view", None)
+        if view is not None:
+            metrics.registry.observe(view, timings)
+        if timings.total * 1000 >= settings.SLOW_REQUEST_THRESHOLD:
+            self.log_slow_request(request, response, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Labels the request with the name of its view and action"""
+        cls = getattr(view_func, "cls", None)
+        if cls is None:
+            request.metrics_view = f"{view_func.__module__}.{view_func.__name__}"
+            return
+        actions = getattr(view_func, "actions", None) or {}
+        action = actions.get(request.method.lower(), request.method.lower())
+        request.metrics_view = f"{cls.__name__}.{action}"
+
+    def log_slow_request(self, request, response, timings):
+        queries = "\n".join(
+            f"  {count}x {sql}" for sql, count in timings.normalized_queries().items()
+        )
+        logger.warning(
+            "Slow request: %s %s %s (%s)\n%s",
+            request.method, request.get_full_path(), response.status_code, timings.server_timing(), queries,
+        )
+
+
+class ReplicaPinningMiddleware:
+    """
+    Routes the reads of a client to the primary database for
+    ``REPLICA_STICKINESS`` seconds after one of its requests has
+    written, so that clients read their own writes despite the
+    replication lag of replicas
+
+    Pinning is remembered with a cookie set on the response of
+    any request that has written. Requests of unsafe methods read
+    from the primary, so that they validate against its data. The
+    middleware is only enabled when ``DATABASE_REPLICAS`` is set.
+    """
+
+    cookie_name = "pin_primary"
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.reset()
+        if request.COOKIES.get(self.cookie_name) or request.method not in SAFE_METHODS:
+            routers.pin()
+        try:
+            response = self.get_response(request)
+            if routers.has_written():
+                response.set_cookie(self.cookie_name, "1", max_age=settings.REPLICA_STICKINESS, httponly=True)
+        finally:
+            routers.reset()
+        return response
@@ -0,0 +1,60 @@
+# Generated by Django 3.0.3 on 2026-10-18 06:47
+
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_household_aggregates(apps, schema_editor):
+    Household = apps.get_model('api', 'Household')
+    FamilyMember = apps.get_model('api', 'FamilyMember')
+
+    def aggregate(queryset, expression, output_field):
+        queryset = queryset.order_by().values('household').annotate(value=expression).values('value')
+        return Subquery(queryset, output_field=output_field)
+
+    members = FamilyMember.objects.filter(household=OuterRef('pk'))
+    pairs = members.filter(spouse__household=OuterRef('pk'), pk__lt=F('spouse'))
+    Household.objects.using(schema_editor.connection.alias).update(
+        total_income=Coalesce(aggregate(members, Sum('annual_income'), models.IntegerField()), 0),
+        member_count=Coalesce(aggregate(members, Count('pk'), models.IntegerField()), 0),
+        married_pair_count=Coalesce(aggregate(pairs, Count('pk'), models.IntegerField()), 0),
+        youngest_dob=aggregate(members, Max('dob'), models.DateField()),
+        oldest_dob=aggregate(members, Min('dob'), models.DateField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_auto_20200210_1354'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='household',
+            name='married_pair_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='household',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='household',
+            name='oldest_dob',
+            field=models.DateField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='household',
+            name='total_income',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='household',
+            name='youngest_dob',
+            field=models.DateField(db_index=True, null=True),
+        ),
+        migrations.RunPython(populate_household_aggregates, migrations.RunPython.noop),
+    ]
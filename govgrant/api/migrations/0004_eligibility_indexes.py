@@ -0,0 +1,33 @@
+# Generated by Django 3.0.3 on 2026-10-18 06:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_household_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='familymember',
+            index=models.Index(fields=['household', 'dob'], name='api_member_household_dob_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='familymember',
+            index=models.Index(fields=['household', 'annual_income'], name='api_member_household_inc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='familymember',
+            index=models.Index(fields=['household', 'spouse'], name='api_member_household_sp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='household',
+            index=models.Index(fields=['housing_type', 'total_income'], name='api_household_type_income_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='household',
+            index=models.Index(fields=['housing_type', 'oldest_dob'], name='api_household_type_oldest_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.0.3 on 2026-10-18 06:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_eligibility_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Grant',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('min_income', models.PositiveIntegerField(blank=True, null=True)),
+                ('max_income', models.PositiveIntegerField(blank=True, null=True)),
+                ('min_age', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('max_age', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('with_spouse', models.BooleanField(default=False)),
+                ('computed_on', models.DateField(editable=False, null=True)),
+                ('housing_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='api.HousingType')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GrantEligibility',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eligibilities', to='api.Grant')),
+                ('household', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grant_eligibilities', to='api.Household')),
+            ],
+            options={
+                'unique_together': {('grant', 'household')},
+            },
+        ),
+    ]
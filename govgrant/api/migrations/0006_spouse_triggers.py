@@ -0,0 +1,122 @@
+# Generated by Django 3.0.3 on 2026-10-18 07:09
+
+import logging
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+logger = logging.getLogger(__name__)
+
+# Mirrors the spouse of a member onto its spouse if unmarried, and
+# links an inserted member to the member that already refers to it
+SPOUSE_TRIGGERS = {
+    'sqlite': [
+        """
+        CREATE TRIGGER api_familymember_mirror_spouse_insert
+        AFTER INSERT ON api_familymember
+        WHEN NEW.spouse_id IS NOT NULL
+        BEGIN
+            UPDATE api_familymember SET spouse_id = NEW.id
+            WHERE id = NEW.spouse_id AND spouse_id IS NULL;
+        END
+        """,
+        """
+        CREATE TRIGGER api_familymember_mirror_spouse_update
+        AFTER UPDATE OF spouse_id ON api_familymember
+        WHEN NEW.spouse_id IS NOT NULL
+        BEGIN
+            UPDATE api_familymember SET spouse_id = NEW.id
+            WHERE id = NEW.spouse_id AND spouse_id IS NULL;
+        END
+        """,
+        """
+        CREATE TRIGGER api_familymember_adopt_spouse_insert
+        AFTER INSERT ON api_familymember
+        WHEN NEW.spouse_id IS NULL
+        BEGIN
+            UPDATE api_familymember
+            SET spouse_id = (SELECT id FROM api_familymember WHERE spouse_id = NEW.id)
+            WHERE id = NEW.id AND EXISTS (SELECT 1 FROM api_familymember WHERE spouse_id = NEW.id);
+        END
+        """,
+    ],
+    'postgresql': [
+        """
+        CREATE FUNCTION api_familymember_mirror_spouse() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.spouse_id IS NOT NULL THEN
+                UPDATE api_familymember SET spouse_id = NEW.id
+                WHERE id = NEW.spouse_id AND spouse_id IS NULL;
+            ELSIF TG_OP = 'INSERT' THEN
+                UPDATE api_familymember
+                SET spouse_id = (SELECT id FROM api_familymember WHERE spouse_id = NEW.id)
+                WHERE id = NEW.id AND EXISTS (SELECT 1 FROM api_familymember WHERE spouse_id = NEW.id);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER api_familymember_mirror_spouse
+        AFTER INSERT OR UPDATE OF spouse_id ON api_familymember
+        FOR EACH ROW EXECUTE PROCEDURE api_familymember_mirror_spouse()
+        """,
+    ],
+}
+
+DROP_SPOUSE_TRIGGERS = {
+    'sqlite': [
+        'DROP TRIGGER IF EXISTS api_familymember_mirror_spouse_insert',
+        'DROP TRIGGER IF EXISTS api_familymember_mirror_spouse_update',
+        'DROP TRIGGER IF EXISTS api_familymember_adopt_spouse_insert',
+    ],
+    'postgresql': [
+        'DROP TRIGGER IF EXISTS api_familymember_mirror_spouse ON api_familymember',
+        'DROP FUNCTION IF EXISTS api_familymember_mirror_spouse()',
+    ],
+}
+
+
+def create_spouse_triggers(apps, schema_editor):
+    # Spouses are mirrored by FamilyMember on other databases
+    vendor = schema_editor.connection.vendor
+    if vendor not in SPOUSE_TRIGGERS:
+        logger.warning('Spouse triggers are not available for %s, spouses are mirrored by FamilyMember.', vendor)
+    for sql in SPOUSE_TRIGGERS.get(vendor, []):
+        schema_editor.execute(sql)
+
+    # Mirror the existing links that were not mirrored, and refresh
+    # the number of married pairs of every household accordingly
+    FamilyMember = apps.get_model('api', 'FamilyMember')
+    Household = apps.get_model('api', 'Household')
+    members = FamilyMember.objects.using(schema_editor.connection.alias)
+    links = members.filter(spouse__isnull=False, spouse__spouse__isnull=True).values_list('pk', 'spouse')
+    for pk, spouse in list(links):
+        members.filter(pk=spouse, spouse__isnull=True).update(spouse=pk)
+
+    pairs = FamilyMember.objects.filter(
+        household=OuterRef('pk'),
+        spouse__household=OuterRef('pk'),
+        pk__lt=F('spouse'),
+    ).order_by().values('household').annotate(value=Count('pk')).values('value')
+    Household.objects.using(schema_editor.connection.alias).update(
+        married_pair_count=Coalesce(Subquery(pairs, output_field=models.IntegerField()), 0),
+    )
+
+
+def drop_spouse_triggers(apps, schema_editor):
+    for sql in DROP_SPOUSE_TRIGGERS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_grants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_spouse_triggers, drop_spouse_triggers),
+    ]
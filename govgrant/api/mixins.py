@@ -0,0 +1,90 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import quote_etag
+from django.utils.http import parse_etags
+
+from govgrant.api import routers
+from govgrant.api.cache import get_version
+from govgrant.api.filters import today
+
+
+class CachedResponseMixin:
+    """
+    Caches the rendered responses of the list and retrieve actions
+
+    Responses are keyed on the path and normalized query parameters
+    of the request, its Accept header, the current date (which age
+    criteria depend on), the eligibility engine and the version token
+    given by ``response_version_key``, which must be bumped on every
+    write to the underlying data. The key doubles as a strong ETag, so that a
+    request whose ``If-None-Match`` matches it is answered with a 304
+    without touching the database, while a cached response is served
+    from the ``RESPONSE_CACHE`` backend without running any query.
+
+    Responses read from replicas are neither cached nor tagged, since
+    a replica may lag behind the version of the data, and neither are
+    responses for which ``is_response_cacheable()`` returns False.
+    """
+
+    response_version_key = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def is_response_cacheable(self, request):
+        """Returns whether the response to a request may be cached and tagged"""
+        return True
+
+    def get_response_key(self, request):
+        """Returns the cache key of the response to a request"""
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values
+        )
+        key = json.dumps([
+            get_version(self.response_version_key),
+            today().isoformat(),
+            settings.ELIGIBILITY_ENGINE,
+            request.path,
+            params,
+            request.META.get("HTTP_ACCEPT", ""),
+        ])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Returns a cached response, or caches the response of handler"""
+        if not self.is_response_cacheable(request):
+            return handler(request, *args, **kwargs)
+        key = self.get_response_key(request)
+        etag = quote_etag(key)
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+
+        cache = caches[settings.RESPONSE_CACHE]
+        cache_key = f"response:{key}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+        else:
+            response = handler(request, *args, **kwargs)
+            if routers.reading_from_replicas():
+                return response
+            if response.status_code == 200:
+                response.add_post_render_callback(
+                    lambda rendered: cache.set(
+                        cache_key, (rendered.content, rendered["Content-Type"]), settings.RESPONSE_CACHE_TIMEOUT,
+                    )
+                )
+        response["ETag"] = etag
+        return response
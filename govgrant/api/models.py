@@ -1,4 +1,14 @@
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+
+from govgrant.api.cache import get_enum_cache
+
+
+# Sent after the aggregates of households are refreshed, with the
+# refreshed households as the ``queryset`` argument
+aggregates_refreshed = Signal()
 
 
 class EnumModel(models.Model):
@@ -24,11 +34,110 @@ class HousingType(EnumModel):
     pass
 
 
+def _member_aggregate(aggregate, output_field, queryset=None):
+    """
+    Returns a subquery computing an aggregate over the members
+    of the household referenced by the outer query.
+    """
+    if queryset is None:
+        queryset = FamilyMember.objects.filter(household=OuterRef("pk"))
+    return Subquery(
+        queryset.order_by().values("household").annotate(value=aggregate).values("value"),
+        output_field=output_field,
+    )
+
+
+class HouseholdQuerySet(models.QuerySet):
+
+    @staticmethod
+    def aggregate_expressions():
+        """
+        Returns expressions computing the maintained aggregates
+        of each household from its members, keyed by field name.
+
+        A married pair is counted once when both spouses belong
+        to the same household.
+        """
+        pairs = FamilyMember.objects.filter(
+            household=OuterRef("pk"),
+            spouse__household=OuterRef("pk"),
+            pk__lt=F("spouse"),
+        )
+        return {
+            "total_income": Coalesce(_member_aggregate(Sum("annual_income"), models.IntegerField()), 0),
+            "member_count": Coalesce(_member_aggregate(Count("pk"), models.IntegerField()), 0),
+            "married_pair_count": Coalesce(_member_aggregate(Count("pk"), models.IntegerField(), pairs), 0),
+            "youngest_dob": _member_aggregate(Max("dob"), models.DateField()),
+            "oldest_dob": _member_aggregate(Min("dob"), models.DateField()),
+        }
+
+    def refresh_aggregates(self):
+        """
+        Recomputes the maintained aggregates of the households
+        in this queryset in a single UPDATE statement.
+        """
+        count = self.update(**self.aggregate_expressions())
+        aggregates_refreshed.send(sender=self.model, queryset=self)
+        return count
+
+    def remove_members(self, names):
+        """
+        Deletes the members of the households in this queryset with
+        the given names in a single DELETE statement, and returns the
+        number of deleted members.
+
+        Unlike ``QuerySet.delete()``, members are neither fetched
+        nor sent signals: the spouses of the deleted members are
+        unlinked in a single UPDATE and the aggregates of the
+        households are refreshed once.
+        """
+        members = FamilyMember.objects.filter(household__in=self, name__in=names)
+        with transaction.atomic(using=self.db, savepoint=False):
+            FamilyMember.objects.filter(spouse__in=members).update(spouse=None)
+            # A raw DELETE, since QuerySet.delete() fetches the members
+            # to collect related objects and send signals, while nothing
+            # references them once their spouses are unlinked
+            sql, params = members.values("pk").query.sql_with_params()
+            connection = connections[self.db]
+            table, pk = (connection.ops.quote_name(name) for name in (FamilyMember._meta.db_table, "id"))
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({sql})", params)
+                count = cursor.rowcount
+            if count:
+                self.refresh_aggregates()
+        return count
+
+
 class Household(models.Model):
-    """Represents a single physical housing unit"""
+    """
+    Represents a single physical housing unit
+
+    Aggregates over the members of the household are maintained
+    on the household itself so that eligibility filters can use
+    indexed columns instead of aggregating over every member.
+    They are refreshed whenever a member is saved or deleted, and
+    must be refreshed explicitly with ``refresh_aggregates()``
+    after bulk operations that bypass model signals.
+    """
 
     housing_type = models.ForeignKey(HousingType, on_delete=models.PROTECT)
 
+    # Maintained aggregates of members
+    total_income = models.PositiveIntegerField(default=0, db_index=True)
+    member_count = models.PositiveIntegerField(default=0)
+    married_pair_count = models.PositiveIntegerField(default=0, db_index=True)
+    youngest_dob = models.DateField(null=True, db_index=True)
+    oldest_dob = models.DateField(null=True, db_index=True)
+
+    objects = HouseholdQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Supports grants combining housing type with other criteria
+            models.Index(fields=["housing_type", "total_income"], name="api_household_type_income_idx"),
+            models.Index(fields=["housing_type", "oldest_dob"], name="api_household_type_oldest_idx"),
+        ]
+
     def __str__(self):
         return f"Household {self.pk}"
 
@@ -48,6 +157,66 @@ class OccupationType(EnumModel):
     pass
 
 
+# Database vendors on which spouse links are mirrored by the triggers
+# of migration 0006_spouse_triggers, instead of by FamilyMember
+SPOUSE_TRIGGER_VENDORS = ("sqlite", "postgresql")
+
+
+class FamilyMemberQuerySet(models.QuerySet):
+
+    def mirror_spouses(self, links):
+        """
+        Mirrors links, given as (member pk, spouse pk), onto spouses
+        that are unmarried, unless the database mirrors them with
+        triggers. Each link is mirrored with a conditional UPDATE.
+        """
+        if connections[self.db].vendor in SPOUSE_TRIGGER_VENDORS:
+            return
+        for pk, spouse_pk in links:
+            self.filter(pk=spouse_pk, spouse__isnull=True).update(spouse=pk)
+
+    def create_batch(self, members):
+        """
+        Inserts a batch of unsaved members in one transaction.
+
+        The members are inserted with a single bulk INSERT, after
+        which the spouses of the members are linked in a single bulk
+        UPDATE. The spouse of a member may either
+        be an existing member, or another member of the same batch.
+        The aggregates of the affected households are refreshed
+        once for the whole batch.
+        """
+        spouses = [member.spouse for member in members]
+        with transaction.atomic(using=self.db):
+            self.bulk_create(members)
+
+            # Retrieve the pks of the inserted members by their
+            # unique names, since SQLite cannot return them
+            pks = dict(self.filter(name__in=[member.name for member in members]).values_list("name", "pk"))
+            for member in members:
+                member.pk = pks[member.name]
+                member._state.adding = False
+                member._state.db = self.db
+
+            # Link spouses once every member of the batch exists, the
+            # links are mirrored onto unmarried spouses by triggers
+            linked = []
+            for member, spouse in zip(members, spouses):
+                if spouse is not None:
+                    member.spouse = spouse
+                    linked.append(member)
+            if linked:
+                self.bulk_update(linked, ["spouse"])
+            mirrored = [member for member in linked if member.spouse.spouse_id is None]
+            self.mirror_spouses((member.pk, member.spouse_id) for member in mirrored)
+            for member in mirrored:
+                member.spouse.spouse = member
+
+            household_ids = {member.household_id for member in members} - {None}
+            Household.objects.filter(pk__in=household_ids).refresh_aggregates()
+        return members
+
+
 class FamilyMember(models.Model):
     """Represents a single member of a family"""
 
@@ -60,25 +229,107 @@ class FamilyMember(models.Model):
     annual_income = models.PositiveIntegerField()
     household = models.ForeignKey(Household, related_name="members", on_delete=models.CASCADE, null=True)
 
+    objects = FamilyMemberQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Covering indexes for the aggregates of each household
+            models.Index(fields=["household", "dob"], name="api_member_household_dob_idx"),
+            models.Index(fields=["household", "annual_income"], name="api_member_household_inc_idx"),
+            models.Index(fields=["household", "spouse"], name="api_member_household_sp_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
-    def save(self, *args, **kwargs):
-        """
-        Symmetrically mirror self.spouse relationship between
-        two family members.
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
 
-        This method extends the save() method in the superclass
-        by also updating the spouse's 'spouse' field as itself.
+        # Remember the household loaded from the database so that
+        # the aggregates of both households are refreshed on moves
+        instance._loaded_household_id = instance.__dict__.get("household_id")
+        return instance
 
-        Reference:
-            https://code.djangoproject.com/ticket/7689
+    def save(self, *args, **kwargs):
         """
+        Saves the member together with the refresh of the household
+        aggregates within a single transaction.
 
-        # FIXME: The following behaviour does not seem to
-        # work on the Model.objects.create() method. Not that
-        # it matters for now, but this should be reviewed.
-        super().save(*args, **kwargs)
-        if self.spouse and not self.spouse.spouse:
+        The 'spouse' field of the spouse is mirrored symmetrically by
+        database triggers within the same statement (see migration
+        0006_spouse_triggers), which also applies to objects.create(),
+        bulk_create(), QuerySet.update() and raw SQL. On databases
+        without these triggers, it is mirrored by save() and
+        create_batch() instead. The spouse instance in memory is
+        updated to match.
+        """
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+            if self.spouse_id is not None:
+                FamilyMember.objects.using(self._state.db).mirror_spouses([(self.pk, self.spouse_id)])
+        if self.spouse is not None and self.spouse.spouse_id is None:
             self.spouse.spouse = self
-            self.spouse.save()
+
+
+class Grant(models.Model):
+    """
+    Represents a government grant and its eligibility criteria
+
+    The criteria are the query parameters understood by the
+    /households/ endpoint, with unset criteria left as null.
+    Eligible households are materialized in GrantEligibility,
+    which is recomputed whenever the current date differs from
+    ``computed_on`` since age-based criteria depend on it.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    min_income = models.PositiveIntegerField(null=True, blank=True)
+    max_income = models.PositiveIntegerField(null=True, blank=True)
+    min_age = models.PositiveSmallIntegerField(null=True, blank=True)
+    max_age = models.PositiveSmallIntegerField(null=True, blank=True)
+    housing_type = models.ForeignKey(HousingType, on_delete=models.PROTECT, null=True, blank=True)
+    with_spouse = models.BooleanField(default=False)
+
+    # Date on which the eligible households were last recomputed
+    computed_on = models.DateField(null=True, editable=False)
+
+    def __str__(self):
+        return self.name
+
+    def params(self):
+        """Returns the criteria as query parameters of /households/"""
+        params = {
+            key: getattr(self, key)
+            for key in ("min_income", "max_income", "min_age", "max_age")
+            if getattr(self, key) is not None
+        }
+        if self.housing_type_id is not None:
+            params["housing_type"] = get_enum_cache(HousingType).get_name(self.housing_type_id)
+        if self.with_spouse:
+            params["with_spouse"] = True
+        return params
+
+
+class GrantEligibility(models.Model):
+    """Represents a household that is eligible for a grant"""
+
+    grant = models.ForeignKey(Grant, related_name="eligibilities", on_delete=models.CASCADE)
+    household = models.ForeignKey(Household, related_name="grant_eligibilities", on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = [("grant", "household")]
+
+
+class LoadedFixture(models.Model):
+    """
+    Represents a fixture loaded by the bootstrap command, with the
+    hash of its content so that unchanged fixtures are not reloaded
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64)
+    loaded_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,27 @@
+from rest_framework.pagination import CursorPagination
+
+
+class HouseholdCursorPagination(CursorPagination):
+    """
+    Opt-in keyset pagination for the Household resource
+
+    Pages are keyed on ``Household.id`` so that each page is
+    fetched with an ``id > cursor`` lookup on the primary key
+    index instead of an ``OFFSET``, which keeps the cost of
+    fetching a page constant regardless of how deep it is.
+
+    Pagination is only enabled when either the ``cursor`` or
+    ``page_size`` query parameter is given, otherwise the full
+    list of households is returned as before.
+    """
+
+    ordering = "id"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        query_params = request.query_params
+        if self.cursor_query_param not in query_params and self.page_size_query_param not in query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,36 @@
+import json
+
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from govgrant.api.renderers import orjson
+
+
+def _reject_constant(value):
+    raise ValueError(f"Out of range float values are not JSON compliant: {value!r}")
+
+
+def loads(content):
+    """Decodes JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content, parse_constant=_reject_constant)
+
+
+class JSONParser(parsers.JSONParser):
+    """
+    JSONParser decoding UTF-8 request bodies with ``loads()``
+
+    Bodies in any other encoding are parsed by DRF as before.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,88 @@
+import datetime
+
+from rest_framework import renderers
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+from govgrant.api import metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+# Options matching the compact output of DRF's JSONRenderer. Dates and
+# times are passed to _drf_default() since DRF truncates datetimes to
+# milliseconds and formats UTC as "Z", unlike orjson.
+ORJSON_OPTIONS = 0
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+# Line and paragraph separators, escaped as DRF does so that the
+# output is also a valid JavaScript literal
+UNESCAPED_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+def _drf_default(obj):
+    """Encodes dates, times and objects unsupported by orjson the way DRF does"""
+    if isinstance(obj, datetime.date) and not isinstance(obj, datetime.datetime):
+        return obj.isoformat()
+    return _encoder.default(obj)
+
+
+# Encoder reused across calls instead of being created for each one
+_encoder = encoders.JSONEncoder(
+    ensure_ascii=not api_settings.UNICODE_JSON,
+    allow_nan=not api_settings.STRICT_JSON,
+    separators=renderers.SHORT_SEPARATORS if api_settings.COMPACT_JSON else renderers.LONG_SEPARATORS,
+)
+
+
+def stdlib_dumps(data):
+    """Encodes data as compact JSON bytes with the standard library"""
+    content = _encoder.encode(data)
+    return content.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+
+def orjson_dumps(data):
+    """
+    Encodes data as compact JSON bytes with orjson, falling back to
+    the standard library for values orjson cannot encode, such as
+    integers wider than 64 bits.
+    """
+    try:
+        content = orjson.dumps(data, default=_drf_default, option=ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        return stdlib_dumps(data)
+    if b"\xe2\x80" in content:
+        for separator, escaped in UNESCAPED_SEPARATORS:
+            content = content.replace(separator, escaped)
+    return content
+
+
+def dumps(data):
+    """
+    Encodes data as compact JSON bytes identical to the output of
+    DRF's JSONRenderer, using orjson when it is installed.
+    """
+    if orjson is not None and api_settings.UNICODE_JSON and api_settings.COMPACT_JSON:
+        return orjson_dumps(data)
+    return stdlib_dumps(data)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer that records the time spent rendering
+
+    Compact responses are encoded with ``dumps()``, while responses
+    requested with an ``indent`` are rendered by DRF as before.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with metrics.timed("render"):
+            if data is None:
+                return b""
+            if self.get_indent(accepted_media_type or "", renderer_context or {}) is not None:
+                return super().render(data, accepted_media_type, renderer_context)
+            return dumps(data)
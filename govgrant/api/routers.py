@@ -0,0 +1,80 @@
+import contextlib
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+_local = threading.local()
+
+
+def pin():
+    """Routes the reads of the current thread to the primary database"""
+    _local.pinned = True
+
+
+def is_pinned():
+    return getattr(_local, "pinned", False)
+
+
+def has_written():
+    """Returns whether the current thread has written since it was reset"""
+    return getattr(_local, "written", False)
+
+
+def reset():
+    """Routes the reads of the current thread to replicas again"""
+    _local.pinned = False
+    _local.written = False
+
+
+def reading_from_replicas():
+    """Returns whether the reads of the current thread are routed to replicas"""
+    return bool(settings.DATABASE_REPLICAS) and not is_pinned()
+
+
+@contextlib.contextmanager
+def primary():
+    """Routes the reads of the current thread in the block to the primary database"""
+    pinned = is_pinned()
+    pin()
+    try:
+        yield
+    finally:
+        _local.pinned = pinned
+
+
+class ReplicaRouter:
+    """
+    Routes the reads of the api app to a random database among the
+    ``DATABASE_REPLICAS`` aliases, and every write to the primary
+
+    Once a thread writes, its reads are pinned to the primary so
+    that it reads its own writes, until it is reset at the end of
+    the request by ReplicaPinningMiddleware. The middleware also
+    pins the requests of a client for ``REPLICA_STICKINESS``
+    seconds after one of its requests has written, so that the
+    client reads its own writes despite the replication lag.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != "api" or not reading_from_replicas():
+            return DEFAULT_DB_ALIAS
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        pin()
+        _local.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema of the primary when synced
+        return db not in settings.DATABASE_REPLICAS
@@ -1,16 +1,167 @@
+import collections
+
+from django.utils.encoding import smart_str
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+
+from govgrant.api import metrics
+from govgrant.api.cache import get_enum_cache
+from govgrant.api.models import HousingType, Household, Gender, MaritalStatus, OccupationType, FamilyMember, Grant
+
+
+class EnumSlugRelatedField(serializers.SlugRelatedField):
+    """
+    Represents an EnumModel relation by its name
+
+    Unlike SlugRelatedField, names are resolved through the
+    process-wide EnumCache of the model, so that neither
+    validation nor serialization issues a query. Only the pk
+    of the related object is read from the instance.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("slug_field", "name")
+        super().__init__(**kwargs)
+
+    @property
+    def enum_cache(self):
+        return get_enum_cache(self.queryset.model)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def to_internal_value(self, data):
+        try:
+            return self.enum_cache.get_instance(data)
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=smart_str(data))
+        except (TypeError, ValueError):
+            self.fail('invalid')
+
+    def to_representation(self, obj):
+        return self.enum_cache.get_name(obj.pk)
+
+
+class TimedSerializerMixin:
+    """Records the time spent serializing instances in the request timings"""
+
+    def to_representation(self, instance):
+        with metrics.timed("serialize"):
+            return super().to_representation(instance)
+
+
+# Placeholder for a spouse that is a member of the same batch
+BatchMember = collections.namedtuple("BatchMember", ["name"])
+
 
-from govgrant.api.models import HousingType, Household, Gender, MaritalStatus, OccupationType, FamilyMember
+class SpouseRelatedField(serializers.SlugRelatedField):
+    """
+    Represents the spouse of a member by name
 
+    When validating a batch of members, names are resolved against
+    the spouses pre-resolved by FamilyMemberListSerializer instead
+    of issuing a query for each member.
+    """
 
-class FamilyMemberSerializer(serializers.ModelSerializer):
-    gender = serializers.SlugRelatedField(slug_field="name", queryset=Gender.objects.all())
-    marital_status = serializers.SlugRelatedField(slug_field="name", queryset=MaritalStatus.objects.all())
-    occupation_type = serializers.SlugRelatedField(slug_field="name", queryset=OccupationType.objects.all())
-    spouse = serializers.SlugRelatedField(slug_field="name", queryset=FamilyMember.objects.all(), required=False, allow_null=True)
+    def __init__(self, **kwargs):
+        kwargs.setdefault("slug_field", "name")
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        spouses = self.context.get("spouses")
+        if spouses is None:
+            return super().to_internal_value(data)
+        try:
+            return spouses[data]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=smart_str(data))
+        except TypeError:
+            self.fail('invalid')
+
+
+class FamilyMemberListSerializer(serializers.ListSerializer):
+    """
+    Validates and creates a batch of members
+
+    Lookups are resolved for the whole batch up front, so that
+    validating the batch issues a fixed number of queries, and the
+    members are created with ``FamilyMember.objects.create_batch()``.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.context["spouses"] = self.resolve_spouses(data)
+        validated_data = super().to_internal_value(data)
+
+        # Validate unique constraints across the whole batch
+        errors = self.validate_batch(validated_data)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated_data
+
+    def resolve_spouses(self, data):
+        """Returns the spouses referenced by a batch, keyed by name"""
+        items = [item for item in data if isinstance(item, dict)]
+        names = {item.get("name") for item in items}
+        spouse_names = {item.get("spouse") for item in items if isinstance(item.get("spouse"), str)}
+        spouses = {
+            member.name: member
+            for member in FamilyMember.objects.filter(name__in=spouse_names - names)
+        }
+        spouses.update({name: BatchMember(name) for name in spouse_names & names})
+        return spouses
+
+    def validate_batch(self, validated_data):
+        """
+        Returns errors of each member violating a unique constraint,
+        named as their own spouse, or whose spouse in the batch is
+        given a different spouse
+        """
+        names = collections.Counter(attrs["name"] for attrs in validated_data)
+        existing = set(FamilyMember.objects.filter(name__in=names).values_list("name", flat=True))
+        spouses = collections.Counter(attrs.get("spouse") for attrs in validated_data)
+
+        # Spouses of the members of the batch, by name
+        batch_spouses = {attrs["name"]: getattr(attrs.get("spouse"), "name", None) for attrs in validated_data}
+
+        errors = []
+        for attrs in validated_data:
+            error = {}
+            if attrs["name"] in existing or names[attrs["name"]] > 1:
+                error["name"] = ["family member with this name already exists."]
+            spouse = attrs.get("spouse")
+            if spouse is not None and spouse.name == attrs["name"]:
+                error["spouse"] = ["A family member cannot be their own spouse."]
+            elif spouse is not None and (spouses[spouse] > 1 or getattr(spouse, "spouse_id", None) is not None):
+                error["spouse"] = [f"'{spouse.name}' is already married."]
+            elif spouse is not None and batch_spouses.get(spouse.name) not in (None, attrs["name"]):
+                error["spouse"] = [f"'{spouse.name}' is married to '{batch_spouses[spouse.name]}' in this batch."]
+            errors.append(error)
+        return errors
+
+    def create(self, validated_data):
+        members = [
+            FamilyMember(**{key: value for key, value in attrs.items() if key != "spouse"})
+            for attrs in validated_data
+        ]
+
+        # Replace placeholders with members of the same batch
+        by_name = {member.name: member for member in members}
+        for member, attrs in zip(members, validated_data):
+            spouse = attrs.get("spouse")
+            member.spouse = by_name[spouse.name] if isinstance(spouse, BatchMember) else spouse
+        return FamilyMember.objects.create_batch(members)
+
+
+class FamilyMemberSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    gender = EnumSlugRelatedField(queryset=Gender.objects.all())
+    marital_status = EnumSlugRelatedField(queryset=MaritalStatus.objects.all())
+    occupation_type = EnumSlugRelatedField(queryset=OccupationType.objects.all())
+    spouse = SpouseRelatedField(queryset=FamilyMember.objects.all(), required=False, allow_null=True)
 
     class Meta:
         model = FamilyMember
+        list_serializer_class = FamilyMemberListSerializer
         fields = (
             "id",
             "name",
@@ -23,9 +174,20 @@ class FamilyMemberSerializer(serializers.ModelSerializer):
             "household",
         )
 
+    def get_fields(self):
+        fields = super().get_fields()
+
+        # Uniqueness of names is validated once for a whole batch
+        if "spouses" in self.context:
+            fields["name"].validators = [
+                validator for validator in fields["name"].validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
 
-class HouseholdSerializer(serializers.ModelSerializer):
-    housing_type = serializers.SlugRelatedField(slug_field="name", queryset=HousingType.objects.all())
+
+class HouseholdSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    housing_type = EnumSlugRelatedField(queryset=HousingType.objects.all())
     members = FamilyMemberSerializer(many=True, required=False, allow_null=True)
 
     class Meta:
@@ -35,3 +197,123 @@ class HouseholdSerializer(serializers.ModelSerializer):
             "housing_type",
             "members",
         )
+
+
+# Fields read by HouseholdValuesSerializer, in the order of the
+# fields of HouseholdSerializer and FamilyMemberSerializer
+HOUSEHOLD_VALUES = ("id", "housing_type")
+MEMBER_VALUES = (
+    "id",
+    "name",
+    "gender",
+    "marital_status",
+    "spouse__name",
+    "occupation_type",
+    "annual_income",
+    "dob",
+    "household",
+)
+
+# Fields of HouseholdValuesSerializer that may be selected with the
+# ``fields`` key of the serializer context
+HOUSEHOLD_FIELDS = ("id", "housing_type", "members")
+
+
+def household_values(fields=HOUSEHOLD_FIELDS):
+    """
+    Returns the columns to read with ``values()`` to serialize the
+    given fields. The ``id`` is always read since pagination and
+    streaming are keyed on it.
+    """
+    return tuple(field for field in HOUSEHOLD_VALUES if field == "id" or field in fields)
+
+
+def represent_households(households, fields=HOUSEHOLD_FIELDS):
+    """
+    Returns the representations of rows of ``household_values()``
+    in the same shape as HouseholdSerializer, limited to ``fields``.
+
+    The members of every household are read with a single
+    ``values_list()`` query unless they are not selected, and
+    enumerated fields are resolved through lookup tables of the
+    EnumCache.
+    """
+    tables = {}
+
+    def name(model, pk):
+        if model not in tables:
+            tables[model] = get_enum_cache(model).get_names()
+        table = tables[model]
+        return table[pk] if pk in table else get_enum_cache(model).get_name(pk)
+
+    members = {household["id"]: [] for household in households}
+    if members and "members" in fields:
+        rows = FamilyMember.objects.filter(household__in=list(members)).order_by("pk").values_list(*MEMBER_VALUES)
+        for pk, member_name, gender, marital_status, spouse, occupation_type, income, dob, household in rows:
+            members[household].append({
+                "id": pk,
+                "name": member_name,
+                "gender": name(Gender, gender),
+                "marital_status": name(MaritalStatus, marital_status),
+                "spouse": spouse,
+                "occupation_type": name(OccupationType, occupation_type),
+                "annual_income": income,
+                "dob": dob.isoformat(),
+                "household": household,
+            })
+
+    representations = []
+    for household in households:
+        representation = {}
+        if "id" in fields:
+            representation["id"] = household["id"]
+        if "housing_type" in fields:
+            representation["housing_type"] = name(HousingType, household["housing_type"])
+        if "members" in fields:
+            representation["members"] = members[household["id"]]
+        representations.append(representation)
+    return representations
+
+
+class HouseholdValuesListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        with metrics.timed("serialize"):
+            return represent_households(list(data), self.context.get("fields", HOUSEHOLD_FIELDS))
+
+
+class HouseholdValuesSerializer(serializers.BaseSerializer):
+    """
+    Read-only fast path of HouseholdSerializer
+
+    Serializes rows of ``Household.objects.values(*household_values())``
+    into the same output as HouseholdSerializer without going
+    through the field machinery of ModelSerializer, issuing a
+    single query for the members of any number of households.
+    The output may be limited to some of ``HOUSEHOLD_FIELDS`` with
+    the ``fields`` key of the context.
+    """
+
+    class Meta:
+        list_serializer_class = HouseholdValuesListSerializer
+
+    def to_representation(self, instance):
+        with metrics.timed("serialize"):
+            return represent_households([instance], self.context.get("fields", HOUSEHOLD_FIELDS))[0]
+
+
+class GrantSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    housing_type = EnumSlugRelatedField(queryset=HousingType.objects.all(), required=False, allow_null=True)
+
+    class Meta:
+        model = Grant
+        fields = (
+            "id",
+            "name",
+            "min_income",
+            "max_income",
+            "min_age",
+            "max_age",
+            "housing_type",
+            "with_spouse",
+        )
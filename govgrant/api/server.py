@@ -0,0 +1,356 @@
+import math
+import os
+import random
+import select
+import selectors
+import signal
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.core.servers import basehttp
+from django.db import connections
+from django.urls import get_resolver
+
+from govgrant.api import serializers
+from govgrant.api.cache import clear_enum_caches, get_enum_cache
+from govgrant.api.models import EnumModel
+
+try:
+    import uvicorn
+except ImportError:  # pragma: no cover
+    uvicorn = None
+
+
+def warm_application():
+    """
+    Builds what each worker would otherwise build on its first requests,
+    so that workers forked afterwards share it: the URL resolver, the
+    fields of the serializers (and with them the model metadata they
+    read) and the lookup tables of the enumerated types.
+
+    The database connections opened to load the lookup tables are
+    closed so that no connection is shared with the forked workers.
+    """
+    resolver = get_resolver()
+    resolver.reverse_dict  # Populates the resolver
+    for serializer_class in (
+        serializers.HouseholdSerializer, serializers.FamilyMemberSerializer, serializers.GrantSerializer,
+    ):
+        serializer_class().fields
+    try:
+        clear_enum_caches()
+        for model in apps.get_app_config("api").get_models():
+            if issubclass(model, EnumModel):
+                get_enum_cache(model).warm()
+    finally:
+        connections.close_all()
+
+
+def listen(host, port, backlog=2048):
+    """Returns a socket listening on an address, to be shared by the workers"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((host, port))
+        listener.listen(backlog)
+    except OSError:
+        listener.close()
+        raise
+    return listener
+
+
+def request_limit(max_requests, jitter):
+    """
+    Returns the number of requests after which a worker is recycled,
+    spread by a random jitter so that workers are not all recycled at
+    once, or None if workers are never recycled
+    """
+    if not max_requests:
+        return None
+    return max_requests + random.randint(0, jitter)
+
+
+class WSGIRequestHandler(basehttp.WSGIRequestHandler):
+    """WSGIRequestHandler closing persistent connections left idle"""
+
+    def handle(self):
+        try:
+            super().handle()
+        except socket.timeout:
+            pass
+
+
+class WSGIWorker(basehttp.WSGIServer):
+    """
+    Worker serving a WSGI application on a listening socket shared
+    with the other workers
+
+    Connections are accepted only while one of ``threads`` threads
+    is free to handle them, leaving the other connections to other
+    workers. Persistent connections are closed after ``keepalive``
+    idle seconds. The worker stops accepting connections once it is
+    stopped or has handled ``max_requests`` requests, and returns from
+    ``serve()`` once its requests are finished.
+    """
+
+    def __init__(self, listener, application, threads, keepalive, max_requests=None):
+        host, port = listener.getsockname()[:2]
+        handler = type("WSGIRequestHandler", (WSGIRequestHandler,), {"timeout": keepalive or None})
+        super().__init__((host, port), handler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = listener
+        self.socket.setblocking(False)
+        # Unlike HTTPServer, avoids a reverse DNS lookup on each worker start
+        self.server_name, self.server_port = host, port
+        self.setup_environ()
+        self.set_app(self.counted(application))
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi")
+        self.slots = threading.BoundedSemaphore(threads)
+        self.max_requests = max_requests
+        self.requests = 0
+        self.alive = True
+
+    def counted(self, application):
+        """Wraps the application to count the requests of the worker"""
+
+        def wrapper(environ, start_response):
+            self.requests += 1
+            return application(environ, start_response)
+
+        return wrapper
+
+    def stop(self, *args):
+        self.alive = False
+
+    def serve(self):
+        """Serves requests until the worker is stopped or recycled"""
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.socket, selectors.EVENT_READ)
+            while self.alive and (self.max_requests is None or self.requests < self.max_requests):
+                if not self.slots.acquire(timeout=1):
+                    continue
+                connection = self.accept(selector)
+                if connection is None:
+                    self.slots.release()
+                    continue
+                self.executor.submit(self.process_request_thread, *connection)
+        self.executor.shutdown(wait=True)
+
+    def accept(self, selector):
+        """
+        Returns the next connection and its address, or None if there was
+        none for a second or another worker accepted it first
+        """
+        if not selector.select(timeout=1):
+            return None
+        try:
+            request, client_address = self.socket.accept()
+        except (BlockingIOError, InterruptedError):
+            return None
+        request.setblocking(True)
+        return request, client_address
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+
+def serve_wsgi(listener, application, threads, keepalive, max_requests=0, max_requests_jitter=0):
+    """Serves a WSGI application in a worker process until SIGTERM or SIGINT"""
+    worker = WSGIWorker(
+        listener, application, threads, keepalive, request_limit(max_requests, max_requests_jitter),
+    )
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.serve()
+
+
+def serve_asgi(listener, application, threads, keepalive, max_requests=0, max_requests_jitter=0):  # pragma: no cover
+    """
+    Serves an ASGI application in a worker process with uvicorn, which
+    stops gracefully on SIGTERM or SIGINT. The number of threads of the
+    application is given by the ``ASGI_THREADS`` setting instead.
+    """
+    config = uvicorn.Config(
+        application,
+        interface="asgi3",
+        lifespan="off",
+        timeout_keep_alive=keepalive,
+        limit_max_requests=request_limit(max_requests, max_requests_jitter),
+    )
+    uvicorn.Server(config).run(sockets=[listener])
+
+
+class PreforkServer:
+    """
+    Master process forking ``workers`` worker processes serving
+    requests on a shared listening socket
+
+    The application is imported and warmed by the master before it
+    forks, so that workers share its memory and serve their first
+    requests as fast as the next ones. Workers which exit, such as
+    workers recycled after their maximum number of requests, are
+    replaced.
+
+    SIGHUP gracefully reloads the workers: the master warms the
+    application again, forks new workers and stops the previous ones
+    once they have finished their requests, so that no request is
+    dropped. The code of the application is not reloaded. SIGTERM or
+    SIGINT gracefully stops the workers and the master. Workers which
+    have not stopped after ``graceful_timeout`` seconds are killed.
+    """
+
+    def __init__(self, listener, serve, workers, graceful_timeout=30, warm=warm_application, log=print):
+        self.listener = listener
+        self.serve = serve
+        self.size = workers
+        self.graceful_timeout = graceful_timeout
+        self.warm = warm
+        self.log = log
+        self.workers = set()
+        self.retiring = {}
+        self.reloading = False
+        self.stopping = False
+
+    def handle_reload(self, *args):
+        self.reloading = True
+
+    def handle_stop(self, *args):
+        self.stopping = True
+
+    def run(self):
+        """Runs the master until it is stopped"""
+        wakeup_r, wakeup_w = os.pipe()
+        os.set_blocking(wakeup_r, False)
+        os.set_blocking(wakeup_w, False)
+        self.wakeup = wakeup_r, wakeup_w
+        previous = {
+            signum: signal.signal(signum, handler)
+            for signum, handler in (
+                (signal.SIGHUP, self.handle_reload),
+                (signal.SIGTERM, self.handle_stop),
+                (signal.SIGINT, self.handle_stop),
+                (signal.SIGCHLD, lambda *args: None),
+            )
+        }
+        previous_wakeup_fd = signal.set_wakeup_fd(wakeup_w)
+        try:
+            self.warm()
+            self.spawn_workers()
+            while not self.stopping:
+                if self.reloading:
+                    self.reload()
+                self.reap_workers()
+                self.spawn_workers()
+                self.kill_expired()
+                self.sleep()
+            self.stop()
+        finally:
+            signal.set_wakeup_fd(previous_wakeup_fd)
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+            os.close(wakeup_r)
+            os.close(wakeup_w)
+
+    def sleep(self):
+        """Waits for a signal, for at most a second"""
+        try:
+            if select.select([self.wakeup[0]], [], [], 1)[0]:
+                while os.read(self.wakeup[0], 1024):
+                    pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def spawn_workers(self):
+        while len(self.workers) < self.size and not self.stopping:
+            self.workers.add(self.spawn_worker())
+
+    def spawn_worker(self):
+        """Forks a worker process and returns its pid"""
+        pid = os.fork()
+        if pid:
+            return pid
+        status = 0
+        try:
+            signal.set_wakeup_fd(-1)
+            for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+                signal.signal(signum, signal.SIG_DFL)
+            os.close(self.wakeup[0])
+            os.close(self.wakeup[1])
+            self.serve(self.listener)
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        finally:
+            connections.close_all()
+            os._exit(status)
+
+    def reap_workers(self):
+        """Forgets the workers which have exited"""
+        for pid in self.workers | set(self.retiring):
+            try:
+                exited, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                exited, status = pid, 0
+            if not exited:
+                continue
+            self.retiring.pop(pid, None)
+            if pid in self.workers:
+                self.workers.discard(pid)
+                code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+                self.log(f"Worker {pid} exited with status {code}, replacing it.")
+                if code:
+                    # Avoids forking workers in a loop when they cannot start
+                    time.sleep(1)
+
+    def reload(self):
+        """Replaces the workers by new ones, stopping the previous ones gracefully"""
+        self.reloading = False
+        self.log("Reloading workers.")
+        self.warm()
+        previous, self.workers = self.workers, set()
+        self.spawn_workers()
+        self.terminate(previous)
+
+    def terminate(self, pids):
+        """Stops workers gracefully, killing them after ``graceful_timeout`` seconds"""
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            self.retiring[pid] = deadline
+
+    def kill_expired(self):
+        """Kills the workers which have not stopped gracefully in time"""
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if deadline <= now:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                # Forgotten once reaped
+                self.retiring[pid] = math.inf
+
+    def stop(self):
+        """Stops every worker gracefully and waits for them to exit"""
+        self.log("Stopping workers.")
+        previous, self.workers = self.workers, set()
+        self.terminate(previous)
+        while self.retiring:
+            self.kill_expired()
+            self.reap_workers()
+            if self.retiring:
+                time.sleep(0.05)
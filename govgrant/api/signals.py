@@ -0,0 +1,115 @@
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from govgrant.api import eligibility, engine
+from govgrant.api.cache import HOUSEHOLDS_VERSION_KEY, bump_version, get_enum_cache
+from govgrant.api.models import EnumModel, FamilyMember, Grant, Household, aggregates_refreshed
+
+
+def invalidate_enum_cache(sender, **kwargs):
+    """
+    Invalidates the EnumCache of an EnumModel subclass whenever
+    one of its rows is saved or deleted.
+
+    The cache is invalidated again once the transaction commits
+    so that no other process can reload it in between.
+    """
+    cache = get_enum_cache(sender)
+    cache.invalidate()
+    transaction.on_commit(cache.invalidate)
+
+
+# Connected to each EnumModel subclass only, since a receiver
+# of every sender prevents fast deletes of any other model
+for model in apps.get_app_config("api").get_models():
+    if issubclass(model, EnumModel):
+        post_save.connect(invalidate_enum_cache, sender=model)
+        post_delete.connect(invalidate_enum_cache, sender=model)
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Applies the SQLITE_PRAGMAS setting to each new SQLite connection"""
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            for pragma, value in settings.SQLITE_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+@receiver(post_save, sender=FamilyMember)
+def refresh_aggregates_on_member_save(sender, instance, **kwargs):
+    """
+    Refreshes the aggregates of the household of a saved member,
+    as well as those of its previous household if it was moved.
+    """
+    household_ids = {instance.household_id, getattr(instance, "_loaded_household_id", None)}
+    household_ids.discard(None)
+    if household_ids:
+        Household.objects.filter(pk__in=household_ids).refresh_aggregates()
+    instance._loaded_household_id = instance.household_id
+
+
+@receiver(post_delete, sender=FamilyMember)
+def refresh_aggregates_on_member_delete(sender, instance, **kwargs):
+    """Refreshes the aggregates of the household of a deleted member"""
+    if instance.household_id is not None:
+        Household.objects.filter(pk=instance.household_id).refresh_aggregates()
+
+
+@receiver(aggregates_refreshed, sender=Household)
+def mark_refreshed_households_dirty(sender, queryset, **kwargs):
+    """Reloads refreshed households into the columnar eligibility engine"""
+    engine.mark_dirty(queryset.values_list("pk", flat=True))
+
+
+@receiver([post_save, post_delete], sender=Household)
+def mark_household_dirty(sender, instance, **kwargs):
+    """Reloads a saved or deleted household into the columnar eligibility engine"""
+    engine.mark_dirty([instance.pk])
+
+
+@receiver(aggregates_refreshed, sender=Household)
+def refresh_eligibility_on_aggregates_refreshed(sender, queryset, **kwargs):
+    """Recomputes the grants that refreshed households are eligible for"""
+    eligibility.refresh_households(queryset)
+
+
+@receiver(post_save, sender=Household)
+def refresh_eligibility_on_household_save(sender, instance, raw=False, **kwargs):
+    """Recomputes the grants that a saved household is eligible for"""
+    if not raw:
+        eligibility.refresh_households(Household.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Grant)
+def refresh_eligibility_on_grant_save(sender, instance, raw=False, **kwargs):
+    """Recomputes the eligible households of a saved grant"""
+    if not raw:
+        eligibility.refresh_grant(instance)
+
+
+def bump_households_version():
+    """
+    Bumps the data version of households, both immediately and once
+    the transaction commits so that no response rendered from
+    uncommitted data is cached under the new version.
+    """
+    bump_version(HOUSEHOLDS_VERSION_KEY)
+    transaction.on_commit(lambda: bump_version(HOUSEHOLDS_VERSION_KEY))
+
+
+@receiver([post_save, post_delete], sender=Household)
+@receiver([post_save, post_delete], sender=FamilyMember)
+def bump_households_version_on_write(sender, **kwargs):
+    """Bumps the data version of households on any write"""
+    bump_households_version()
+
+
+@receiver(aggregates_refreshed, sender=Household)
+def bump_households_version_on_aggregates_refreshed(sender, **kwargs):
+    """Bumps the data version of households on bulk writes"""
+    bump_households_version()
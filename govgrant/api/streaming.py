@@ -0,0 +1,84 @@
+def iter_chunks(queryset, chunk_size):
+    """
+    Iterates over a queryset in chunks of model instances, or of
+    rows of ``values()`` including the ``id`` field.
+
+    Each chunk is fetched with an ``pk > last_pk`` lookup on the
+    primary key index, so that every chunk costs the same to fetch
+    and any ``prefetch_related()`` lookups are only performed for
+    the instances in the current chunk. Only a single chunk is ever
+    held in memory at any one time.
+    """
+
+    queryset = queryset.order_by("pk")
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last = chunk[-1]
+        last_pk = last["id"] if isinstance(last, dict) else last.pk
+
+
+def iter_json_array(items, render):
+    """
+    Encodes an iterable of items as a JSON array, one item at a time.
+
+    The ``render`` callable is used to encode each item as bytes.
+    """
+
+    yield b"["
+    for i, item in enumerate(items):
+        if i:
+            yield b","
+        yield render(item)
+    yield b"]"
+
+
+def iter_ndjson(items, render):
+    """
+    Encodes an iterable of items as newline delimited JSON.
+
+    The ``render`` callable is used to encode each item as bytes.
+    """
+
+    for item in items:
+        yield render(item) + b"\n"
+
+
+def iter_pk_chunks(queryset, chunk_size):
+    """
+    Iterates over the pks of a queryset in chunks of lists.
+
+    Like ``iter_chunks()``, each chunk is fetched with a
+    ``pk > last_pk`` lookup, but only the pks are read.
+    """
+
+    queryset = queryset.order_by("pk").values_list("pk", flat=True)
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1]
+
+
+def iter_int_array(chunks):
+    """
+    Encodes chunks of integers as a compact JSON array, one
+    chunk at a time.
+    """
+
+    separator = b"["
+    for chunk in chunks:
+        yield separator + ",".join(map(str, chunk)).encode()
+        separator = b","
+    yield b"]" if separator == b"," else b"[]"
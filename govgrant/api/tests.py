@@ -1,10 +1,47 @@
+import asyncio
+import datetime
+import decimal
+import csv
+import functools
+import gzip
+import importlib
+import io
 import json
-
-from django.test import TestCase
+import os
+import signal
+import tempfile
+import threading
+import types
+import unittest
+from unittest import mock
+from urllib.request import urlopen
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.sqlite3 import base as sqlite3_base
+from django.contrib.contenttypes.models import ContentType
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer as DRFJSONRenderer
 from rest_framework.test import APITestCase
 
-from govgrant.api.models import EnumModel, HousingType, Household, Gender, MaritalStatus, OccupationType, FamilyMember
+from govgrant.api import (
+    benchmarks, eligibility, engine, exports, importers, metrics, parsers, renderers, routers, server,
+)
+from govgrant.api.cache import bump_version, clear_enum_caches, get_enum_cache
+from govgrant.api.filters import GRANT_PARAMS, filter_households, household_matches, parse_criteria
+from govgrant.api.generators import HouseholdGenerator
+from govgrant.api.handlers import ThreadPoolASGIHandler
+from govgrant.api.models import (
+    EnumModel, HousingType, Household, Gender, MaritalStatus, OccupationType, FamilyMember, Grant, GrantEligibility,
+    LoadedFixture,
+)
+from govgrant.api.serializers import HOUSEHOLD_VALUES, HouseholdSerializer, HouseholdValuesSerializer
+from govgrant.api.views import prefetch_members
 
 
 # List of data fixtures
@@ -12,6 +49,66 @@ INITIAL_DATA_FIXTURES = "initial.json"
 SAMPLE_DATA_FIXTURES = "sample.json"
 
 
+class FrozenDate(datetime.date):
+    """Date class whose today() is pinned to the date of the sample dataset"""
+
+    @classmethod
+    def today(cls):
+        return datetime.date(2020, 2, 10)
+
+
+# Patches the datetime module used by filters.py so that age-based
+# filters remain consistent regardless of the current date
+freeze_today = mock.patch(
+    "govgrant.api.filters.datetime",
+    types.SimpleNamespace(date=FrozenDate, timedelta=datetime.timedelta),
+)
+
+
+class _AssertQueryBudgetContext(CaptureQueriesContext):
+    def __init__(self, test_case, budget, connection):
+        self.test_case = test_case
+        self.budget = budget
+        super().__init__(connection)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return
+        executed = len(self)
+        self.test_case.assertLessEqual(
+            executed, self.budget,
+            "%d queries executed, budget is %d\nCaptured queries were:\n%s" % (
+                executed, self.budget,
+                "\n".join(
+                    "%d. %s" % (i, query["sql"]) for i, query in enumerate(self.captured_queries, start=1)
+                )
+            )
+        )
+
+
+class QueryBudgetMixin:
+    """
+    Mixin for TestCases that asserts the number of queries
+    executed by a block of code stays within a fixed budget.
+
+    Unlike ``assertNumQueries``, the assertion only fails when
+    the budget is exceeded, which makes it suitable for guarding
+    endpoints against N+1 query regressions. Process-wide caches
+    and grant eligibility are warmed beforehand so that only steady
+    state is measured.
+    """
+
+    def assertQueryBudget(self, budget, using=DEFAULT_DB_ALIAS):
+        # Reload mappings whose version token was cleared since
+        clear_enum_caches()
+        for model in (HousingType, Gender, MaritalStatus, OccupationType):
+            get_enum_cache(model).warm()
+        for grant in Grant.objects.all():
+            eligibility.refresh_stale_grant(grant)
+        return _AssertQueryBudgetContext(self, budget, connections[using])
+
+
 class HousingTypeTestCase(TestCase):
     """TestCases for HousingType model"""
 
@@ -26,6 +123,57 @@ class HousingTypeTestCase(TestCase):
         self.assertEqual(str(e), name)
 
 
+class EnumCacheTestCase(TestCase):
+    """TestCases for EnumCache"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+    )
+
+    def setUp(self):
+        self.cache = get_enum_cache(HousingType)
+        self.cache.warm()
+
+    def tearDown(self):
+        # Changes are rolled back without notifying the caches
+        clear_enum_caches()
+
+    def test_if_lookups_do_not_query_database_once_warm(self):
+        """Test if lookups do not query database once warm"""
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.get_name(1), "HDB")
+            self.assertEqual(self.cache.get_pk("Landed"), 3)
+            self.assertEqual(self.cache.get_pk_iexact("hdb"), 1)
+            instance = self.cache.get_instance("Condominium")
+        self.assertEqual((instance.pk, instance.name), (2, "Condominium"))
+
+    def test_if_cache_is_invalidated_when_row_is_saved(self):
+        """Test if cache is invalidated when row is saved"""
+        HousingType.objects.filter(pk=1).update(name="Public")  # Bypasses signals
+        self.assertEqual(self.cache.get_name(1), "HDB")
+        HousingType.objects.get(pk=1).save()
+        self.assertEqual(self.cache.get_name(1), "Public")
+
+    def test_if_cache_is_invalidated_when_row_is_deleted(self):
+        """Test if cache is invalidated when row is deleted"""
+        HousingType.objects.create(name="Shophouse").delete()
+        with self.assertRaises(KeyError):
+            self.cache.get_pk("Shophouse")
+
+    def test_if_cache_is_reloaded_when_version_is_bumped_elsewhere(self):
+        """Test if cache is reloaded when version is bumped by another process"""
+        HousingType.objects.filter(pk=1).update(name="Public")  # Bypasses signals
+        bump_version(self.cache.version_key)
+        with self.settings(ENUM_CACHE_CHECK_INTERVAL=0):
+            self.assertEqual(self.cache.get_name(1), "Public")
+
+    def test_if_cache_is_reloaded_when_lookup_misses(self):
+        """Test if cache is reloaded when lookup misses"""
+        HousingType.objects.bulk_create([HousingType(pk=4, name="Shophouse")])  # Bypasses signals
+        self.assertEqual(self.cache.get_pk("Shophouse"), 4)
+
+
 class HouseholdTestCase(TestCase):
     """TestCases for Household model"""
 
@@ -43,6 +191,320 @@ class HouseholdTestCase(TestCase):
         self.assertEqual(str(self.household), "Household 1")
 
 
+class HouseholdAggregatesTestCase(TestCase):
+    """TestCases for aggregates maintained on Household model"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def assertAggregates(self, pk, **expected):
+        household = Household.objects.get(pk=pk)
+        actual = {name: getattr(household, name) for name in expected}
+        self.assertEqual(actual, expected)
+
+    def test_if_aggregates_are_populated_from_fixtures(self):
+        """Test if aggregates are populated from fixtures"""
+        self.assertAggregates(
+            2,
+            total_income=176000,
+            member_count=2,
+            married_pair_count=1,
+            youngest_dob=datetime.date(2010, 1, 1),
+            oldest_dob=datetime.date(1980, 1, 1),
+        )
+
+    def test_if_aggregates_are_refreshed_when_member_is_created(self):
+        """Test if aggregates are refreshed when member is created"""
+        FamilyMember.objects.create(
+            name="Baby Tan",
+            dob="2020-01-01",
+            gender=Gender.objects.get(pk=1),
+            marital_status=MaritalStatus.objects.get(pk=1),
+            occupation_type=OccupationType.objects.get(pk=1),
+            annual_income=0,
+            household=Household.objects.get(pk=1),
+        )
+        self.assertAggregates(
+            1,
+            total_income=10000,
+            member_count=2,
+            youngest_dob=datetime.date(2020, 1, 1),
+            oldest_dob=datetime.date(2010, 1, 1),
+        )
+
+    def test_if_aggregates_are_refreshed_when_member_is_moved(self):
+        """Test if aggregates of both households are refreshed when member is moved"""
+        member = FamilyMember.objects.get(name="Mary Doe")
+        member.household = Household.objects.get(pk=3)
+        member.save()
+        self.assertAggregates(2, total_income=88000, member_count=1, married_pair_count=0)
+        self.assertAggregates(3, total_income=98000, member_count=2, married_pair_count=0)
+
+    def test_if_aggregates_are_refreshed_when_member_is_deleted(self):
+        """Test if aggregates are refreshed when member is deleted"""
+        FamilyMember.objects.get(name="John Doe").delete()
+        self.assertAggregates(
+            2,
+            total_income=88000,
+            member_count=1,
+            married_pair_count=0,
+            youngest_dob=datetime.date(2010, 1, 1),
+            oldest_dob=datetime.date(2010, 1, 1),
+        )
+
+    def test_if_command_verifies_and_rebuilds_aggregates(self):
+        """Test if management command verifies and rebuilds aggregates"""
+        Household.objects.update(total_income=0, youngest_dob=None)
+        with self.assertRaisesMessage(CommandError, "Aggregates of 4 household(s) are out of date."):
+            call_command("rebuild_household_aggregates", verify=True, stdout=io.StringIO())
+        call_command("rebuild_household_aggregates", stdout=io.StringIO())
+        call_command("rebuild_household_aggregates", verify=True, stdout=io.StringIO())
+        self.assertAggregates(4, total_income=200000, youngest_dob=datetime.date(2019, 1, 1))
+
+
+class ImportHouseholdsCommandTestCase(TestCase):
+    """TestCases for import_households management command"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def member(self, name, spouse=None, **kwargs):
+        """Returns the data of a member to import"""
+        data = {
+            "name": name,
+            "gender": "Male",
+            "marital_status": "Married" if spouse else "Single",
+            "spouse": spouse,
+            "occupation_type": "Employed",
+            "annual_income": 1000,
+            "dob": "1990-01-01",
+        }
+        data.update(kwargs)
+        return data
+
+    def import_file(self, suffix, content, **options):
+        """Imports content from a temporary file and returns the output"""
+        with tempfile.NamedTemporaryFile("w", suffix=suffix, delete=False) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        stdout = io.StringIO()
+        call_command("import_households", file.name, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_if_command_imports_households_from_jsonl(self):
+        """Test if management command imports households from JSONL in chunks"""
+        households = [
+            {"housing_type": "HDB", "members": [self.member("Ah Seng", spouse="Ah Lian")]},
+            {"housing_type": "Landed", "members": []},
+            {"housing_type": "HDB", "members": [self.member("Ah Lian"), self.member("Ah Boy", spouse="Paul Tan")]},
+        ]
+        content = "\n".join(json.dumps(household) for household in households)
+        output = self.import_file(".jsonl", content, chunk_size=2, verbosity=2)
+        self.assertIn("Imported 3 household(s) and 3 member(s) in", output)
+        self.assertIn("rows/sec", output)
+
+        # Assert that households, members and spouses are imported
+        self.assertEqual(list(Household.objects.filter(pk__gt=4).values_list("pk", "housing_type__name")), [
+            (5, "HDB"),
+            (6, "Landed"),
+            (7, "HDB"),
+        ])
+        spouses = dict(FamilyMember.objects.filter(pk__gt=5).values_list("name", "spouse__name"))
+        self.assertEqual(spouses, {"Ah Seng": "Ah Lian", "Ah Lian": "Ah Seng", "Ah Boy": "Paul Tan"})
+        self.assertEqual(FamilyMember.objects.get(name="Paul Tan").spouse.name, "Ah Boy")
+
+        # Assert that aggregates of imported households are rebuilt
+        household = Household.objects.get(pk=7)
+        self.assertEqual((household.member_count, household.total_income), (2, 2000))
+        call_command("rebuild_household_aggregates", verify=True, stdout=io.StringIO())
+
+    def test_if_command_imports_households_from_csv(self):
+        """Test if management command imports households from CSV"""
+        content = (
+            "household,housing_type,name,gender,marital_status,spouse,occupation_type,annual_income,dob\n"
+            "a,Condominium,Ah Seng,Male,Married,Ah Lian,Employed,1000,1990-01-01\n"
+            "a,Condominium,Ah Lian,Female,Married,Ah Seng,Employed,2000,1991-01-01\n"
+            "b,HDB,Ah Boy,Male,Single,,Student,0,2010-01-01\n"
+        )
+        self.import_file(".csv", content)
+        household = Household.objects.get(pk=5)
+        self.assertEqual(household.housing_type.name, "Condominium")
+        self.assertEqual((household.member_count, household.married_pair_count, household.total_income), (2, 1, 3000))
+        self.assertEqual(Household.objects.get(pk=6).members.get().name, "Ah Boy")
+
+    def test_if_command_fails_on_invalid_record(self):
+        """Test if management command fails on invalid record"""
+        content = json.dumps({"housing_type": "Castle", "members": []})
+        with self.assertRaisesMessage(CommandError, "Household 1: invalid value 'Castle'"):
+            self.import_file(".jsonl", content)
+
+    def test_if_command_fails_on_unknown_spouse(self):
+        """Test if management command fails on unknown spouse"""
+        content = json.dumps({"housing_type": "HDB", "members": [self.member("Ah Seng", spouse="Nobody")]})
+        with self.assertRaisesMessage(CommandError, "Unknown spouse(s): Nobody"):
+            self.import_file(".jsonl", content)
+
+    def test_if_failed_import_keeps_imported_chunks_consistent(self):
+        """Test if households of chunks imported before a failure have their spouses and aggregates"""
+        households = [
+            {"housing_type": "HDB", "members": [self.member("Ah Seng", spouse="Ah Lian"), self.member("Ah Lian")]},
+            {"housing_type": "Castle", "members": []},
+        ]
+        content = "\n".join(json.dumps(household) for household in households)
+        with self.assertRaisesMessage(CommandError, "Household 2: invalid value 'Castle'"):
+            self.import_file(".jsonl", content, chunk_size=1)
+        household = Household.objects.get(members__name="Ah Seng")
+        self.assertEqual((household.member_count, household.married_pair_count, household.total_income), (2, 1, 2000))
+        self.assertEqual(FamilyMember.objects.get(name="Ah Lian").spouse.name, "Ah Seng")
+        call_command("rebuild_household_aggregates", verify=True, stdout=io.StringIO())
+
+    def test_if_household_pks_are_read_back_in_order(self):
+        """Test if the pks of households inserted in bulk are read back in order"""
+        rows = [(get_enum_cache(HousingType).get_pk(name), 0, 0, 0, None, None) for name in ("HDB", "Landed", "HDB")]
+        columns = importers.HouseholdImporter.household_columns
+        for returning in (False, True):
+            with self.subTest(returning=returning):
+                features = connections[DEFAULT_DB_ALIAS].features
+                with mock.patch.object(features, "can_return_rows_from_bulk_insert", returning):
+                    pks = importers.insert_rows_returning_pks(Household, columns, rows, batch_size=2)
+                households = Household.objects.in_bulk(pks)
+                self.assertEqual([households[pk].housing_type.name for pk in pks], ["HDB", "Landed", "HDB"])
+                self.assertEqual(pks, sorted(pks))
+
+    def test_if_command_fails_on_unknown_format(self):
+        """Test if management command fails on unknown format"""
+        with self.assertRaisesMessage(CommandError, "Unable to infer format of file, use --format."):
+            self.import_file(".txt", "")
+
+
+class GenerateHouseholdsCommandTestCase(TestCase):
+    """TestCases for generating households and benchmarking them"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+    )
+
+    def test_if_generator_is_deterministic(self):
+        """Test if generator generates the same households given the same seed"""
+        as_of = datetime.date(2020, 2, 10)
+        first = list(HouseholdGenerator(seed=42, as_of=as_of).generate(50))
+        second = list(HouseholdGenerator(seed=42, as_of=as_of).generate(50))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, list(HouseholdGenerator(seed=7, as_of=as_of).generate(50)))
+
+        # Spouses are married to each other within the same household
+        for household in first:
+            spouses = {member["name"]: member["spouse"] for member in household["members"]}
+            for name, spouse in spouses.items():
+                if spouse is not None:
+                    self.assertEqual(spouses[spouse], name)
+
+    def test_if_command_generates_households(self):
+        """Test if command generates households with consistent aggregates"""
+        stdout = io.StringIO()
+        call_command("generate_households", 200, seed=1, as_of=datetime.date(2020, 2, 10), stdout=stdout)
+        self.assertIn("Generated 200 household(s)", stdout.getvalue())
+        self.assertEqual(Household.objects.count(), 200)
+        call_command("rebuild_household_aggregates", verify=True, stdout=io.StringIO())
+
+        # Names of members must be unique
+        with self.assertRaisesMessage(CommandError, "try another --prefix"):
+            call_command("generate_households", 1, seed=1, stdout=io.StringIO())
+
+    def test_if_benchmark_writes_results(self):
+        """Test if benchmark writes the measurements of every scenario"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "benchmark.json")
+            call_command("benchmark", sizes="20,30", repeat=2, in_place=True, output=output, stdout=io.StringIO())
+            stdout = io.StringIO()
+            call_command(
+                "benchmark", sizes="40", repeat=2, in_place=True, seed=1,
+                output=os.path.join(directory, "next.json"), compare=output, stdout=stdout,
+            )
+            with open(output) as file:
+                results = json.load(file)
+
+        self.assertEqual(set(results["results"]), {"20", "30"})
+        scenarios = results["results"]["30"]
+        self.assertEqual(set(scenarios), {
+            *(f"grant: {name}" for name in GRANT_PARAMS), "list", "retrieve", "add_member", "remove_member",
+        })
+        for result in scenarios.values():
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["queries"], 0)
+        self.assertIn("Compared to", stdout.getvalue())
+        self.assertFalse(FamilyMember.objects.filter(name__regex=r"^Benchmark [0-9]+$").exists())
+
+
+class BootstrapCommandTestCase(TestCase):
+    """TestCases for preparing the database on startup"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.fixture = os.path.join(directory.name, "housing.json")
+        self.write_fixture("HDB")
+
+    def write_fixture(self, name):
+        with open(self.fixture, "w") as file:
+            json.dump([{"model": "api.housingtype", "pk": 1, "fields": {"name": name}}], file)
+
+    def bootstrap(self, *fixtures, **options):
+        stdout = io.StringIO()
+        call_command("bootstrap", *fixtures, verbosity=0, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_if_bootstrap_skips_applied_migrations(self):
+        """Test if bootstrap does not run migrate when every migration is applied"""
+        with mock.patch("govgrant.api.management.commands.bootstrap.call_command") as command:
+            stdout = self.bootstrap(no_fixtures=True)
+        command.assert_not_called()
+        self.assertIn("No migrations to apply.", stdout)
+
+    def test_if_bootstrap_loads_fixture_once(self):
+        """Test if bootstrap loads a fixture only when its content changed"""
+        self.bootstrap(self.fixture)
+        self.assertEqual(HousingType.objects.get(pk=1).name, "HDB")
+        loaded = LoadedFixture.objects.get()
+        self.assertEqual(loaded.name, "housing.json")
+
+        # Unchanged fixtures are skipped without running loaddata, after
+        # reading the applied migrations and looking up the fixture
+        HousingType.objects.filter(pk=1).update(name="Changed")
+        with self.assertNumQueries(3):
+            stdout = self.bootstrap(self.fixture)
+        self.assertIn("Fixture 'housing.json' is already loaded.", stdout)
+        self.assertEqual(HousingType.objects.get(pk=1).name, "Changed")
+
+        # Changed fixtures are loaded again
+        self.write_fixture("Condominium")
+        self.bootstrap(self.fixture)
+        self.assertEqual(HousingType.objects.get(pk=1).name, "Condominium")
+        self.assertNotEqual(LoadedFixture.objects.get().sha256, loaded.sha256)
+
+    def test_if_bootstrap_loads_configured_fixtures(self):
+        """Test if bootstrap defaults to the BOOTSTRAP_FIXTURES setting"""
+        with override_settings(BOOTSTRAP_FIXTURES=[self.fixture]):
+            self.bootstrap()
+        self.assertTrue(HousingType.objects.filter(name="HDB").exists())
+        with override_settings(BOOTSTRAP_FIXTURES=[]):
+            self.bootstrap()
+        self.assertEqual(LoadedFixture.objects.count(), 1)
+
+    def test_if_bootstrap_rejects_missing_fixture(self):
+        """Test if bootstrap fails on a fixture that does not exist"""
+        with self.assertRaisesMessage(CommandError, "Fixture 'missing.json' does not exist."):
+            self.bootstrap("missing.json")
+        self.assertFalse(LoadedFixture.objects.exists())
+
+
 class GenderTestCase(TestCase):
     """TestCases for Gender model"""
 
@@ -139,6 +601,85 @@ class FamilyMemberTestCase(TestCase):
         self.assertEqual(first.spouse, second)
         self.assertEqual(second.spouse, first)
 
+    def test_if_spouse_is_mirrored_with_a_single_insert(self):
+        """Test if saving a married member costs no more queries than a single member"""
+        fields = {
+            "dob": "1970-01-01",
+            "gender": self.gender,
+            "marital_status": self.marital_status,
+            "occupation_type": self.occupation_type,
+            "annual_income": 10000,
+        }
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as single:
+            FamilyMember.objects.create(name="Single", **fields)
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as married:
+            second = FamilyMember.objects.create(name="Mavis Lim", spouse=self.member, **fields)
+        self.assertEqual(len(married), len(single))
+
+        # Assert that the spouse was mirrored in the database
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.spouse, second)
+
+    def test_if_queryset_update_mirrors_spouse(self):
+        """Test if QuerySet.update mirrors the spouse field in the database"""
+        second = FamilyMember.objects.create(
+            name="Mavis Lim",
+            dob="1970-01-01",
+            gender=self.gender,
+            marital_status=self.marital_status,
+            occupation_type=self.occupation_type,
+            annual_income=10000,
+        )
+        FamilyMember.objects.filter(pk=second.pk).update(spouse=self.member)
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.spouse, second)
+
+    def test_if_spouse_inserted_later_adopts_existing_link(self):
+        """Test if a member inserted after its spouse refers to it is linked back"""
+        # Refer to a member that does not exist yet, as done by raw imports
+        first = FamilyMember.objects.get(pk=self.member.pk)
+        with connections[DEFAULT_DB_ALIAS].constraint_checks_disabled():
+            FamilyMember.objects.filter(pk=first.pk).update(spouse_id=first.pk + 1)
+        second = FamilyMember.objects.create(
+            pk=first.pk + 1,
+            name="Mavis Lim",
+            dob="1970-01-01",
+            gender=self.gender,
+            marital_status=self.marital_status,
+            occupation_type=self.occupation_type,
+            annual_income=10000,
+        )
+        second.refresh_from_db()
+        self.assertEqual(second.spouse, first)
+
+    def test_if_spouse_is_mirrored_without_triggers(self):
+        """Test if spouses are mirrored by FamilyMember on databases without triggers"""
+        migration = importlib.import_module("govgrant.api.migrations.0006_spouse_triggers")
+        schema_editor = types.SimpleNamespace(
+            connection=types.SimpleNamespace(vendor="mysql", alias=DEFAULT_DB_ALIAS), execute=None,
+        )
+        with self.assertLogs("govgrant.api.migrations", level="WARNING") as logs:
+            migration.create_spouse_triggers(apps, schema_editor)
+        self.assertIn("Spouse triggers are not available for mysql", logs.output[0])
+
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            for sql in migration.DROP_SPOUSE_TRIGGERS["sqlite"]:
+                cursor.execute(sql)
+        fields = {
+            "dob": "1970-01-01",
+            "gender": self.gender,
+            "marital_status": self.marital_status,
+            "occupation_type": self.occupation_type,
+            "annual_income": 10000,
+        }
+        with mock.patch("govgrant.api.models.SPOUSE_TRIGGER_VENDORS", ()):
+            second = FamilyMember.objects.create(name="Mavis Lim", spouse=self.member, **fields)
+            girl = FamilyMember(name="Ah Girl", **fields)
+            FamilyMember.objects.create_batch([FamilyMember(name="Ah Boy", spouse=girl, **fields), girl])
+        spouses = dict(FamilyMember.objects.values_list("name", "spouse__name"))
+        self.assertEqual(spouses[self.name], second.name)
+        self.assertEqual(spouses["Ah Girl"], "Ah Boy")
+
 
 class HouseholdEndpointTestCase(APITestCase):
     """TestCases for /household/ endpoint"""
@@ -198,6 +739,23 @@ class HouseholdEndpointTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(json.loads(response.content), expected)
 
+    def test_if_http_post_request_fails_with_unknown_enum_name(self):
+        """Test if HTTP POST request fails with unknown enum name"""
+
+        # Execute API call
+        response = self.client.post(
+            path="/households/",
+            data={"housing_type": "Castle"},
+            format="json",
+        )
+
+        # Assert API response
+        expected = {
+            "housing_type": ["Object with name=Castle does not exist."],
+        }
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content), expected)
+
     def test_if_http_post_request_adds_family_member_to_a_household(self):
         """Test if HTTP POST request adds family member to a household"""
 
@@ -447,6 +1005,1347 @@ class HouseholdEndpointTestCase(APITestCase):
         self.assertEqual(json.loads(response.content), expected)
 
 
+class HouseholdResponseCacheTestCase(APITestCase):
+    """TestCases for cached responses of /households/ endpoint"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def test_if_http_get_request_is_served_from_cache(self):
+        """Test if HTTP GET request is served from cache without any query"""
+        params = {"housing_type": "hdb", "max_income": 100000}
+        response = self.client.get(path="/households/", data=params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.has_header("ETag"))
+
+        # Query parameters are normalized regardless of their order
+        with self.assertNumQueries(0):
+            cached = self.client.get(path="/households/?max_income=100000&housing_type=hdb")
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached["ETag"], response["ETag"])
+        self.assertEqual(cached["Content-Type"], response["Content-Type"])
+
+    def test_if_http_get_request_with_matching_etag_is_not_modified(self):
+        """Test if HTTP GET request with matching ETag returns 304 without any query"""
+        response = self.client.get(path="/households/1/")
+        with self.assertNumQueries(0):
+            revalidated = self.client.get(path="/households/1/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(revalidated["ETag"], response["ETag"])
+
+        # Other query parameters are another representation
+        response = self.client.get(path="/households/", data={"max_age": 18}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_writes_invalidate_cached_responses(self):
+        """Test if writes through every endpoint invalidate cached responses"""
+        member = {
+            "name": "Tan Ah Boy",
+            "gender": "Male",
+            "marital_status": "Single",
+            "spouse": None,
+            "occupation_type": "Student",
+            "annual_income": 0,
+            "dob": "2019-01-01",
+        }
+        writes = [
+            lambda: self.client.post(path="/households/3/add_member/", data=member, format="json"),
+            lambda: self.client.post(path="/households/3/add_member/", data=[{**member, "name": "Tan Ah Girl"}], format="json"),
+            lambda: self.client.delete(path="/households/3/remove_member/", data={"name": "Tan Ah Boy"}, format="json"),
+            lambda: self.client.patch(path="/households/3/", data={"housing_type": "Landed"}, format="json"),
+            lambda: self.client.delete(path="/households/4/"),
+        ]
+        for write in writes:
+            before = self.client.get(path="/households/")
+            write()
+            after = self.client.get(path="/households/", HTTP_IF_NONE_MATCH=before["ETag"])
+            self.assertEqual(after.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(after["ETag"], before["ETag"])
+            self.assertNotEqual(after.content, before.content)
+
+    def test_if_responses_are_cached_in_file_based_cache(self):
+        """Test if responses are cached in a file based cache"""
+        with tempfile.TemporaryDirectory() as location:
+            backend = {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location}
+            with override_settings(CACHES={**settings.CACHES, "responses": backend}):
+                response = self.client.get(path="/households/")
+                self.assertEqual(len(os.listdir(location)), 1)
+                with self.assertNumQueries(0):
+                    cached = self.client.get(path="/households/")
+                self.assertEqual(cached.content, response.content)
+
+
+class ThreadPoolASGIHandlerTestCase(TransactionTestCase):
+    """TestCases for serving the API under ASGI"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def setUp(self):
+        self.handler = ThreadPoolASGIHandler(max_workers=2)
+
+    def tearDown(self):
+        self.handler.executor.shutdown()
+
+    def request(self, url):
+        """Returns the status and body of a GET request under ASGI"""
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(self.handler(benchmarks.asgi_scope(url), receive, send))
+        return messages[0]["status"], b"".join(message.get("body", b"") for message in messages[1:])
+
+    def test_if_asgi_responses_match_wsgi_responses(self):
+        """Test if ASGI responses match WSGI responses"""
+        for url in ("/households/", "/households/2/", "/households/?with_spouse=1&max_age=60", "/households/?stream=ndjson"):
+            with self.subTest(url=url):
+                expected = self.client.get(url)
+                status_code, content = self.request(url)
+                self.assertEqual(status_code, expected.status_code)
+                self.assertEqual(content, expected.getvalue())
+
+    def test_if_asgi_returns_not_found(self):
+        """Test if ASGI returns 404 on unknown households"""
+        status_code, _ = self.request("/households/404/")
+        self.assertEqual(status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_if_benchmark_compares_handlers(self):
+        """Test if benchmark compares WSGI and ASGI handlers"""
+        stdout = io.StringIO()
+        call_command("benchmark_handlers", requests=10, concurrency=2, json=True, stdout=stdout)
+        results = json.loads(stdout.getvalue())
+        self.assertEqual(set(results), {"wsgi", "asgi", "django-asgi"})
+        for result in results.values():
+            self.assertEqual((result["requests"], result["errors"]), (10, 0))
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+
+        stdout = io.StringIO()
+        call_command("benchmark_handlers", requests=2, concurrency=1, handlers=["wsgi"], stdout=stdout)
+        self.assertIn("p99 ms", stdout.getvalue())
+
+
+def pid_application(environ, start_response):
+    """WSGI application responding with the pid of the process serving it"""
+    content = str(os.getpid()).encode()
+    start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", str(len(content)))])
+    return [content]
+
+
+class ServerTestCase(TestCase):
+    """TestCases for serving the application with pre-forked workers"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+    )
+
+    def setUp(self):
+        self.listener = server.listen("127.0.0.1", 0)
+        self.addCleanup(self.listener.close)
+        self.url = f"http://127.0.0.1:{self.listener.getsockname()[1]}/"
+
+    def get(self):
+        with urlopen(self.url, timeout=5) as response:
+            return int(response.read())
+
+    def test_if_application_is_warmed(self):
+        """Test if lookup tables are loaded before forking, without keeping connections"""
+        clear_enum_caches()
+        with mock.patch("govgrant.api.server.connections") as connections_:
+            server.warm_application()
+        connections_.close_all.assert_called_once_with()
+        with self.assertNumQueries(0):
+            for model in (HousingType, Gender, MaritalStatus, OccupationType):
+                self.assertTrue(get_enum_cache(model).get_names())
+
+    def test_if_worker_is_recycled(self):
+        """Test if worker stops accepting requests after its maximum number of requests"""
+        worker = server.WSGIWorker(self.listener, pid_application, threads=2, keepalive=1, max_requests=3)
+        thread = threading.Thread(target=worker.serve)
+        thread.start()
+        try:
+            for _ in range(3):
+                self.assertEqual(self.get(), os.getpid())
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+            self.assertEqual(worker.requests, 3)
+        finally:
+            worker.stop()
+            thread.join()
+
+    def test_if_request_limit_is_spread(self):
+        """Test if request limit is spread by the jitter, or unlimited"""
+        self.assertIsNone(server.request_limit(0, 10))
+        limits = {server.request_limit(100, 10) for _ in range(100)}
+        self.assertTrue(limits <= set(range(100, 111)))
+        self.assertGreater(len(limits), 1)
+
+    def test_if_server_reloads_workers(self):
+        """Test if SIGHUP replaces the workers and SIGTERM stops them"""
+        serve = functools.partial(server.serve_wsgi, application=pid_application, threads=2, keepalive=1)
+        logs = []
+        prefork = server.PreforkServer(self.listener, serve, 2, graceful_timeout=5, warm=mock.Mock(), log=logs.append)
+        seen = []
+
+        def control():
+            try:
+                seen.append(self.get())
+                first = set(prefork.workers)
+                os.kill(os.getpid(), signal.SIGHUP)
+                for _ in range(100):
+                    pid = self.get()
+                    if pid not in first:
+                        seen.append(pid)
+                        break
+                seen.append(first)
+            finally:
+                os.kill(os.getpid(), signal.SIGTERM)
+
+        thread = threading.Thread(target=control)
+        thread.start()
+        prefork.run()
+        thread.join()
+
+        first_pid, reloaded_pid, first = seen
+        self.assertIn(first_pid, first)
+        self.assertNotIn(reloaded_pid, first)
+        self.assertEqual(prefork.warm.call_count, 2)
+        self.assertEqual(logs, ["Reloading workers.", "Stopping workers."])
+        self.assertFalse(prefork.workers)
+        self.assertFalse(prefork.retiring)
+        with self.assertRaises(ChildProcessError):
+            os.waitpid(first_pid, os.WNOHANG)
+
+    def test_if_command_rejects_invalid_options(self):
+        """Test if serve command fails on invalid addresses and worker counts"""
+        with self.assertRaisesMessage(CommandError, "'localhost' is not a valid address"):
+            call_command("serve", bind="localhost", stdout=io.StringIO())
+        with self.assertRaisesMessage(CommandError, "--workers and --threads must be positive."):
+            call_command("serve", workers=0, stdout=io.StringIO())
+        with self.assertRaisesMessage(CommandError, "Several workers require shared caches, but 'default', 'responses'"):
+            call_command("serve", workers=2, stdout=io.StringIO())
+
+        # Shared caches pass the check
+        backend = {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache"}
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            "default": {**backend, "LOCATION": os.path.join(location, "versions")},
+            "responses": {**backend, "LOCATION": os.path.join(location, "responses")},
+        }):
+            with self.assertRaisesMessage(CommandError, "Could not listen on"):
+                call_command("serve", workers=2, bind=self.url[len("http://"):-1], stdout=io.StringIO())
+
+
+class JSONRendererTestCase(APITestCase):
+    """TestCases for the JSON renderer and parser"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    data = {
+        "dob": datetime.date(2020, 2, 10),
+        "created": datetime.datetime(2020, 2, 10, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        "time": datetime.time(8, 30),
+        "income": decimal.Decimal("1.50"),
+        "name": "Tan Ah Kow \u2028\u2029 \u9648",
+        "large": 2 ** 70,
+        1: [None, True, 0.5],
+    }
+
+    def test_if_encoders_render_identically_to_drf(self):
+        """Test if the stdlib and orjson encoders render identically to DRF"""
+        expected = DRFJSONRenderer().render(self.data)
+        self.assertEqual(renderers.stdlib_dumps(self.data), expected)
+        self.assertEqual(renderers.dumps(self.data), expected)
+        if renderers.orjson is not None:
+            self.assertEqual(renderers.orjson_dumps(self.data), expected)
+
+    def test_if_households_render_identically_to_drf(self):
+        """Test if household responses render identically to DRF"""
+        response = self.client.get(path="/households/", format="json")
+        self.assertEqual(response.content, DRFJSONRenderer().render(response.data))
+
+    def test_if_indented_responses_are_rendered_by_drf(self):
+        """Test if responses requested with an indent are rendered by DRF"""
+        response = self.client.get(path="/households/1/", HTTP_ACCEPT="application/json; indent=4")
+        self.assertTrue(response.content.startswith(b'{\n    "id": 1'))
+
+    def test_if_parser_rejects_invalid_json(self):
+        """Test if the parser rejects malformed JSON and out of range floats"""
+        for content in (b'{"name":', b'{"name": NaN}'):
+            response = self.client.post(
+                path="/households/1/add_member/", data=content, content_type="application/json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertTrue(json.loads(response.content)["detail"].startswith("JSON parse error - "))
+
+    def test_if_parser_decodes_other_encodings_with_drf(self):
+        """Test if the parser decodes request bodies of other encodings with DRF"""
+        parser = parsers.JSONParser()
+        content = '{"name": "Tan Ah Kow"}'
+        for encoding in ("utf-8", "utf-16"):
+            data = parser.parse(io.BytesIO(content.encode(encoding)), parser_context={"encoding": encoding})
+            self.assertEqual(data, {"name": "Tan Ah Kow"})
+
+    def test_if_benchmark_compares_encoders(self):
+        """Test if benchmark compares the throughput of encoders"""
+        stdout = io.StringIO()
+        call_command("benchmark_json", households=20, repeat=2, json=True, stdout=stdout)
+        results = json.loads(stdout.getvalue())
+        self.assertTrue({"drf", "stdlib"} <= set(results))
+        self.assertEqual(len({result["bytes"] for result in results.values()}), 1)
+
+        stdout = io.StringIO()
+        call_command("benchmark_json", households=2, repeat=1, stdout=stdout)
+        self.assertIn("households/s", stdout.getvalue())
+
+
+class SQLiteStorageProfileTestCase(TestCase):
+    """TestCases for the PRAGMAs applied to SQLite connections"""
+
+    def pragmas(self, profile):
+        """Returns the PRAGMAs of a new connection to a database file under a profile"""
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            SQLITE_PRAGMAS=settings.SQLITE_PROFILES[profile],
+        ):
+            wrapper = sqlite3_base.DatabaseWrapper(
+                {**connections[DEFAULT_DB_ALIAS].settings_dict, "NAME": os.path.join(directory, "db.sqlite3")},
+            )
+            try:
+                with wrapper.cursor() as cursor:
+                    return {
+                        pragma: cursor.execute(f"PRAGMA {pragma}").fetchone()[0]
+                        for pragma in ("journal_mode", "synchronous", "cache_size", "busy_timeout")
+                    }
+            finally:
+                wrapper.close()
+
+    def test_if_tuned_profile_is_applied_to_new_connections(self):
+        """Test if the tuned profile is applied to new connections"""
+        self.assertEqual(self.pragmas("tuned"), {
+            "journal_mode": "wal",
+            "synchronous": 1,  # NORMAL
+            "cache_size": -65536,
+            "busy_timeout": 5000,
+        })
+
+    def test_if_default_profile_keeps_sqlite_defaults(self):
+        """Test if the default profile keeps the defaults of SQLite"""
+        self.assertEqual(self.pragmas("default")["journal_mode"], "delete")
+
+    def test_if_benchmark_compares_storage_profiles(self):
+        """Test if benchmark compares readers and writers under each storage profile"""
+        stdout = io.StringIO()
+        call_command("benchmark_storage", households=10, readers=1, writers=1, duration=0.2, json=True, stdout=stdout)
+        results = json.loads(stdout.getvalue())
+        self.assertEqual(set(results), {"default", "tuned"})
+        for result in results.values():
+            self.assertEqual((result["reads"]["errors"], result["writes"]["errors"]), (0, 0))
+            self.assertGreater(result["writes"]["requests"], 0)
+
+        stdout = io.StringIO()
+        call_command("benchmark_storage", households=1, readers=1, writers=0, duration=0, profiles=["tuned"], stdout=stdout)
+        self.assertIn("reads/s", stdout.getvalue())
+
+
+class ReplicaRouterTestCase(TransactionTestCase):
+    """TestCases for routing reads to a replica kept in sync with sync_replicas"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+    )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        connections.databases["replica1"] = {
+            **connections.databases[DEFAULT_DB_ALIAS], "NAME": os.path.join(directory.name, "replica.sqlite3"),
+        }
+        self.addCleanup(connections.databases.pop, "replica1")
+        self.addCleanup(connections.__delitem__, "replica1")
+        self.addCleanup(lambda: connections["replica1"].close())
+        settings = self.settings(DATABASE_REPLICAS=["replica1"])
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command("sync_replicas", stdout=io.StringIO())
+        routers.reset()
+
+    def test_if_reads_are_routed_to_replica_and_writes_to_primary(self):
+        """Test if reads of the api app are routed to the replica and writes to the primary"""
+        router = routers.ReplicaRouter()
+        self.assertEqual(router.db_for_read(Household), "replica1")
+        self.assertEqual(router.db_for_read(ContentType), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_write(Household), DEFAULT_DB_ALIAS)
+
+        # Reads of a thread that has written are pinned to the primary
+        self.assertEqual(router.db_for_read(Household), DEFAULT_DB_ALIAS)
+        routers.reset()
+        with routers.primary():
+            self.assertEqual(router.db_for_read(Household), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_read(Household), "replica1")
+        self.assertFalse(router.allow_migrate("replica1", "api"))
+
+    def test_if_client_reads_its_own_writes(self):
+        """Test if a client reads its own writes until the replica is synced"""
+        response = self.client.post(path="/households/", data={"housing_type": "HDB"}, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.cookies["pin_primary"]["max-age"], settings.REPLICA_STICKINESS)
+        path = f"/households/{json.loads(response.content)['id']}/"
+
+        # Other clients read the replica, while the writer is pinned
+        # to the primary
+        other = Client()
+        response = other.get(path)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertEqual(self.client.get(path).status_code, status.HTTP_200_OK)
+
+        call_command("sync_replicas", stdout=io.StringIO())
+        self.assertEqual(other.get(path).status_code, status.HTTP_200_OK)
+
+    def test_if_write_requests_read_from_primary(self):
+        """Test if write requests of a client that has not written read from the primary"""
+        response = self.client.post(path="/households/", data={"housing_type": "HDB"}, content_type="application/json")
+        path = f"/households/{json.loads(response.content)['id']}/add_member/"
+        member = {
+            "name": "Ah Seng",
+            "gender": "Male",
+            "marital_status": "Single",
+            "occupation_type": "Employed",
+            "annual_income": 1000,
+            "dob": "1990-01-01",
+        }
+
+        # The household and the member are not in the replica yet
+        other = Client()
+        response = other.post(path, data=member, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = Client().post(path, data=member, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content)["name"], ["family member with this name already exists."])
+
+    def test_if_sync_fails_without_replicas(self):
+        """Test if sync_replicas fails without replicas"""
+        with self.settings(DATABASE_REPLICAS=[]), self.assertRaises(CommandError):
+            call_command("sync_replicas")
+
+
+@override_settings(PERFORMANCE_METRICS=True, SLOW_REQUEST_THRESHOLD=60000)
+class PerformanceMiddlewareTestCase(APITestCase):
+    """TestCases for per-request performance instrumentation"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def setUp(self):
+        metrics.registry.clear()
+
+    def server_timing(self, response):
+        """Returns the Server-Timing header as a dict of metrics"""
+        timings = {}
+        for metric in response["Server-Timing"].split(", "):
+            name, *params = metric.split(";")
+            timings[name] = dict(param.split("=", 1) for param in params)
+        return timings
+
+    def test_if_response_has_server_timing(self):
+        """Test if response has Server-Timing header with each phase"""
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            response = self.client.get(path="/households/", data={"max_income": 200000})
+        timings = self.server_timing(response)
+        self.assertEqual(set(timings), {"db", "serialize", "render", "total"})
+        self.assertEqual(timings["db"]["desc"], f'"{len(queries)} queries"')
+        self.assertGreater(float(timings["serialize"]["dur"]), 0)
+        self.assertGreater(float(timings["render"]["dur"]), 0)
+        self.assertGreaterEqual(float(timings["total"]["dur"]), float(timings["db"]["dur"]))
+
+    @override_settings(PERFORMANCE_METRICS=False)
+    def test_if_middleware_is_disabled_by_setting(self):
+        """Test if middleware is disabled by setting"""
+        response = self.client.get(path="/households/")
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    @override_settings(SLOW_REQUEST_THRESHOLD=0)
+    def test_if_slow_requests_are_logged_with_normalized_queries(self):
+        """Test if slow requests are logged with their normalized queries"""
+        with self.assertLogs("govgrant.api.performance", level="WARNING") as logs:
+            self.client.delete(path="/households/2/remove_member/", data={"name": "Mary Doe"}, format="json")
+        message = logs.output[0]
+        self.assertIn("Slow request: DELETE /households/2/remove_member/ 200", message)
+        self.assertRegex(message, r'1x DELETE FROM "api_familymember" WHERE .* "api_familymember"\."name" IN \(\?\)')
+        self.assertNotIn("Mary Doe", message)
+
+    def test_if_metrics_endpoint_exposes_histograms(self):
+        """Test if /metrics endpoint exposes histograms per view and action"""
+        self.client.get(path="/households/")
+        self.client.get(path="/households/1/")
+        self.client.get(path="/households/1/")
+        response = self.client.get(path="/metrics")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = response.content.decode()
+        self.assertIn("# TYPE govgrant_request_duration_ms histogram", content)
+        self.assertIn('govgrant_request_duration_ms_count{view="HouseholdViewSet.list"} 1', content)
+        self.assertIn('govgrant_db_queries_count{view="HouseholdViewSet.retrieve"} 2', content)
+        self.assertIn('govgrant_db_queries_bucket{view="HouseholdViewSet.retrieve",le="+Inf"} 2', content)
+
+    def test_if_sql_is_normalized(self):
+        """Test if literals and lists of placeholders are normalized"""
+        self.assertEqual(
+            metrics.normalize_sql("SELECT * FROM t WHERE a = 'x''y' AND b IN (%s, %s, %s) AND c > 10 LIMIT %s"),
+            "SELECT * FROM t WHERE a = ? AND b IN (...) AND c > ? LIMIT ?",
+        )
+
+
+class HouseholdEndpointQueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    """TestCases for number of queries issued by /household/ endpoint"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+    )
+
+    def setUp(self):
+        # Create households with married couples so that every
+        # related field of every member has to be resolved
+        housing_type = HousingType.objects.get(name="HDB")
+        gender = Gender.objects.get(name="Male")
+        marital_status = MaritalStatus.objects.get(name="Married")
+        occupation_type = OccupationType.objects.get(name="Employed")
+        for i in range(5):
+            household = Household.objects.create(housing_type=housing_type)
+            first = FamilyMember.objects.create(
+                name=f"Husband {i}",
+                dob="1980-01-01",
+                gender=gender,
+                marital_status=marital_status,
+                spouse=None,
+                occupation_type=occupation_type,
+                annual_income=48000,
+                household=household,
+            )
+            FamilyMember(
+                name=f"Wife {i}",
+                dob="1980-01-01",
+                gender=gender,
+                marital_status=marital_status,
+                spouse=first,
+                occupation_type=occupation_type,
+                annual_income=48000,
+                household=household,
+            ).save()
+        self.household = household
+
+    def test_if_http_get_request_lists_households_within_query_budget(self):
+        """Test if HTTP GET request lists households within query budget"""
+        with self.assertQueryBudget(2):
+            response = self.client.get(
+                path="/households/",
+                data={"max_age": 50},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)), 5)
+
+    def test_if_http_get_request_retrieves_household_within_query_budget(self):
+        """Test if HTTP GET request retrieves a household within query budget"""
+        with self.assertQueryBudget(2):
+            response = self.client.get(
+                path=f"/households/{self.household.pk}/",
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)["members"]), 2)
+
+    def test_if_http_post_request_adds_member_within_query_budget(self):
+        """Test if HTTP POST request adds a member within query budget"""
+        data = {
+            "name": "Tan Ah Kow",
+            "gender": "Male",
+            "marital_status": "Single",
+            "spouse": None,
+            "occupation_type": "Employed",
+            "annual_income": 48000,
+            "dob": "2019-10-01",
+        }
+        with self.assertQueryBudget(12):
+            response = self.client.post(
+                path=f"/households/{self.household.pk}/add_member/",
+                data=data,
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_if_http_delete_request_removes_member_within_query_budget(self):
+        """Test if HTTP DELETE request removes a member within query budget"""
+        with self.assertQueryBudget(11):
+            response = self.client.delete(
+                path=f"/households/{self.household.pk}/remove_member/",
+                data={"name": "Wife 4"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)["members"]), 1)
+
+    def test_if_http_delete_request_removes_members_within_query_budget(self):
+        """Test if HTTP DELETE request removes a list of members within query budget"""
+        with self.assertQueryBudget(11):
+            response = self.client.delete(
+                path=f"/households/{self.household.pk}/remove_member/",
+                data={"name": ["Husband 4", "Wife 4"]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["members"], [])
+
+        # Assert that the aggregates of the household were refreshed
+        self.household.refresh_from_db()
+        self.assertEqual(self.household.member_count, 0)
+        self.assertEqual(self.household.married_pair_count, 0)
+
+    def test_if_http_delete_request_unlinks_spouse_of_removed_member(self):
+        """Test if HTTP DELETE request unlinks the spouse of a removed member"""
+        response = self.client.delete(
+            path=f"/households/{self.household.pk}/remove_member/",
+            data={"name": "Wife 4"},
+            format="json",
+        )
+        self.assertEqual(json.loads(response.content)["members"][0]["spouse"], None)
+        self.household.refresh_from_db()
+        self.assertEqual(self.household.married_pair_count, 0)
+
+    def test_if_http_delete_request_removes_no_member_unless_all_are_found(self):
+        """Test if HTTP DELETE request removes no member unless all names are found"""
+        response = self.client.delete(
+            path=f"/households/{self.household.pk}/remove_member/",
+            data={"name": ["Wife 4", "Husband 3", "Nobody"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            json.loads(response.content),
+            {"name": "could not find 'Husband 3', 'Nobody' in current household"},
+        )
+        self.assertEqual(self.household.members.count(), 2)
+
+    def test_if_http_delete_request_fails_if_household_not_found(self):
+        """Test if HTTP DELETE request fails if household not found"""
+        response = self.client.delete(
+            path="/households/999/remove_member/",
+            data={"name": "Wife 4"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.delete(
+            path="/households/abc/remove_member/",
+            data={"name": "Wife 4"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class HouseholdBatchAddMemberTestCase(QueryBudgetMixin, APITestCase):
+    """TestCases for adding a batch of members to /household/ endpoint"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def member(self, name, spouse=None, marital_status="Single"):
+        """Returns the data payload of a member"""
+        return {
+            "name": name,
+            "gender": "Female",
+            "marital_status": marital_status,
+            "spouse": spouse,
+            "occupation_type": "Employed",
+            "annual_income": 12000,
+            "dob": "1990-01-01",
+        }
+
+    def test_if_http_post_request_adds_batch_of_members_within_query_budget(self):
+        """Test if HTTP POST request adds a batch of members within query budget"""
+        data = [
+            self.member("Ah Seng", spouse="Ah Lian", marital_status="Married"),
+            self.member("Ah Lian", spouse="Ah Seng", marital_status="Married"),
+            self.member("Ah Boy", spouse="Ah Girl", marital_status="Married"),
+            self.member("Ah Girl", marital_status="Married"),  # Mirrored from Ah Boy
+            self.member("Grandma", spouse="Tan Ah Kow", marital_status="Married"),  # Existing member
+            self.member("Baby"),
+        ]
+        with self.assertQueryBudget(14):
+            response = self.client.post(path="/households/3/add_member/", data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # Assert API response
+        content = json.loads(response.content)
+        self.assertEqual([member["name"] for member in content], [member["name"] for member in data])
+        self.assertEqual({member["household"] for member in content}, {3})
+        self.assertEqual(content[3]["spouse"], "Ah Boy")
+
+        # Assert that spouses are linked symmetrically
+        spouses = dict(FamilyMember.objects.filter(household=3).values_list("name", "spouse__name"))
+        self.assertEqual(spouses, {
+            "Tan Ah Kow": "Grandma",
+            "Ah Seng": "Ah Lian",
+            "Ah Lian": "Ah Seng",
+            "Ah Boy": "Ah Girl",
+            "Ah Girl": "Ah Boy",
+            "Grandma": "Tan Ah Kow",
+            "Baby": None,
+        })
+
+        # Assert that household aggregates are refreshed
+        household = Household.objects.get(pk=3)
+        self.assertEqual((household.member_count, household.married_pair_count, household.total_income), (7, 3, 82000))
+
+    def test_if_http_post_request_fails_on_invalid_batch(self):
+        """Test if HTTP POST request fails on invalid batch without adding any member"""
+        data = [
+            self.member("Paul Tan"),  # Existing member
+            self.member("Twin"),
+            self.member("Twin"),
+            self.member("Mistress", spouse="John Doe"),  # Already married
+            self.member("Narcissus", spouse="Narcissus"),  # Married to themself
+            self.member("Stranger"),
+        ]
+        response = self.client.post(path="/households/3/add_member/", data=data, format="json")
+        expected = [
+            {"name": ["family member with this name already exists."]},
+            {"name": ["family member with this name already exists."]},
+            {"name": ["family member with this name already exists."]},
+            {"spouse": ["'John Doe' is already married."]},
+            {"spouse": ["A family member cannot be their own spouse."]},
+            {},
+        ]
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content), expected)
+        self.assertEqual(FamilyMember.objects.count(), 5)
+
+    def test_if_http_post_request_fails_on_chain_of_spouses_in_batch(self):
+        """Test if HTTP POST request fails when a spouse in the batch is given a different spouse"""
+        data = [
+            self.member("Ah Seng", spouse="Ah Lian", marital_status="Married"),
+            self.member("Ah Lian", spouse="Paul Tan", marital_status="Married"),  # Existing unmarried member
+        ]
+        response = self.client.post(path="/households/3/add_member/", data=data, format="json")
+        expected = [
+            {"spouse": ["'Ah Lian' is married to 'Paul Tan' in this batch."]},
+            {},
+        ]
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content), expected)
+        self.assertEqual(FamilyMember.objects.count(), 5)
+
+    def test_if_http_post_request_fails_on_invalid_member_in_batch(self):
+        """Test if HTTP POST request fails on invalid member in batch"""
+        data = [
+            self.member("Stranger", spouse="Nobody"),
+            self.member("Ah Seng"),
+        ]
+        response = self.client.post(path="/households/3/add_member/", data=data, format="json")
+        expected = [
+            {"spouse": ["Object with name=Nobody does not exist."]},
+            {},
+        ]
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content), expected)
+        self.assertEqual(FamilyMember.objects.count(), 5)
+
+
+class HouseholdPaginationTestCase(QueryBudgetMixin, APITestCase):
+    """TestCases for paginating /household/ endpoint using cursors"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+    )
+
+    def setUp(self):
+        # Create households of alternating housing types
+        gender = Gender.objects.get(name="Male")
+        marital_status = MaritalStatus.objects.get(name="Single")
+        occupation_type = OccupationType.objects.get(name="Employed")
+        for i in range(7):
+            housing_type = HousingType.objects.get(name="HDB" if i % 2 else "Landed")
+            household = Household.objects.create(housing_type=housing_type)
+            FamilyMember.objects.create(
+                name=f"Member {i}",
+                dob="1980-01-01",
+                gender=gender,
+                marital_status=marital_status,
+                spouse=None,
+                occupation_type=occupation_type,
+                annual_income=10000 * i,
+                household=household,
+            )
+
+    def paginate(self, params):
+        """Follows next links and returns the ids of every page"""
+        pages = []
+        url, data = "/households/", params
+        while url:
+            with self.assertQueryBudget(2):
+                response = self.client.get(path=url, data=data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            content = json.loads(response.content)
+            pages.append([household["id"] for household in content["results"]])
+            url, data = content["next"], None
+        return pages
+
+    def test_if_http_get_request_is_not_paginated_by_default(self):
+        """Test if HTTP GET request is not paginated by default"""
+        response = self.client.get(path="/households/", format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)), 7)
+
+    def test_if_http_get_request_paginates_households_by_id(self):
+        """Test if HTTP GET request paginates households by id"""
+        pages = self.paginate({"page_size": 3})
+        self.assertEqual(pages, [[1, 2, 3], [4, 5, 6], [7]])
+
+    def test_if_http_get_request_paginates_filtered_households(self):
+        """Test if HTTP GET request paginates filtered households"""
+        pages = self.paginate({"page_size": 2, "housing_type": "hdb", "max_income": 55000})
+        self.assertEqual(pages, [[2, 4], [6]])
+
+
+class HouseholdFieldSelectionTestCase(QueryBudgetMixin, APITestCase):
+    """TestCases for selecting the fields of /household/ endpoint"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def setUp(self):
+        self.expected = json.loads(self.client.get(path="/households/", format="json").content)
+
+    def test_if_http_get_request_omits_members_without_querying_them(self):
+        """Test if HTTP GET request omits members without querying them"""
+        for params in ({"omit": "members"}, {"fields": "id,housing_type"}):
+            with self.assertQueryBudget(1):
+                response = self.client.get(path="/households/", data=params, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                json.loads(response.content),
+                [{"id": household["id"], "housing_type": household["housing_type"]} for household in self.expected],
+            )
+
+    def test_if_http_get_request_expands_members(self):
+        """Test if HTTP GET request expands members in addition to selected fields"""
+        response = self.client.get(path="/households/", data={"fields": "id", "expand": "members"}, format="json")
+        self.assertEqual(
+            json.loads(response.content),
+            [{"id": household["id"], "members": household["members"]} for household in self.expected],
+        )
+
+    def test_if_http_get_request_retrieves_selected_fields(self):
+        """Test if HTTP GET request retrieves the selected fields of a household"""
+        response = self.client.get(path="/households/1/", data={"fields": "housing_type"}, format="json")
+        self.assertEqual(json.loads(response.content), {"housing_type": self.expected[0]["housing_type"]})
+
+    def test_if_http_get_request_streams_selected_fields(self):
+        """Test if HTTP GET request streams the selected fields of households"""
+        response = self.client.get(path="/households/", data={"stream": 1, "omit": "members,housing_type"})
+        content = b"".join(response.streaming_content)
+        self.assertEqual(json.loads(content), [{"id": household["id"]} for household in self.expected])
+
+    def test_if_http_get_request_fails_with_unknown_fields(self):
+        """Test if HTTP GET request fails with unknown fields"""
+        response = self.client.get(path="/households/", data={"fields": "id,income", "expand": "id"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content), {
+            "fields": ["'income' is not one of id, housing_type, members."],
+            "expand": ["'id' is not one of members."],
+        })
+
+
+class HouseholdCountAndIdsTestCase(QueryBudgetMixin, APITestCase):
+    """TestCases for counting and listing the ids of /household/ endpoint"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def expected_ids(self, params):
+        response = self.client.get(path="/households/", data=params, format="json")
+        return [household["id"] for household in json.loads(response.content)]
+
+    @freeze_today
+    def test_if_http_get_request_counts_eligible_households_with_a_single_query(self):
+        """Test if HTTP GET request counts eligible households with a single query"""
+        for params in ({}, *GRANT_PARAMS.values()):
+            with self.assertQueryBudget(1):
+                response = self.client.get(path="/households/count/", data=params, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(json.loads(response.content), {"count": len(self.expected_ids(params))})
+
+    @freeze_today
+    @mock.patch("govgrant.api.views.HouseholdViewSet.ids_chunk_size", 2)
+    def test_if_http_get_request_streams_ids_of_eligible_households(self):
+        """Test if HTTP GET request streams the ids of eligible households"""
+        for params in ({}, *GRANT_PARAMS.values(), {"min_income": 10 ** 9}):
+            response = self.client.get(path="/households/ids/", data=params, format="json")
+            content = b"".join(response.streaming_content)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn(b" ", content)
+            self.assertEqual(json.loads(content), self.expected_ids(params))
+
+    def test_if_http_get_request_reads_only_ids(self):
+        """Test if HTTP GET request reads only the ids of households"""
+        with self.assertQueryBudget(1) as queries:
+            response = self.client.get(path="/households/ids/", format="json")
+            b"".join(response.streaming_content)
+        self.assertTrue(queries.captured_queries[0]["sql"].startswith('SELECT "api_household"."id" FROM'))
+
+
+class HouseholdExportTestCase(QueryBudgetMixin, APITestCase):
+    """TestCases for exporting /household/ endpoint as CSV"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def expected_rows(self, params, rows="households"):
+        response = self.client.get(path="/households/", data=params, format="json")
+        households = json.loads(response.content)
+        if rows == "households":
+            return [
+                [str(household["id"]), household["housing_type"], str(len(household["members"])),
+                 str(sum(member["annual_income"] for member in household["members"]))]
+                for household in households
+            ]
+        return [
+            [str(household["id"]), household["housing_type"], member["name"], member["gender"],
+             member["marital_status"], member["spouse"] or "", member["occupation_type"],
+             str(member["annual_income"]), member["dob"]]
+            for household in households
+            for member in household["members"]
+        ]
+
+    def export(self, params):
+        response = self.client.get(path="/households/export/", data=params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, b"".join(response.streaming_content)
+
+    @freeze_today
+    @mock.patch("govgrant.api.views.HouseholdViewSet.export_chunk_size", 2)
+    def test_if_http_get_request_exports_eligible_households(self):
+        """Test if HTTP GET request exports a row per eligible household or member"""
+        for rows in ("households", "members"):
+            for params in ({}, *GRANT_PARAMS.values(), {"min_income": 10 ** 9}):
+                response, content = self.export({**params, "rows": rows})
+                self.assertEqual(response["Content-Type"], "text/csv")
+                self.assertEqual(response["Content-Disposition"], f'attachment; filename="{rows}.csv"')
+                header, *exported = csv.reader(io.StringIO(content.decode()))
+                self.assertEqual(header, list(exports.COLUMNS[rows]))
+                self.assertEqual(exported, self.expected_rows(params, rows))
+
+    def test_if_http_get_request_exports_with_a_query_per_chunk(self):
+        """Test if HTTP GET request reads households one chunk at a time"""
+        with self.assertQueryBudget(1):
+            self.export({})
+        # Ids and members of households 1 to 3, then of household 4
+        with mock.patch("govgrant.api.views.HouseholdViewSet.export_chunk_size", 3):
+            with self.assertQueryBudget(4):
+                self.export({"rows": "members"})
+
+    def test_if_http_get_request_exports_gzip_compressed_file(self):
+        """Test if HTTP GET request exports a gzip compressed file"""
+        _, content = self.export({"rows": "members"})
+        response, compressed = self.export({"rows": "members", "compress": "gzip"})
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="members.csv.gz"')
+        self.assertEqual(gzip.decompress(compressed), content)
+
+    def test_if_http_get_request_with_invalid_options_fails(self):
+        """Test if HTTP GET request with unknown rows or compression fails"""
+        response = self.client.get(path="/households/export/", data={"rows": "grants", "compress": "zip"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content), {
+            "rows": ["'grants' is not one of households, members."],
+            "compress": ["'zip' is not one of gzip."],
+        })
+
+    @freeze_today
+    def test_if_command_exports_eligible_households_to_file(self):
+        """Test if command exports eligible households to a file"""
+        params = GRANT_PARAMS["Elder Bonus"]
+        _, content = self.export({**params, "rows": "members"})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "members.csv.gz")
+            stdout = io.StringIO()
+            call_command(
+                "export_households", path, rows="members", filters=[f"{key}={value}" for key, value in params.items()],
+                chunk_size=1, stdout=stdout,
+            )
+            with open(path, "rb") as file:
+                self.assertEqual(gzip.decompress(file.read()), content)
+            self.assertEqual(os.listdir(directory), ["members.csv.gz"])
+        self.assertIn(f"Exported {len(self.expected_rows(params, 'members'))} row(s)", stdout.getvalue())
+
+        with self.assertRaisesMessage(CommandError, "'max_salary=1' is not a valid filter"):
+            call_command("export_households", "-", filters=["max_salary=1"])
+
+
+class HouseholdStreamingTestCase(QueryBudgetMixin, APITestCase):
+    """TestCases for streaming /household/ endpoint"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def setUp(self):
+        self.expected = json.loads(self.client.get(path="/households/", format="json").content)
+
+    @mock.patch("govgrant.api.views.HouseholdViewSet.stream_chunk_size", 3)
+    def test_if_http_get_request_streams_households_as_json_array(self):
+        """Test if HTTP GET request streams households as JSON array"""
+        with self.assertQueryBudget(4):  # Two chunks of households and members
+            response = self.client.get(path="/households/", data={"stream": 1}, format="json")
+            content = b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(json.loads(content), self.expected)
+
+    @mock.patch("govgrant.api.views.HouseholdViewSet.stream_chunk_size", 2)
+    def test_if_http_get_request_streams_households_as_ndjson(self):
+        """Test if HTTP GET request streams households as NDJSON"""
+        response = self.client.get(path="/households/", data={"stream": "ndjson"}, format="json")
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual([json.loads(line) for line in lines], self.expected)
+
+    def test_if_http_get_request_streams_filtered_households(self):
+        """Test if HTTP GET request streams filtered households"""
+        response = self.client.get(path="/households/", data={"stream": 1, "housing_type": "landed"}, format="json")
+        content = b"".join(response.streaming_content)
+        self.assertEqual([household["id"] for household in json.loads(content)], [1])
+
+
+class HouseholdValuesSerializerTestCase(TestCase):
+    """TestCases for the read-only fast path of HouseholdSerializer"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def setUp(self):
+        # Add an empty household and a spouse living in another household
+        Household.objects.create(housing_type=HousingType.objects.get(name="Condominium"))
+        FamilyMember.objects.create(
+            name="Lim Ah Mei",
+            dob="1985-06-30",
+            gender=Gender.objects.get(name="Female"),
+            marital_status=MaritalStatus.objects.get(name="Married"),
+            spouse=FamilyMember.objects.filter(spouse__isnull=True).first(),
+            occupation_type=OccupationType.objects.get(name="Unemployed"),
+            annual_income=0,
+            household=Household.objects.first(),
+        )
+
+    def assertRendersIdentically(self, expected, actual):
+        renderer = DRFJSONRenderer()
+        self.assertEqual(renderer.render(actual.data), renderer.render(expected.data))
+
+    def test_if_households_are_serialized_identically(self):
+        """Test if a list of households is serialized identically to HouseholdSerializer"""
+        queryset = Household.objects.order_by("pk")
+        self.assertRendersIdentically(
+            HouseholdSerializer(prefetch_members(queryset), many=True),
+            HouseholdValuesSerializer(queryset.values(*HOUSEHOLD_VALUES), many=True),
+        )
+
+    def test_if_household_is_serialized_identically(self):
+        """Test if a single household is serialized identically to HouseholdSerializer"""
+        for household in Household.objects.values(*HOUSEHOLD_VALUES):
+            self.assertRendersIdentically(
+                HouseholdSerializer(prefetch_members(Household.objects.all()).get(pk=household["id"])),
+                HouseholdValuesSerializer(household),
+            )
+
+    def test_if_households_are_serialized_with_a_single_query(self):
+        """Test if the members of every household are read with a single query"""
+        households = list(Household.objects.values(*HOUSEHOLD_VALUES))
+        for model in (HousingType, Gender, MaritalStatus, OccupationType):
+            get_enum_cache(model).warm()
+        with self.assertNumQueries(1):
+            HouseholdValuesSerializer(households, many=True).data
+
+
+class EligibilityQueryPlanTestCase(TestCase):
+    """TestCases for query plans of grant eligibility queries"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def test_if_eligibility_queries_use_indexes(self):
+        """Test if eligibility queries use indexes"""
+        stdout = io.StringIO()
+        call_command("explain_eligibility", repeat=1, check=True, stdout=stdout)
+        for index in (
+            "api_household_type_income_idx",
+            "api_household_type_oldest_idx",
+            "api_member_household_dob_idx",
+            "api_member_household_inc_idx",
+            "api_member_household_sp_idx",
+        ):
+            self.assertIn(index, stdout.getvalue())
+
+    def test_if_check_fails_on_full_table_scan(self):
+        """Test if check fails on full table scan"""
+        queries = {"Households": Household.objects.all()}
+        with mock.patch("govgrant.api.management.commands.explain_eligibility.explain_queries", return_value=queries):
+            with self.assertRaisesMessage(CommandError, "Query plans without an index: Households"):
+                call_command("explain_eligibility", repeat=1, check=True, stdout=io.StringIO())
+
+    def test_if_housing_type_filter_matches_nothing_when_unknown(self):
+        """Test if housing type filter matches nothing when unknown"""
+        response = self.client.get(path="/households/", data={"housing_type": "castle"})
+        self.assertEqual(json.loads(response.content), [])
+
+    def test_if_income_filters_do_not_match_empty_households(self):
+        """Test if income filters do not match households without members"""
+        household = Household.objects.create(housing_type=HousingType.objects.get(name="HDB"))
+        params = {"housing_type": "hdb", "max_income": 100000}
+        for data in (params, {**params, "min_income": -1}):
+            with self.subTest(params=data):
+                response = self.client.get(path="/households/", data=data)
+                ids = [household["id"] for household in json.loads(response.content)]
+                self.assertNotIn(household.pk, ids)
+                response = self.client.get(path="/households/count/", data=data)
+                self.assertEqual(json.loads(response.content), {"count": len(ids)})
+        self.assertFalse(household_matches(Household.objects.values(*eligibility.HOUSEHOLD_FIELDS).get(
+            pk=household.pk,
+        ), parse_criteria(params)))
+
+    @freeze_today
+    def test_if_age_range_filter_matches_a_single_member(self):
+        """Test if min_age and max_age together match households with a member within both"""
+        response = self.client.get(path="/households/", data={"min_age": 20, "max_age": 50})
+        self.assertEqual([household["id"] for household in json.loads(response.content)], [2])
+
+        # Household 2 has members older than 30 and younger than 20, but none both
+        response = self.client.get(path="/households/", data={"min_age": 30, "max_age": 20})
+        self.assertEqual(json.loads(response.content), [])
+
+
+@freeze_today
+@unittest.skipIf(engine.np is None, "numpy is not installed")
+@override_settings(ELIGIBILITY_ENGINE_TTL=3600)
+@override_settings(CACHES={
+    **settings.CACHES, "responses": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+})
+class ColumnarEngineTestCase(APITestCase):
+    """TestCases for the columnar eligibility engine"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    # Criteria compared between the SQL and columnar engines
+    params = [
+        *GRANT_PARAMS.values(),
+        {},
+        {"min_income": 50000},
+        {"min_income": 10000, "max_income": 200000},
+        {"housing_type": "castle"},
+        {"with_spouse": True},
+        {"min_age": 20, "max_age": 50},
+        {"min_age": 30, "max_age": 20},
+    ]
+
+    def setUp(self):
+        engine.get_engine().clear()
+
+    def tearDown(self):
+        engine.get_engine().clear()
+
+    def assertEnginesAgree(self):
+        for params in self.params:
+            with self.subTest(params=params):
+                with override_settings(ELIGIBILITY_ENGINE="sql"):
+                    expected = self.client.get(path="/households/", data=params).json()
+                with override_settings(ELIGIBILITY_ENGINE="columnar"):
+                    response = self.client.get(path="/households/", data=params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.json(), expected)
+
+    def test_if_engine_matches_sql_results(self):
+        """Test if engine matches SQL results"""
+        columnar = engine.get_engine()
+        with mock.patch.object(columnar, "evaluate", wraps=columnar.evaluate) as evaluate:
+            self.assertEnginesAgree()
+        self.assertEqual(evaluate.call_count, len([params for params in self.params if params]))
+
+    @override_settings(ELIGIBILITY_ENGINE="columnar")
+    def test_if_filtered_responses_are_not_cached(self):
+        """Test if responses filtered by engine are neither cached nor tagged"""
+        with override_settings(CACHES={**settings.CACHES, "responses": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "columnar",
+        }}):
+            self.assertFalse(self.client.get(path="/households/", data={"min_income": 50000}).has_header("ETag"))
+            self.assertFalse(self.client.get(path="/households/count/", data={"min_income": 50000}).has_header("ETag"))
+            self.assertTrue(self.client.get(path="/households/").has_header("ETag"))
+
+    def test_if_engine_refreshes_changed_households_incrementally(self):
+        """Test if engine refreshes changed households incrementally"""
+        columnar = engine.get_engine()
+        columnar.load()
+        with mock.patch.object(columnar, "load", wraps=columnar.load) as load:
+            self.client.post(path="/households/1/add_member/", data=[
+                {
+                    "name": "Old Tan",
+                    "gender": "Male",
+                    "marital_status": "Married",
+                    "spouse": "Old Mrs Tan",
+                    "occupation_type": "Unemployed",
+                    "annual_income": 0,
+                    "dob": "1940-01-01",
+                },
+                {
+                    "name": "Old Mrs Tan",
+                    "gender": "Female",
+                    "marital_status": "Married",
+                    "spouse": "Old Tan",
+                    "occupation_type": "Unemployed",
+                    "annual_income": 0,
+                    "dob": "1945-01-01",
+                },
+            ], format="json")
+            self.client.delete(path="/households/2/remove_member/", data={"name": "Mary Doe"}, format="json")
+            self.client.delete(path="/households/3/")
+            self.client.post(path="/households/", data={"housing_type": "HDB"}, format="json")
+            self.assertEnginesAgree()
+            load.assert_not_called()
+
+
+@freeze_today
+class GrantEndpointTestCase(APITestCase):
+    """TestCases for Grant resource and its eligible households"""
+
+    # Load test fixtures
+    fixtures = (
+        INITIAL_DATA_FIXTURES,
+        SAMPLE_DATA_FIXTURES,
+    )
+
+    def assertEligibilityUpToDate(self, grants):
+        for grant in grants:
+            with self.subTest(grant=grant.name):
+                expected = filter_households(Household.objects.all(), grant.params()).values_list("pk", flat=True)
+                actual = GrantEligibility.objects.filter(grant=grant).values_list("household", flat=True)
+                self.assertEqual(set(actual), set(expected))
+
+    def test_if_endpoint_lists_grants_from_fixtures(self):
+        """Test if endpoint lists grants from fixtures"""
+        response = self.client.get(path="/grants/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        grants = {grant["name"]: grant for grant in json.loads(response.content)}
+        self.assertEqual(grants.keys(), GRANT_PARAMS.keys())
+        self.assertEqual(grants["Elder Bonus"]["housing_type"], "HDB")
+
+    def test_if_endpoint_returns_same_households_as_query_parameters(self):
+        """Test if endpoint returns the same households as query parameters"""
+        for grant in Grant.objects.all():
+            with self.subTest(grant=grant.name):
+                expected = self.client.get(path="/households/", data=GRANT_PARAMS[grant.name])
+                response = self.client.get(path=f"/grants/{grant.pk}/eligible-households/")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    def test_if_zero_valued_criterion_filters_households(self):
+        """Test if a criterion of 0 filters households like the same query parameter"""
+        grant = Grant.objects.create(name="No Income Grant", max_income=0)
+        self.assertEqual(grant.params(), {"max_income": 0})
+        expected = self.client.get(path="/households/", data={"max_income": "0"})
+        self.assertEqual(json.loads(expected.content), [])
+        response = self.client.get(path=f"/grants/{grant.pk}/eligible-households/")
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    def test_if_eligibility_is_recomputed_when_stale(self):
+        """Test if eligibility is recomputed when not computed today"""
+        grant = Grant.objects.get(name="Baby Sunshine Grant")
+        eligibility.refresh_grant(grant)
+        Grant.objects.filter(pk=grant.pk).update(computed_on=datetime.date(2020, 2, 9))
+        GrantEligibility.objects.all().delete()
+
+        response = self.client.get(path=f"/grants/{grant.pk}/eligible-households/", data={"page_size": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([household["id"] for household in json.loads(response.content)["results"]], [4])
+        self.assertEqual(Grant.objects.get(pk=grant.pk).computed_on, FrozenDate.today())
+
+    def test_if_eligibility_is_refreshed_on_changes(self):
+        """Test if eligibility is refreshed for changed households only"""
+        Grant.objects.create(name="Working Age Grant", min_age=20, max_age=50)
+        for grant in Grant.objects.all():
+            eligibility.refresh_grant(grant)
+        with mock.patch("govgrant.api.eligibility.refresh_grant") as refresh_grant:
+            self.client.post(path="/households/3/add_member/", data={
+                "name": "Tan Ah Boy",
+                "gender": "Male",
+                "marital_status": "Single",
+                "spouse": None,
+                "occupation_type": "Student",
+                "annual_income": 0,
+                "dob": "2019-01-01",
+            }, format="json")
+            self.client.delete(path="/households/2/remove_member/", data={"name": "Mary Doe"}, format="json")
+            household = Household.objects.get(pk=1)
+            household.housing_type = HousingType.objects.get(name="HDB")
+            household.save()
+            self.client.delete(path="/households/4/")
+            refresh_grant.assert_not_called()
+        self.assertEligibilityUpToDate(Grant.objects.all())
+
+    def test_if_http_post_request_creates_grant_with_eligibility(self):
+        """Test if HTTP POST request creates a grant and computes its eligibility"""
+        data = {
+            "name": "Condominium Grant",
+            "housing_type": "Condominium",
+        }
+        response = self.client.post(path="/grants/", data=data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(json.loads(response.content)["with_spouse"], False)
+        self.assertEligibilityUpToDate(Grant.objects.filter(name="Condominium Grant"))
+
+
+@freeze_today
 class GrantEligibilityTestCase(APITestCase):
     """TestCases for filtering Household resource using query parameters"""
 
@@ -456,9 +2355,6 @@ class GrantEligibilityTestCase(APITestCase):
         SAMPLE_DATA_FIXTURES,
     )
 
-    # TODO: datetime.date.today() in views.py needs to be mocked so
-    # that the tests remain consistent regardless of the current date
-
     def test_if_endpoint_returns_eligible_households_for_student_encouragement_bonus(self):
         """Test if endpoint returns eligible households for Student Encouragement Bonus"""
 
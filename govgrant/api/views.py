@@ -1,72 +1,232 @@
-import datetime
-
-from django.db.models import Count, Sum, Case, When
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from govgrant.api.models import Household, FamilyMember
-from govgrant.api.serializers import HouseholdSerializer, FamilyMemberSerializer
+from govgrant.api import eligibility, exports, metrics, streaming
+from govgrant.api.cache import HOUSEHOLDS_VERSION_KEY
+from govgrant.api.filters import filter_eligible_households, parse_criteria
+from govgrant.api.mixins import CachedResponseMixin
+from govgrant.api.models import Household, FamilyMember, Grant
+from govgrant.api.pagination import HouseholdCursorPagination
+from govgrant.api.renderers import JSONRenderer, dumps
+from govgrant.api.serializers import (
+    HOUSEHOLD_FIELDS, HouseholdSerializer, HouseholdValuesSerializer, FamilyMemberSerializer, GrantSerializer,
+    household_values,
+)
+
+
+def prefetch_members(queryset):
+    """
+    Prefetches the members of each household in the queryset.
+
+    The members are loaded in a single query with their spouses
+    joined in, so that serializing any number of households issues
+    a fixed number of queries instead of one per household and one
+    per member. Enumerated fields are resolved by the serializers
+    through the EnumCache and need not be joined.
+    """
+    return queryset.prefetch_related(members_prefetch())
 
 
-class HouseholdViewSet(viewsets.ModelViewSet):
-    """API endpoint for Household resource"""
+def members_prefetch():
+    """Returns the prefetch of the members of households, with their spouses"""
+    members = FamilyMember.objects.select_related("spouse").order_by("pk")
+    return Prefetch("members", queryset=members)
+
+
+class HouseholdViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+    """
+    API endpoint for Household resource
+
+    The list and retrieve actions read households with ``values()``
+    and serialize them with HouseholdValuesSerializer, while writes
+    go through HouseholdSerializer. Their output may be narrowed
+    down with the ``fields``, ``expand`` and ``omit`` query
+    parameters, in which case unselected fields are not read.
+    """
     queryset = Household.objects.all()
     serializer_class = HouseholdSerializer
+    pagination_class = HouseholdCursorPagination
+    response_version_key = HOUSEHOLDS_VERSION_KEY
+
+    # Number of households fetched per query when streaming
+    stream_chunk_size = 500
+
+    # Actions served by the read-only fast path
+    read_actions = ("list", "retrieve")
+
+    # Actions that only read the ids of the filtered households
+    id_actions = ("count", "ids")
+
+    # Number of ids fetched per query by the ids action
+    ids_chunk_size = 10000
+
+    # Number of households exported per query by the export action
+    export_chunk_size = 2000
+
+    # Fields that may be added to the selected fields with ``expand``
+    expandable_fields = ("members",)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Lists households, streaming them in chunks instead when
+        the ``stream`` query parameter is given.
+        """
+        stream = request.query_params.get("stream")
+        if stream:
+            return self.stream(stream)
+        return super().list(request, *args, **kwargs)
+
+    def stream(self, mode):
+        """
+        Streams the filtered households as a JSON array, or as
+        newline delimited JSON if ``mode`` is ``ndjson``.
+
+        Households are fetched and serialized one chunk at a time
+        so that memory usage stays flat regardless of the number
+        of households that match.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        households = (
+            data
+            for chunk in streaming.iter_chunks(queryset, self.stream_chunk_size)
+            for data in self.get_serializer(chunk, many=True).data
+        )
+        if mode == "ndjson":
+            content = streaming.iter_ndjson(households, dumps)
+            content_type = "application/x-ndjson"
+        else:
+            content = streaming.iter_json_array(households, dumps)
+            content_type = JSONRenderer.media_type
+        return StreamingHttpResponse(content, content_type=content_type)
+
+    @action(detail=False, methods=['get'])
+    def count(self, request):
+        """
+        Custom action for counting the households matching the query
+        parameters of the list action with a single COUNT query
+        """
+        return self.cached_response(self.count_response, request)
+
+    def count_response(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response({"count": queryset.count()})
+
+    @action(detail=False, methods=['get'])
+    def ids(self, request):
+        """
+        Custom action for listing the ids of the households matching
+        the query parameters of the list action
+
+        Ids are read and streamed as a compact JSON array one chunk
+        at a time, without reading any other column.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        content = streaming.iter_int_array(streaming.iter_pk_chunks(queryset, self.ids_chunk_size))
+        return StreamingHttpResponse(content, content_type=JSONRenderer.media_type)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Custom action for exporting the households matching the query
+        parameters of the list action as CSV
+
+        A row is written per household, or per member when ``rows`` is
+        ``members``, and the file is gzip compressed when ``compress``
+        is ``gzip``. Households are read, encoded and compressed one
+        chunk at a time so that memory usage stays flat.
+        """
+        params = request.query_params
+        rows, compress = params.get("rows", "households"), params.get("compress")
+        errors = {}
+        if rows not in exports.COLUMNS:
+            errors["rows"] = [f"'{rows}' is not one of {', '.join(exports.COLUMNS)}."]
+        if compress not in (None, "gzip"):
+            errors["compress"] = [f"'{compress}' is not one of gzip."]
+        if errors:
+            raise ValidationError(errors)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        content = exports.export_csv(queryset, rows, self.export_chunk_size, compress=bool(compress))
+        filename = f"{rows}.csv.gz" if compress else f"{rows}.csv"
+        response = StreamingHttpResponse(content, content_type="application/gzip" if compress else "text/csv")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
 
     @action(detail=True, methods=['post'])
     def add_member(self, request, pk=None):
-        """Custom action for adding member to household"""
+        """
+        Custom action for adding member to household
 
-        # Patch household.pk to current member object
-        household = self.get_object()
-        request.data["household"] = household.pk
+        A list of members may be given to add them all at once,
+        in which case spouses may also refer to one another.
+        """
 
         # Validate request
-        serializer = FamilyMemberSerializer(data=request.data)
+        household = self.get_object()
+        many = isinstance(request.data, list)
+        serializer = FamilyMemberSerializer(data=request.data, many=many)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         # Commit changes to return
         # TODO: Return household or just member instance?
-        serializer.save()
+        serializer.save(household=household)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['delete'])
     def remove_member(self, request, pk=None):
-        """Custom action for removing member from household"""
+        """
+        Custom action for removing member from household
+
+        A list of names may be given to remove them all at once.
+        Members are removed with a single DELETE statement, and
+        the request fails without removing any member unless every
+        name was found in the household.
+        """
 
         # Get required key in request.data
         name = request.data.get("name")
-        if not name:
+        names = name if isinstance(name, list) else [name]
+        if not name or not all(isinstance(value, str) and value for value in names):
             data = {
                 "name": "field is required"
             }
             return Response(data=data, status=status.HTTP_400_BAD_REQUEST)
 
-        # Delete object
-        # TODO: Consider a better way to destroy model instance.
-        # This is only done because the Serializer cannot successfully
-        # validate this request object and because the pk of the member
-        # cannot be derived from the url route.
+        # Delete objects, checking the number of deleted rows
         household = self.get_object()
-        try:
-            member = FamilyMember.objects.get(
-                name=name,
-                household=household,  # Only if member in current household
-            )
-            member.delete()
-        except FamilyMember.DoesNotExist:
+        names = list(dict.fromkeys(names))
+        with transaction.atomic():
+            removed = Household.objects.filter(pk=household.pk).remove_members(names)
+            if removed != len(names):
+                transaction.set_rollback(True)
+        if removed != len(names):
+            found = set(household.members.filter(name__in=names).values_list("name", flat=True))
+            missing = ", ".join(f"'{value}'" for value in names if value not in found)
             data = {
-                "name": f"could not find '{name}' in current household"
+                "name": f"could not find {missing} in current household"
             }
             return Response(data=data, status=status.HTTP_400_BAD_REQUEST)
 
-        # Refresh household instance
-        household.refresh_from_db()
+        # Fetch the remaining members of the household
+        prefetch_related_objects([household], members_prefetch())
         serializer = HouseholdSerializer(household)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def is_response_cacheable(self, request):
+        """
+        Responses filtered by the columnar engine are not cached, since
+        its snapshot may lag behind writes made by other processes for
+        up to ``ELIGIBILITY_ENGINE_TTL`` seconds.
+        """
+        return settings.ELIGIBILITY_ENGINE != "columnar" or not parse_criteria(request.query_params)
+
     def get_queryset(self):
         """
         Optionally filters eligble households against query
@@ -76,44 +236,79 @@ class HouseholdViewSet(viewsets.ModelViewSet):
         and match those that qualifies for a specific grant based
         on the qualifying criteria.
         """
+        queryset = filter_eligible_households(Household.objects.all(), self.request.query_params)
+        if self.action in self.read_actions:
+            # Ordered explicitly since values() may be read from an index
+            return queryset.order_by("pk").values(*household_values(self.get_selected_fields()))
+        if self.action in self.id_actions or self.action in ("export", "remove_member"):
+            # remove_member fetches the members once they are removed
+            return queryset
+        return prefetch_members(queryset)
+
+    def get_serializer_class(self):
+        if self.action in self.read_actions:
+            return HouseholdValuesSerializer
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in self.read_actions:
+            context["fields"] = self.get_selected_fields()
+        return context
+
+    def get_selected_fields(self):
+        """
+        Returns the fields selected by the query parameters, which are
+        comma separated lists of fields:
+
+        - ``fields``: fields to include instead of every field
+        - ``expand``: relations to include in addition to ``fields``
+        - ``omit``: fields to exclude
+        """
+        params = self.request.query_params
+        requested = {
+            key: [field.strip() for field in params.get(key, "").split(",") if field.strip()]
+            for key in ("fields", "expand", "omit")
+        }
+        errors = {}
+        for key, choices in (("fields", HOUSEHOLD_FIELDS), ("expand", self.expandable_fields), ("omit", HOUSEHOLD_FIELDS)):
+            invalid = [field for field in requested[key] if field not in choices]
+            if invalid:
+                errors[key] = [f"'{field}' is not one of {', '.join(choices)}." for field in invalid]
+        if errors:
+            raise ValidationError(errors)
+
+        selected = set(requested["fields"] or HOUSEHOLD_FIELDS) | set(requested["expand"])
+        return tuple(field for field in HOUSEHOLD_FIELDS if field in selected and field not in requested["omit"])
+
+
+class GrantViewSet(viewsets.ModelViewSet):
+    """API endpoint for Grant resource"""
+    queryset = Grant.objects.all()
+    serializer_class = GrantSerializer
+
+    @action(detail=True, methods=['get'], url_path='eligible-households')
+    def eligible_households(self, request, pk=None):
+        """
+        Custom action for listing the households eligible for a grant
+
+        Eligible households are read from the materialized
+        eligibility table, which is recomputed first if it was
+        not computed today.
+        """
+        grant = self.get_object()
+        eligibility.refresh_stale_grant(grant)
+
+        queryset = Household.objects.filter(grant_eligibilities__grant=grant).order_by("pk").values(*household_values())
+        paginator = HouseholdCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        if page is not None:
+            serializer = HouseholdValuesSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+        serializer = HouseholdValuesSerializer(queryset, many=True)
+        return Response(serializer.data)
+
 
-        # Construct filters
-        filters = {}
-
-        # Filters based on aggregate household income
-        min_income = self.request.query_params.get('min_income')
-        if min_income:
-            filters["household_income__gt"] = min_income
-        max_income = self.request.query_params.get('max_income')
-        if max_income:
-            filters["household_income__lt"] = max_income
-
-        # Filters based on members' age
-        min_age = self.request.query_params.get('min_age')
-        if min_age:
-            filters["members__dob__lt"] = datetime.date.today() - datetime.timedelta(days=int(min_age) * 365)
-        max_age = self.request.query_params.get('max_age')
-        if max_age:
-            filters["members__dob__gt"] = datetime.date.today() - datetime.timedelta(days=int(max_age) * 365)
-
-        # Filters based on housing type
-        # NOTE: Uses case insensitive match
-        housing_type = self.request.query_params.get('housing_type')
-        if housing_type:
-            filters["housing_type__name__iexact"] = housing_type
-
-        # TODO: Consider using a better logic that checks
-        # if the spouse is related to one another within
-        # the same household.
-        if self.request.query_params.get('with_spouse'):
-            filters["spouse_count__gte"] = 2
-
-        # TODO: Using timedelta is not accurate because it does not
-        # take leap years into consideration. Consider using the
-        # dateutil.relativedelta module instead.
-        queryset = Household.objects.annotate(
-            household_income=Sum('members__annual_income'),
-            spouse_count=Count(Case(When(members__spouse__isnull=False, then=1))),
-        ).filter(**filters)
-
-        return queryset
+def metrics_view(request):
+    """Exposes the request timing histograms in the Prometheus text format"""
+    return HttpResponse(metrics.registry.render(), content_type="text/plain; version=0.0.4")
@@ -9,8 +9,13 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'govgrant.settings')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+# Runs requests on a bounded thread pool instead of the default executor
+from govgrant.api.handlers import ThreadPoolASGIHandler  # noqa: E402
+
+application = ThreadPoolASGIHandler()
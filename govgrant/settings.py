@@ -42,6 +42,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'govgrant.api.middleware.PerformanceMiddleware',
+    'govgrant.api.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,6 +73,27 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'govgrant.wsgi.application'
 
+# Measure the timings of each request (see PerformanceMiddleware), and
+# log requests taking longer than the threshold (in milliseconds)
+PERFORMANCE_METRICS = os.environ.get('PERFORMANCE_METRICS', '') == '1'
+SLOW_REQUEST_THRESHOLD = int(os.environ.get('SLOW_REQUEST_THRESHOLD', 500))
+
+# Number of threads running requests under ASGI, which bounds the
+# number of database connections held by each ASGI process
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 8))
+
+# Defaults of `manage.py serve`: number of worker processes (one per
+# core), threads of each WSGI worker, requests after which a worker is
+# replaced (0 to never replace it) and the random jitter added to it,
+# seconds given to workers to finish their requests when stopped, and
+# seconds after which idle persistent connections are closed
+SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', os.cpu_count() or 1))
+SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 8))
+SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS', 10000))
+SERVER_MAX_REQUESTS_JITTER = int(os.environ.get('SERVER_MAX_REQUESTS_JITTER', 1000))
+SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))
+SERVER_KEEPALIVE = int(os.environ.get('SERVER_KEEPALIVE', 5))
+
 
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
@@ -78,10 +101,92 @@ WSGI_APPLICATION = 'govgrant.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'NAME': os.environ.get('DATABASE_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        # Seconds a connection is reused across requests
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
     }
 }
 
+# PRAGMAs applied to each new SQLite connection, by profile. The 'tuned'
+# profile enables write-ahead logging so that readers no longer block
+# behind writers, syncs to disk only at checkpoints, sizes the page
+# cache (in KiB when negative) and memory map (in bytes), and waits
+# for locks instead of failing immediately. 'default' keeps SQLite's
+# defaults.
+SQLITE_PROFILES = {
+    'default': {},
+    'tuned': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,
+        'mmap_size': 268435456,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+}
+SQLITE_PRAGMAS = SQLITE_PROFILES[os.environ.get('SQLITE_PROFILE', 'tuned')]
+
+# Aliases of read replicas of the default database, given as a comma
+# separated list of SQLite files. Reads of households are routed to
+# them (see govgrant.api.routers), and they can be kept in sync with
+# `manage.py sync_replicas`
+DATABASE_REPLICAS = []
+for name in filter(None, os.environ.get('DATABASE_REPLICA_NAMES', '').split(',')):
+    alias = f'replica{len(DATABASE_REPLICAS) + 1}'
+    DATABASES[alias] = {**DATABASES['default'], 'NAME': name, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['govgrant.api.routers.ReplicaRouter']
+
+# Seconds during which the reads of a client are routed to the
+# default database after one of its requests has written
+REPLICA_STICKINESS = int(os.environ.get('REPLICA_STICKINESS', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+# NOTE: With multiple worker processes, both caches must use a shared
+# backend (e.g. FileBasedCache) so that version tokens and cached
+# responses are coherent across processes. `manage.py serve` refuses
+# to fork several workers otherwise.
+
+CACHES = {
+    # Either LocMemCache, or FileBasedCache with a directory as location
+    'default': {
+        'BACKEND': os.environ.get('DEFAULT_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DEFAULT_CACHE_LOCATION', ''),
+    },
+    # Either LocMemCache, or FileBasedCache with a directory as location
+    'responses': {
+        'BACKEND': os.environ.get('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'responses'),
+    },
+}
+
+# Cache alias holding the version tokens of cached data
+API_VERSION_CACHE = 'default'
+
+# Cache alias and timeout (in seconds) of rendered API responses
+RESPONSE_CACHE = 'responses'
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Seconds between checks of the version tokens of enum lookup tables
+ENUM_CACHE_CHECK_INTERVAL = 1
+
+# Engine evaluating grant eligibility criteria, either 'sql' or
+# 'columnar' (in-memory snapshot, requires numpy)
+ELIGIBILITY_ENGINE = os.environ.get('ELIGIBILITY_ENGINE', 'sql')
+
+# Seconds after which the snapshot of the columnar engine is reloaded
+ELIGIBILITY_ENGINE_TTL = 60
+
+
+# Fixtures loaded by `manage.py bootstrap` on startup, given as a comma
+# separated list. Set it to an empty string to load no fixture.
+BOOTSTRAP_FIXTURES = [
+    fixture for fixture in os.environ.get('BOOTSTRAP_FIXTURES', 'initial.json,sample.json').split(',') if fixture
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -127,7 +232,12 @@ STATIC_URL = '/static/'
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'govgrant.api.renderers.JSONRenderer',
         # 'rest_framework.renderers.BrowsableAPIRenderer',
     ),
+    'DEFAULT_PARSER_CLASSES': (
+        'govgrant.api.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
@@ -21,8 +21,10 @@ from govgrant.api import views
 
 router = routers.DefaultRouter()
 router.register("households", views.HouseholdViewSet)
+router.register("grants", views.GrantViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', views.metrics_view, name='metrics'),
     path('', include(router.urls)),
 ]